@@ -21,8 +21,44 @@ def create_app(config_class=Config):
 
     db.init_app(app)
     login_manager.init_app(app)
+
+    # Size the shared generated-code cache
+    from app.utils.codegen_cache import code_cache
+    code_cache.configure(
+        max_entries=app.config.get('CODEGEN_CACHE_MAX_ENTRIES'),
+        max_bytes=app.config.get('CODEGEN_CACHE_MAX_BYTES')
+    )
+    # Per-process cache of logged-in users (Flask-Login's user loader)
+    from app.utils.user_cache import user_cache
+    user_cache.init_app(app)
+    # Password hashing method and pool
+    from app.utils.passwords import passwords
+    passwords.init_app(app)
+    # Size the pipeline execution pool (workers start on the first run)
+    from app.execution import executor, job_queue
+    executor.configure(
+        max_workers=app.config.get('EXECUTION_MAX_WORKERS'),
+        max_tasks_per_child=app.config.get('EXECUTION_MAX_TASKS_PER_CHILD'),
+        limits={
+            'timeout': app.config.get('EXECUTION_TIMEOUT'),
+            'cpu_seconds': app.config.get('EXECUTION_CPU_SECONDS'),
+            'memory_bytes': app.config.get('EXECUTION_MEMORY_MB', 2048) * 1024 * 1024,
+            'file_bytes': app.config.get('EXECUTION_MAX_FILE_MB', 64) * 1024 * 1024,
+            'max_output': app.config.get('EXECUTION_MAX_OUTPUT')
+        },
+        artifact_root=app.config.get('EXECUTION_ARTIFACT_DIR'),
+        artifact_max_bytes=app.config.get('EXECUTION_ARTIFACT_MAX_MB', 1024) * 1024 * 1024
+    )
+    job_queue.init_app(app)
+    # Collaboration rooms and presence for the builder. A shared bus
+    # (COLLAB_BUS_URL) lets several server processes serve the same rooms
+    from app.realtime import BusManager, create_bus, engine, presence
+    bus = create_bus(app.config.get('COLLAB_BUS_URL'))
+    engine.init_app(app, bus=bus)
+    presence.init_app(app, engine)
+    socketio_options = {'client_manager': BusManager(bus)} if bus.shared else {}
     # Initialize SocketIO
-    socketio.init_app(app, async_mode='eventlet', cors_allowed_origins="*")
+    socketio.init_app(app, async_mode='eventlet', cors_allowed_origins="*", **socketio_options)
 
     # Register SocketIO Events
     with app.app_context():
@@ -0,0 +1,5 @@
+"""
+Execution - Server-side pipeline runs in resource-limited worker processes
+"""
+from app.execution.executor import PipelineExecutor, executor
+from app.execution.jobs import JobQueue, QueueFull, job_queue
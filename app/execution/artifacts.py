@@ -0,0 +1,101 @@
+"""
+Artifacts - Size-bounded on-disk cache of node outputs for node-level runs
+
+Each entry is one pickle holding a node's outputs, keyed by the node's
+cache key (see planner.node_key). Entries are written atomically and
+evicted least-recently-used first, using file mtimes as the access clock,
+so every worker process can share one directory without coordination.
+Only workers write here; nothing from clients is ever unpickled.
+"""
+import os
+import pickle
+import tempfile
+
+
+class ArtifactStore:
+    def __init__(self, root, max_bytes=1024 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key + '.pkl')
+
+    def has(self, key):
+        """True if key is stored; also marks it recently used"""
+        try:
+            os.utime(self._path(key))
+            return True
+        except OSError:
+            return False
+
+    def get(self, key):
+        """Stored outputs dict, or None if missing or unreadable"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                outputs = pickle.load(f)
+            os.utime(path)
+            return outputs
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+
+    def put(self, key, outputs):
+        """Store outputs; returns False if they can't be pickled or exceed the store size"""
+        try:
+            payload = pickle.dumps(outputs, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
+        if len(payload) > self.max_bytes:
+            return False
+
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            # Includes EFBIG from the job's RLIMIT_FSIZE
+            return False
+        self.evict()
+        return True
+
+    def _entries(self):
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.pkl'):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        """Delete least recently used entries until the store fits in max_bytes"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self):
+        entries = self._entries()
+        return {'entries': len(entries), 'bytes': sum(size for _, size, _ in entries)}
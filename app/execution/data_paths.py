@@ -0,0 +1,72 @@
+"""
+Data Paths - Confines loader paths to the execution data directory
+
+Loader components read the file named by a parameter (declared with
+"dataPath": true in the catalog). Before a run is queued those values are
+checked and rewritten to absolute paths under EXECUTION_DATA_DIR, so the
+generated code cannot read other server files or fetch URLs.
+"""
+import copy
+import os
+import re
+from typing import Dict, List, Tuple
+
+SCHEME_RE = re.compile(r'^[A-Za-z][A-Za-z0-9+.-]*:')
+
+
+def path_error(value) -> str:
+    """Why a loader path is not allowed, or '' if it is"""
+    if not isinstance(value, str) or not value.strip():
+        return 'must be a file name'
+    if '://' in value or SCHEME_RE.match(value):
+        return 'must not be a URL'
+    if value.startswith(('/', '\\', '~')) or os.path.isabs(value):
+        return 'must be relative to the data directory'
+    if '..' in re.split(r'[\\/]', value):
+        return "must not contain '..'"
+    return ''
+
+
+def resolve_data_path(value: str, data_dir: str) -> str:
+    """Absolute path of value under data_dir, or '' if it escapes it (e.g. via a symlink)"""
+    root = os.path.realpath(data_dir)
+    resolved = os.path.realpath(os.path.join(root, value))
+    if os.path.commonpath([root, resolved]) != root:
+        return ''
+    return resolved
+
+
+def confine_data_paths(nodes: List[Dict], data_dir: str) -> Tuple[List[Dict], List[str]]:
+    """
+    Build (nodes, errors) with every loader path resolved under data_dir.
+
+    The input nodes are left untouched; nodes with loader parameters are
+    copied with their values (or the catalog default) rewritten.
+    """
+    from app.utils.data_loader import component_registry
+
+    confined, errors = [], []
+    for node in nodes:
+        component = component_registry.resolve(node) or {}
+        path_params = [param for param in component.get('parameters', []) if param.get('dataPath')]
+        if not path_params:
+            confined.append(node)
+            continue
+
+        node = copy.deepcopy(node)
+        params = node.setdefault('data', {}).get('parameters') or {}
+        node['data']['parameters'] = params
+        label = node['data'].get('label') or component.get('name')
+        for param in path_params:
+            value = params.get(param['name'], param.get('defaultValue'))
+            problem = path_error(value)
+            resolved = '' if problem else resolve_data_path(value, data_dir)
+            if not problem and not resolved:
+                problem = 'must stay inside the data directory'
+            if problem:
+                errors.append(f"{label}: {param.get('label', param['name'])} {problem}")
+                continue
+            params[param['name']] = resolved
+        confined.append(node)
+
+    return confined, errors
@@ -0,0 +1,32 @@
+"""
+Events - Job progress messages, carried over a multiprocessing queue
+
+Workers and the server-side scheduler report what a job is doing
+(nodes starting and finishing, captured output, completion) as small
+dicts on one channel; app.execution.jobs reads them in the server
+process, stores them and relays them to Socket.IO rooms. Reporting never
+raises and is a no-op when no channel is bound (e.g. worker tests).
+"""
+import time
+
+NODE = 'node'
+LOG = 'log'
+FINISHED = 'finished'
+
+_channel = None
+
+
+def bind(channel):
+    """Use channel (a multiprocessing queue) for report(); called in the server and in each worker"""
+    global _channel
+    _channel = channel
+
+
+def report(job_id, event, **data):
+    if _channel is None or job_id is None:
+        return
+    data.update(job_id=job_id, event=event, at=time.time())
+    try:
+        _channel.put(data)
+    except (OSError, ValueError):
+        pass  # channel closed during shutdown
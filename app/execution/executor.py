@@ -0,0 +1,160 @@
+"""
+Executor - Bounded process pool for running generated pipeline scripts
+"""
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.execution import events, worker
+from app.execution.artifacts import ArtifactStore
+from app.execution.scheduler import ParallelRun, schedule_levels
+
+
+def run_export(fmt, nodes, edges, pipeline_name, description=None, options=None):
+    """Pool task for a background export"""
+    from app.utils.exporters import export_pipeline
+    return dict(export_pipeline(fmt, nodes, edges, pipeline_name, description, options), status='succeeded')
+
+
+class PipelineExecutor:
+    """
+    Runs jobs in a ProcessPoolExecutor of resource-limited workers.
+
+    Workers are started with the spawn method (forking a process that runs
+    the eventlet hub is unsafe) and replaced after max_tasks_per_child jobs.
+    Jobs are handed over by app.execution.jobs once a worker is free
+    (see active) and never block the caller; progress and results come
+    back as app.execution.events on the shared channel.
+    """
+
+    def __init__(self, max_workers=2, max_tasks_per_child=20, limits=None,
+                 artifact_root=None, artifact_max_bytes=1024 * 1024 * 1024):
+        self.max_workers = max_workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.limits = dict(limits or {})
+        self.artifact_root = artifact_root or os.path.join(tempfile.gettempdir(), 'dominoml-artifacts')
+        self.artifact_max_bytes = artifact_max_bytes
+        self._context = multiprocessing.get_context('spawn')
+        self._channel = None
+        self._pool = None
+        self._active = set()
+        self._lock = threading.Lock()
+
+    def configure(self, max_workers=None, max_tasks_per_child=None, limits=None,
+                  artifact_root=None, artifact_max_bytes=None):
+        """Update settings; a running pool keeps its size until it is restarted"""
+        with self._lock:
+            if max_workers is not None:
+                self.max_workers = max_workers
+            if max_tasks_per_child is not None:
+                self.max_tasks_per_child = max_tasks_per_child
+            if limits is not None:
+                self.limits.update(limits)
+            if artifact_root is not None:
+                self.artifact_root = artifact_root
+            if artifact_max_bytes is not None:
+                self.artifact_max_bytes = artifact_max_bytes
+
+    @property
+    def channel(self):
+        """Queue the workers report events on; created once and handed to every pool"""
+        with self._lock:
+            if self._channel is None:
+                self._channel = self._context.Queue()
+                events.bind(self._channel)
+            return self._channel
+
+    @property
+    def active(self):
+        """Number of jobs currently running"""
+        return len(self._active)
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=self._context,
+                initializer=worker.init_worker,
+                initargs=(self.channel,),
+                max_tasks_per_child=self.max_tasks_per_child
+            )
+        return self._pool
+
+    def pool_submit(self, fn, *args):
+        """Submit one task to the worker pool, replacing the pool if a worker crashed it"""
+        try:
+            return self._get_pool().submit(fn, *args)
+        except BrokenProcessPool:
+            # A worker died abruptly (e.g. killed by the OOM killer); start a fresh pool
+            self._pool = None
+            return self._get_pool().submit(fn, *args)
+
+    def start(self, job_id, task):
+        """
+        Start a job described by a task dict (see app.execution.jobs).
+
+        The outcome is always reported as a FINISHED event, including when
+        the task can't be started at all.
+        """
+        self._active.add(job_id)
+        try:
+            kind = task['task']
+            if kind == 'script':
+                self._watch(job_id, self.pool_submit(worker.run_script, task['script'], self.limits, job_id))
+            elif kind == 'nodes':
+                self._start_nodes(job_id, task['steps'])
+            elif kind == 'export':
+                self._watch(job_id, self.pool_submit(
+                    run_export, task['format'], task['nodes'], task['edges'], task['name'],
+                    task.get('description'), task.get('options')
+                ))
+            else:
+                raise ValueError(f'Unknown task {kind!r}')
+        except Exception as e:
+            self.finish(job_id, {'status': 'failed', 'error': str(e), 'stdout': ''})
+
+    def _start_nodes(self, job_id, steps):
+        """
+        Node-level run of planner steps, reusing cached node outputs.
+
+        Steps whose outputs are cached are skipped. If the remaining steps
+        form a single chain they run in one worker; otherwise independent
+        branches are spread over the pool level by level (see scheduler).
+        """
+        store = ArtifactStore(self.artifact_root, self.artifact_max_bytes)
+        dirty = {step['id'] for step in steps if not store.has(step['key'])}
+        levels = schedule_levels(steps, dirty)
+        if all(len(level) <= 1 for level in levels):
+            self._watch(job_id, self.pool_submit(
+                worker.run_nodes, steps, self.limits, self.artifact_root, self.artifact_max_bytes, job_id
+            ))
+        else:
+            ParallelRun(self, job_id, steps, levels).start()
+
+    def _watch(self, job_id, future):
+        def done(future):
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                result = {'status': 'failed', 'error': 'Worker process crashed', 'stdout': ''}
+            except Exception as e:
+                result = {'status': 'failed', 'error': str(e), 'stdout': ''}
+            self.finish(job_id, result)
+
+        future.add_done_callback(done)
+
+    def finish(self, job_id, result):
+        self._active.discard(job_id)
+        events.report(job_id, events.FINISHED, result=result)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+executor = PipelineExecutor()
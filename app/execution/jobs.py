@@ -0,0 +1,217 @@
+"""
+Jobs - Persistent job queue in front of the execution pool
+
+Pipeline runs and exports are stored as BackgroundJob rows and the
+request returns the job id straight away. Rows wait in the table, so a
+queued job survives a restart, and are claimed oldest first whenever this
+process has a free worker: after every enqueue and every finished job.
+
+Workers report progress on the executor's event channel. A reader thread
+stores it (status, per-node progress, result) and hands it to a Socket.IO
+background task that emits it to the pipeline's room on the /builder
+namespace as job_status, job_progress, job_log and job_finished. Only
+that task touches sockets, so emits stay on the server's event loop.
+"""
+import json
+import os
+import socket
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import update
+
+from app.execution import events
+from app.execution.executor import executor
+
+NAMESPACE = '/builder'
+EMIT_INTERVAL = 0.1  # seconds
+
+
+class QueueFull(Exception):
+    """Raised when too many jobs are already waiting for a worker"""
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobQueue:
+    def __init__(self, max_queued=100, max_outbox=10000):
+        self.max_queued = max_queued
+        self.app = None
+        self._rooms = {}  # job id -> Socket.IO room, for jobs running here
+        self._outbox = deque(maxlen=max_outbox)
+        self._lock = threading.Lock()
+        self._reader = None
+        self._emitter = None
+        self._recovered = False
+
+    def init_app(self, app):
+        self.app = app
+        self.max_queued = app.config.get('EXECUTION_MAX_QUEUED') or self.max_queued
+
+    @property
+    def worker(self):
+        return f'{socket.gethostname()}:{os.getpid()}'
+
+    def enqueue(self, user_id, kind, task, pipeline_id=None):
+        """Store a job and start it if a worker is free; raises QueueFull"""
+        from app import db
+        from app.models import BackgroundJob
+
+        waiting = BackgroundJob.query.filter_by(status='queued').count()
+        if waiting >= self.max_queued:
+            raise QueueFull(f'{waiting} jobs are already waiting')
+
+        job = BackgroundJob(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            pipeline_id=pipeline_id,
+            kind=kind,
+            status='queued',
+            payload=json.dumps(task)
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        self._start()
+        self.dispatch()
+        return job
+
+    def dispatch(self):
+        """Claim queued jobs, oldest first, while this process has free workers"""
+        from app import db
+        from app.models import BackgroundJob
+
+        with self._lock:
+            if not self._recovered:
+                self._recover()
+            while executor.active < executor.max_workers:
+                job = BackgroundJob.query.filter_by(status='queued').order_by(
+                    BackgroundJob.created_at, BackgroundJob.id
+                ).first()
+                if job is None:
+                    break
+                job_id, pipeline_id, task = job.id, job.pipeline_id, json.loads(job.payload)
+
+                # Conditional update, so only one server process gets each job
+                claimed = db.session.execute(
+                    update(BackgroundJob)
+                    .where(BackgroundJob.id == job_id, BackgroundJob.status == 'queued')
+                    .values(status='running', worker=self.worker, started_at=datetime.utcnow())
+                ).rowcount
+                db.session.commit()
+                if not claimed:
+                    continue
+
+                if pipeline_id is not None:
+                    self._rooms[job_id] = f'pipeline_{pipeline_id}'
+                self._relay(job_id, 'job_status', {'status': 'running'})
+                executor.start(job_id, task)
+
+    def _recover(self):
+        """Fail jobs left running by a server process on this host that has since exited"""
+        from app import db
+        from app.models import BackgroundJob
+
+        host = socket.gethostname()
+        stale = BackgroundJob.query.filter(
+            BackgroundJob.status == 'running',
+            BackgroundJob.worker.like(f'{host}:%')
+        ).all()
+        for job in stale:
+            pid = int(job.worker.rsplit(':', 1)[1])
+            if pid != os.getpid() and not _alive(pid):
+                job.status = 'failed'
+                job.error = 'Interrupted by a server restart'
+                job.finished_at = datetime.utcnow()
+        db.session.commit()
+        self._recovered = True
+
+    def _start(self):
+        """Start the event reader thread and the Socket.IO emitter, once per process"""
+        from app import socketio
+
+        with self._lock:
+            if self._reader is None:
+                self._reader = threading.Thread(
+                    target=self._read, args=(executor.channel,), name='job-events', daemon=True
+                )
+                self._reader.start()
+            if self._emitter is None:
+                self._emitter = socketio.start_background_task(self._emit)
+
+    def _read(self, channel):
+        while True:
+            try:
+                event = channel.get()
+            except (EOFError, OSError):
+                return
+            try:
+                with self.app.app_context():
+                    self._apply(event)
+            except Exception:
+                self.app.logger.exception('Failed to record job event')
+
+    def _apply(self, event):
+        from app import db
+        from app.models import BackgroundJob
+
+        job_id = event['job_id']
+        if event['event'] == events.NODE:
+            job = db.session.get(BackgroundJob, job_id)
+            if job is not None:
+                progress = json.loads(job.progress) if job.progress else {}
+                progress[event['node']] = event['status']
+                job.progress = json.dumps(progress)
+                db.session.commit()
+            self._relay(job_id, 'job_progress', {
+                'node_id': event['node'],
+                'status': event['status'],
+                'duration': event.get('duration')
+            })
+        elif event['event'] == events.LOG:
+            self._relay(job_id, 'job_log', {'text': event['text']})
+        elif event['event'] == events.FINISHED:
+            result = event['result']
+            job = db.session.get(BackgroundJob, job_id)
+            if job is not None:
+                job.status = result['status']
+                job.error = result.get('error')
+                job.result = json.dumps(result)
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+            self._relay(job_id, 'job_finished', {
+                'status': result['status'],
+                'error': result.get('error'),
+                'duration': result.get('duration'),
+                'nodes': result.get('nodes')
+            })
+            self._rooms.pop(job_id, None)
+            self.dispatch()
+
+    def _relay(self, job_id, name, data):
+        room = self._rooms.get(job_id)
+        if room is not None:
+            data['job_id'] = job_id
+            self._outbox.append((name, data, room))
+
+    def _emit(self):
+        from app import socketio
+
+        while True:
+            while self._outbox:
+                name, data, room = self._outbox.popleft()
+                socketio.emit(name, data, room=room, namespace=NAMESPACE)
+            socketio.sleep(EMIT_INTERVAL)
+
+
+job_queue = JobQueue()
@@ -0,0 +1,81 @@
+"""
+Planner - Turns a pipeline graph into per-node steps for node-level runs
+
+Component ports are plain variable names: a node's template reads its
+declared `inputs` and assigns its declared `outputs`. Each input is bound
+to the nearest upstream node (by graph distance, then edge order) that
+declares an output of the same name, which matches what the generated
+script sees when it runs every template in one scope.
+"""
+from collections import deque
+from typing import Dict, List, Tuple
+
+from app.utils.code_generator import node_parameters
+from app.utils.hashing import content_hash
+from app.utils.pipeline_graph import PipelineGraph
+
+
+def node_key(component, params, bindings):
+    """Cache key for a node's outputs: its component and template, parameters and upstream artifacts"""
+    return content_hash('node', component['id'], component.get('pythonTemplate'), params, sorted(bindings))
+
+
+def _nearest_producer(graph, node_id, port, outputs):
+    """Closest ancestor of node_id (breadth-first) whose declared outputs include port"""
+    seen = {node_id}
+    queue = deque(graph.predecessors[node_id])
+    while queue:
+        upstream = queue.popleft()
+        if upstream in seen:
+            continue
+        seen.add(upstream)
+        if port in outputs.get(upstream, ()):
+            return upstream
+        queue.extend(graph.predecessors[upstream])
+    return None
+
+
+def plan_nodes(nodes: List[Dict], edges: List[Dict]) -> Tuple[List[Dict], List[str]]:
+    """
+    Build (steps, errors) for a node-level run.
+
+    Steps are in topological order; nodes without a compiled template are
+    left out. Each step carries its rendered code, its outputs, its input
+    bindings and its cache key.
+    """
+    from app.utils.data_loader import component_registry
+
+    graph = PipelineGraph(nodes, edges)
+    steps, errors = [], []
+    outputs, keys = {}, {}
+
+    for node in graph.sorted_nodes():
+        component = component_registry.resolve(node)
+        template = component_registry.template_for(component)
+        if template is None:
+            continue
+        label = node.get('data', {}).get('label') or component.get('name')
+        params = node_parameters(node)
+
+        inputs = {}
+        for port in component.get('inputs', []):
+            upstream = _nearest_producer(graph, node['id'], port, outputs)
+            if upstream is None:
+                errors.append(f"{label}: input '{port}' is not produced by any upstream node")
+                continue
+            inputs[port] = {'node': upstream, 'key': keys[upstream], 'port': port}
+
+        bindings = [(port, source['key']) for port, source in inputs.items()]
+        key = node_key(component, params, bindings)
+        outputs[node['id']] = tuple(component.get('outputs', []))
+        keys[node['id']] = key
+        steps.append({
+            'id': node['id'],
+            'label': label,
+            'key': key,
+            'code': '\n'.join(template.imports(params)) + '\n' + template.render_body(params),
+            'inputs': inputs,
+            'outputs': list(outputs[node['id']])
+        })
+
+    return steps, errors
@@ -0,0 +1,156 @@
+"""
+Scheduler - Level-by-level parallel execution of a node-level run
+
+Steps that need to run (their outputs aren't cached) are grouped into
+levels: a step's level is one more than the deepest dirty step it reads
+from. Every step of a level is submitted to the worker pool at once and
+the next level starts when the whole level has finished, so independent
+branches (e.g. several classifiers trained off one split) run side by
+side and the run takes about as long as its slowest branch.
+"""
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List
+
+from app.execution import events, shared, worker
+
+
+def schedule_levels(steps: List[Dict], dirty_ids) -> List[List[Dict]]:
+    """Group the dirty steps (in topological order) into dependency levels"""
+    level_of = {}
+    levels = []
+    for step in steps:
+        if step['id'] not in dirty_ids:
+            continue
+        level = 1 + max(
+            (level_of[source['node']] for source in step['inputs'].values() if source['node'] in level_of),
+            default=-1
+        )
+        level_of[step['id']] = level
+        if level == len(levels):
+            levels.append([])
+        levels[level].append(step)
+    return levels
+
+
+class ParallelRun:
+    """
+    Drives one job through its levels from pool completion callbacks.
+
+    Outputs travel between levels as app.execution.shared descriptors and
+    all shared memory is released when the run ends.
+    """
+
+    def __init__(self, executor, job_id, steps, levels):
+        self.executor = executor
+        self.job_id = job_id
+        self.steps = steps
+        self.levels = levels
+        self.dirty = {step['id'] for level in levels for step in level}
+        self.results = {}
+        self.outputs = {}
+        self._lock = threading.Lock()
+        self._remaining = 0
+        self._started = None
+
+        # Ports each dirty step must export for dirty steps downstream
+        self.share = {step_id: set() for step_id in self.dirty}
+        for level in levels:
+            for step in level:
+                for source in step['inputs'].values():
+                    if source['node'] in self.dirty:
+                        self.share[source['node']].add(source['port'])
+
+    def start(self):
+        self._started = time.monotonic()
+        for step in self.steps:
+            if step['id'] not in self.dirty:
+                events.report(self.job_id, events.NODE, node=step['id'], status='cached')
+        self._submit_level(0)
+
+    def _input(self, source):
+        if source['node'] in self.dirty:
+            return self.outputs.get(source['node'], {}).get(source['port'])
+        return {'kind': 'artifact', 'key': source['key'], 'port': source['port']}
+
+    def _submit_level(self, index):
+        if index == len(self.levels):
+            self._complete()
+            return
+        level = self.levels[index]
+        self._remaining = len(level)
+        for step in level:
+            inputs = {port: self._input(source) for port, source in step['inputs'].items()}
+            events.report(self.job_id, events.NODE, node=step['id'], status='running')
+            try:
+                future = self.executor.pool_submit(
+                    worker.run_step, step, inputs, sorted(self.share[step['id']]), self.executor.limits,
+                    self.executor.artifact_root, self.executor.artifact_max_bytes, self.job_id
+                )
+            except Exception as e:
+                future = Future()
+                future.set_exception(e)
+            future.add_done_callback(lambda future, step=step: self._step_done(index, step, future))
+
+    def _step_done(self, index, step, future):
+        try:
+            result = future.result()
+        except BrokenProcessPool:
+            result = {'status': 'failed', 'error': 'Worker process crashed', 'stdout': ''}
+        except Exception as e:
+            result = {'status': 'failed', 'error': str(e), 'stdout': ''}
+        events.report(
+            self.job_id, events.NODE, node=step['id'],
+            status='executed' if result['status'] == 'succeeded' else 'failed', duration=result.get('duration')
+        )
+
+        with self._lock:
+            self.outputs[step['id']] = result.pop('outputs', {})
+            self.results[step['id']] = result
+            self._remaining -= 1
+            if self._remaining:
+                return
+
+        if all(self.results[s['id']]['status'] == 'succeeded' for s in self.levels[index]):
+            self._submit_level(index + 1)
+        else:
+            self._complete()
+
+    def _complete(self):
+        for outputs in self.outputs.values():
+            for descriptor in outputs.values():
+                shared.release(descriptor)
+
+        nodes, stdout = [], []
+        status, error = 'succeeded', None
+        for step in self.steps:
+            result = self.results.get(step['id'])
+            if step['id'] not in self.dirty:
+                nodes.append({'id': step['id'], 'status': 'cached'})
+            elif result is None:
+                nodes.append({'id': step['id'], 'status': 'skipped'})
+            else:
+                stdout.append(result.get('stdout', ''))
+                if result['status'] == 'succeeded':
+                    nodes.append({
+                        'id': step['id'], 'status': 'executed',
+                        'duration': result.get('duration'), 'stored': result.get('stored')
+                    })
+                else:
+                    nodes.append({'id': step['id'], 'status': 'failed', 'error': result.get('error')})
+                    if status == 'succeeded':
+                        status, error = result['status'], f"{step['label']}: {result.get('error')}"
+
+        finished = list(self.results.values())
+        self.executor.finish(self.job_id, {
+            'status': status,
+            'error': error,
+            'stdout': ''.join(stdout),
+            'truncated': any(result.get('truncated') for result in finished),
+            'duration': round(time.monotonic() - self._started, 3),
+            'cpu_time': round(sum(result.get('cpu_time') or 0 for result in finished), 3),
+            'nodes': nodes,
+            'levels': [[step['id'] for step in level] for level in self.levels]
+        })
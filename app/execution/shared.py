@@ -0,0 +1,122 @@
+"""
+Shared - Passes node outputs between workers, NumPy buffers through shared memory
+
+A producer exports each output another step needs to a small descriptor:
+
+- ndarray / homogeneous DataFrame / numeric Series: the values are copied
+  once into a SharedMemory block; consumers map it read-only, so parallel
+  branches read the same X_train/y_train without pickled copies
+- anything else (fitted models, mixed-dtype frames): pickled bytes
+- a cached upstream output: {'kind': 'artifact'}, loaded from the store
+
+On Python 3.11 attaching to a block registers it with the resource
+tracker (which pool workers share with the server), and an unregister from
+one of several sibling consumers would drop the producer's registration.
+So only the producer registers; consumers attach untracked, and release()
+unlinks the block (and unregisters it) once the run is over.
+"""
+import pickle
+from multiprocessing import resource_tracker, shared_memory
+
+try:
+    import numpy as np
+except ImportError:  # node outputs are then always pickled
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+
+def _attach_untracked(name):
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _shareable(array):
+    return array.dtype.kind in 'biufcmM' and array.nbytes > 0
+
+
+def _to_shared(array):
+    block = shared_memory.SharedMemory(create=True, size=array.nbytes)
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    view[...] = array
+    del view
+    name = block.name
+    block.close()
+    return {'shm': name, 'shape': array.shape, 'dtype': array.dtype.str}
+
+
+def export(value):
+    """Descriptor for a value, placing NumPy-backed data in shared memory"""
+    try:
+        if np is not None and isinstance(value, np.ndarray) and _shareable(value):
+            return dict(_to_shared(value), kind='ndarray')
+        if pd is not None and isinstance(value, pd.DataFrame) and value.shape[1] and len(set(value.dtypes)) == 1:
+            values = value.to_numpy()
+            if _shareable(values):
+                meta = pickle.dumps((value.columns, value.index), protocol=pickle.HIGHEST_PROTOCOL)
+                return dict(_to_shared(values), kind='frame', meta=meta)
+        if pd is not None and isinstance(value, pd.Series):
+            values = value.to_numpy()
+            if isinstance(values, np.ndarray) and _shareable(values):
+                meta = pickle.dumps((value.name, value.index), protocol=pickle.HIGHEST_PROTOCOL)
+                return dict(_to_shared(values), kind='series', meta=meta)
+    except OSError:
+        pass  # e.g. /dev/shm is full; fall back to pickling
+    return {'kind': 'pickle', 'data': pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)}
+
+
+def attach(descriptor, store, blocks, loaded):
+    """
+    Rebuild a value from its descriptor.
+
+    Attached blocks are appended to blocks (close them with close() when the
+    step is done); loaded caches artifact-store reads by key.
+    """
+    kind = descriptor['kind']
+    if kind == 'pickle':
+        return pickle.loads(descriptor['data'])
+    if kind == 'artifact':
+        key = descriptor['key']
+        if key not in loaded:
+            loaded[key] = store.get(key)
+        if loaded[key] is None:
+            raise RuntimeError('A cached upstream output was evicted during the run; run the pipeline again')
+        return loaded[key][descriptor['port']]
+
+    block = _attach_untracked(descriptor['shm'])
+    blocks.append(block)
+    array = np.ndarray(descriptor['shape'], dtype=np.dtype(descriptor['dtype']), buffer=block.buf)
+    array.flags.writeable = False
+    if kind == 'frame':
+        columns, index = pickle.loads(descriptor['meta'])
+        return pd.DataFrame(array, index=index, columns=columns, copy=False)
+    if kind == 'series':
+        name, index = pickle.loads(descriptor['meta'])
+        return pd.Series(array, index=index, name=name, copy=False)
+    return array
+
+
+def close(block):
+    try:
+        block.close()
+    except BufferError:
+        pass  # something (e.g. a fitted model) still holds a view; the mapping goes with the worker
+
+
+def release(descriptor):
+    """Destroy the shared memory behind a descriptor (no-op for other kinds)"""
+    if 'shm' not in descriptor:
+        return
+    try:
+        block = _attach_untracked(descriptor['shm'])
+    except FileNotFoundError:
+        return
+    block.close()
+    block.unlink()
@@ -0,0 +1,307 @@
+"""
+Worker - Runs generated pipeline code under resource limits
+
+Executed inside ProcessPoolExecutor workers. A worker runs several jobs
+before it is recycled, so limits are applied as soft rlimits around each
+job and restored afterwards:
+
+- CPU time: RLIMIT_CPU set relative to the worker's current usage; the
+  kernel's SIGXCPU is turned into an exception
+- Wall clock: SIGALRM
+- Address space: RLIMIT_AS (allocations fail with MemoryError)
+- Files: RLIMIT_FSIZE, with SIGXFSZ ignored so writes fail with EFBIG
+  instead of killing the worker; the job runs in a throwaway directory
+
+Only code generated server-side from a pipeline graph is run here, either
+as one script or node by node with cached intermediate outputs. Given a
+job id, progress and captured output are streamed as app.execution.events.
+
+This is not a sandbox: jobs run as the server's user, with its file system
+and network access. Untrusted input must not reach the generated code
+except as literals (see app.utils.code_generator.comment_text and the
+template slots), and loader paths are confined to the data directory
+before a run is queued (app.execution.data_paths); isolate the workers themselves (a dedicated user,
+container or network namespace) if that isn't enough.
+"""
+import contextlib
+import io
+import os
+import resource
+import signal
+import tempfile
+import time
+import traceback
+
+from app.execution import events
+
+SCRIPT_FILENAME = '<pipeline>'
+LOG_INTERVAL = 0.5  # seconds between streamed output chunks
+
+
+class LimitExceeded(BaseException):
+    """Raised from signal handlers; a BaseException so `except Exception` in user code can't swallow it"""
+
+
+class CPULimitExceeded(LimitExceeded):
+    pass
+
+
+class WallClockExceeded(LimitExceeded):
+    pass
+
+
+def _raiser(exc_type):
+    def handler(signum, frame):
+        raise exc_type()
+    return handler
+
+
+def init_worker(channel=None):
+    """ProcessPoolExecutor initializer; channel carries progress events back to the server"""
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    signal.signal(signal.SIGXFSZ, signal.SIG_IGN)
+    events.bind(channel)
+
+
+class OutputBuffer(io.TextIOBase):
+    """Captures stdout/stderr up to a character limit, streaming it as log events if given a job id"""
+
+    def __init__(self, limit, job_id=None):
+        self.limit = limit
+        self.size = 0
+        self.truncated = False
+        self.job_id = job_id
+        self._parts = []
+        self._sent = 0
+        self._last_sent = time.monotonic()
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        room = self.limit - self.size
+        if len(text) > room:
+            self.truncated = True
+            text = text[:max(room, 0)]
+        if text:
+            self._parts.append(text)
+            self.size += len(text)
+            if self.job_id is not None and text.endswith('\n') and time.monotonic() - self._last_sent >= LOG_INTERVAL:
+                self.send_log()
+        return len(text)
+
+    def send_log(self):
+        """Report output captured since the last call"""
+        if self.job_id is not None and self._sent < len(self._parts):
+            events.report(self.job_id, events.LOG, text=''.join(self._parts[self._sent:]))
+            self._sent = len(self._parts)
+        self._last_sent = time.monotonic()
+
+    def getvalue(self):
+        return ''.join(self._parts)
+
+
+@contextlib.contextmanager
+def _soft_limit(kind, soft):
+    """Lower a soft rlimit for the duration of the block"""
+    if soft is None:
+        yield
+        return
+    previous, hard = resource.getrlimit(kind)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(kind, (soft, hard))
+    try:
+        yield
+    finally:
+        resource.setrlimit(kind, (previous, hard))
+
+
+def _cpu_used():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _format_error(exc):
+    """Traceback limited to frames from the pipeline script itself"""
+    tb = exc.__traceback__
+    while tb is not None and tb.tb_frame.f_code.co_filename != SCRIPT_FILENAME:
+        tb = tb.tb_next
+    return ''.join(traceback.format_exception(type(exc), exc, tb))
+
+
+def _limited(body, limits, job_id=None):
+    """
+    Call body() under the job limits with stdout/stderr captured.
+
+    limits keys: timeout, cpu_seconds, memory_bytes, file_bytes, max_output
+    (None disables a limit).
+    """
+    started = time.monotonic()
+    cpu_started = _cpu_used()
+    output = OutputBuffer(limits.get('max_output') or 64 * 1024, job_id)
+    status, error = 'succeeded', None
+
+    timeout = limits.get('timeout')
+    cpu_seconds = limits.get('cpu_seconds')
+    cpu_limit = int(cpu_started + cpu_seconds) + 1 if cpu_seconds else None
+
+    cwd = os.getcwd()
+    handlers = {
+        signal.SIGXCPU: signal.signal(signal.SIGXCPU, _raiser(CPULimitExceeded)),
+        signal.SIGALRM: signal.signal(signal.SIGALRM, _raiser(WallClockExceeded)),
+    }
+    try:
+        with tempfile.TemporaryDirectory(prefix='dominoml-job-') as workdir:
+            os.chdir(workdir)
+            try:
+                with _soft_limit(resource.RLIMIT_CPU, cpu_limit), \
+                        _soft_limit(resource.RLIMIT_AS, limits.get('memory_bytes')), \
+                        _soft_limit(resource.RLIMIT_FSIZE, limits.get('file_bytes')), \
+                        contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                    if timeout:
+                        signal.alarm(int(timeout))
+                    try:
+                        body()
+                    finally:
+                        signal.alarm(0)
+            except WallClockExceeded:
+                status, error = 'timeout', f'Time limit of {timeout}s exceeded'
+            except CPULimitExceeded:
+                status, error = 'timeout', f'CPU limit of {cpu_seconds}s exceeded'
+            except MemoryError:
+                status, error = 'failed', 'Memory limit exceeded'
+            except SystemExit as e:
+                if e.code not in (None, 0):
+                    status, error = 'failed', f'Exited with status {e.code}'
+            except BaseException as e:
+                status, error = 'failed', _format_error(e)
+            finally:
+                os.chdir(cwd)
+    finally:
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
+    output.send_log()
+
+    return {
+        'status': status,
+        'error': error,
+        'stdout': output.getvalue(),
+        'truncated': output.truncated,
+        'duration': round(time.monotonic() - started, 3),
+        'cpu_time': round(_cpu_used() - cpu_started, 3)
+    }
+
+
+def run_script(script, limits, job_id=None):
+    """Execute a generated pipeline script as __main__ and return a result dict"""
+    def body():
+        code = compile(script, SCRIPT_FILENAME, 'exec')
+        exec(code, {'__name__': '__main__', '__file__': SCRIPT_FILENAME})
+
+    return _limited(body, limits, job_id)
+
+
+def run_nodes(steps, limits, artifact_root, artifact_max_bytes, job_id=None):
+    """
+    Execute planner steps node by node, reusing cached outputs.
+
+    A step whose key is already in the artifact store is not run, and its
+    outputs are only loaded if a step that does run needs them (an evicted
+    upstream artifact is recomputed on demand). The result gains a 'nodes'
+    list with each step's status: cached, executed, failed or skipped.
+    """
+    from app.execution.artifacts import ArtifactStore
+
+    store = ArtifactStore(artifact_root, artifact_max_bytes)
+    by_id = {step['id']: step for step in steps}
+    values = {}
+    report = {}
+
+    def outputs_of(step):
+        if step['id'] in values:
+            return values[step['id']]
+        cached = store.get(step['key'])
+        if cached is not None:
+            values[step['id']] = cached
+            return cached
+        return execute(step)
+
+    def execute(step):
+        namespace = {'__name__': '__main__', '__file__': SCRIPT_FILENAME}
+        for port, source in step['inputs'].items():
+            upstream = outputs_of(by_id[source['node']])
+            if source['port'] not in upstream:
+                raise RuntimeError(f"{by_id[source['node']]['label']} did not produce '{source['port']}'")
+            namespace[port] = upstream[source['port']]
+
+        print(f"Step: {step['label']}")
+        report[step['id']] = {'id': step['id'], 'status': 'failed'}
+        events.report(job_id, events.NODE, node=step['id'], status='running')
+        started = time.monotonic()
+        exec(compile(step['code'], SCRIPT_FILENAME, 'exec'), namespace)
+        outputs = {port: namespace[port] for port in step['outputs'] if port in namespace}
+        report[step['id']] = {
+            'id': step['id'],
+            'status': 'executed',
+            'duration': round(time.monotonic() - started, 3),
+            'stored': store.put(step['key'], outputs)
+        }
+        events.report(job_id, events.NODE, node=step['id'], status='executed',
+                      duration=report[step['id']]['duration'])
+        values[step['id']] = outputs
+        return outputs
+
+    def body():
+        for step in steps:
+            if step['id'] in report:
+                continue
+            if store.has(step['key']):
+                report[step['id']] = {'id': step['id'], 'status': 'cached'}
+                events.report(job_id, events.NODE, node=step['id'], status='cached')
+            else:
+                execute(step)
+
+    result = _limited(body, limits, job_id)
+    result['nodes'] = [report.get(step['id'], {'id': step['id'], 'status': 'skipped'}) for step in steps]
+    return result
+
+
+def run_step(step, inputs, share, limits, artifact_root, artifact_max_bytes, job_id=None):
+    """
+    Execute one planner step as part of a parallel run.
+
+    inputs maps each input port to a descriptor from app.execution.shared
+    (None if the upstream step didn't assign it). Outputs are stored in the
+    artifact store, and those listed in share are exported for the steps
+    that consume them; the result gains 'outputs' and 'stored'.
+    """
+    from app.execution import shared
+    from app.execution.artifacts import ArtifactStore
+
+    store = ArtifactStore(artifact_root, artifact_max_bytes)
+    blocks, loaded, produced = [], {}, {}
+
+    def body():
+        namespace = {'__name__': '__main__', '__file__': SCRIPT_FILENAME}
+        for port, descriptor in inputs.items():
+            if descriptor is None:
+                raise RuntimeError(f"{step['label']}: input '{port}' was not produced upstream")
+            namespace[port] = shared.attach(descriptor, store, blocks, loaded)
+
+        print(f"Step: {step['label']}")
+        exec(compile(step['code'], SCRIPT_FILENAME, 'exec'), namespace)
+        outputs = {port: namespace[port] for port in step['outputs'] if port in namespace}
+        produced['stored'] = store.put(step['key'], outputs)
+        produced['outputs'] = {port: shared.export(outputs[port]) for port in share if port in outputs}
+
+    result = _limited(body, limits, job_id)
+    loaded.clear()
+    for block in blocks:
+        shared.close(block)
+    if result['status'] != 'succeeded':
+        for descriptor in produced.get('outputs', {}).values():
+            shared.release(descriptor)
+        produced.pop('outputs', None)
+    result.update(produced)
+    return result
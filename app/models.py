@@ -1,12 +1,12 @@
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 from app import db, login_manager
 import json
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    from app.utils.user_cache import user_cache
+    return user_cache.get(int(user_id))
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -24,14 +24,34 @@ class User(UserMixin, db.Model):
     owned_classrooms = db.relationship('Classroom', backref='owner', lazy='dynamic')
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        from app.utils.passwords import passwords
+        self.password_hash = passwords.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        from app.utils.passwords import passwords
+        return passwords.verify(self.password_hash, password)
 
     def __repr__(self):
         return f'<User {self.username}>'
 
+
+@db.event.listens_for(User, 'after_update')
+@db.event.listens_for(User, 'after_delete')
+def _invalidate_cached_user(mapper, connection, target):
+    # Drop it now, and again once committed in case it was reloaded meanwhile
+    from app.utils.user_cache import user_cache
+    user_cache.invalidate(target.id)
+    session = db.object_session(target)
+    if session is not None:
+        session.info.setdefault('changed_user_ids', set()).add(target.id)
+
+
+@db.event.listens_for(db.session, 'after_commit')
+def _invalidate_committed_users(session):
+    from app.utils.user_cache import user_cache
+    for user_id in session.info.pop('changed_user_ids', ()):
+        user_cache.invalidate(user_id)
+
 # --- LMS MODELS ---
 
 class Classroom(db.Model):
@@ -98,6 +118,11 @@ class Submission(db.Model):
 # --- EXISTING MODELS ---
 
 class SavedModel(db.Model):
+    __table_args__ = (
+        # Keyset pagination of a user's models by (updated_at, id)
+        db.Index('idx_saved_model_user_updated', 'user_id', 'updated_at', 'id'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
@@ -109,6 +134,14 @@ class SavedModel(db.Model):
     is_public = db.Column(db.Boolean, default=False)
     tags = db.Column(db.String(500))
     
+    # Graph summary, maintained on write so listings/search never parse nodes/edges
+    # (see app.utils.pipeline_summary)
+    node_count = db.Column(db.Integer)
+    edge_count = db.Column(db.Integer)
+    component_ids = db.Column(db.String(1000))  # ',csv-loader,pca,'
+    content_hash = db.Column(db.String(64), index=True)
+    byte_size = db.Column(db.Integer)
+    
     # Version tracking
     versions = db.relationship('PipelineVersion', backref='pipeline', lazy='dynamic', cascade='all, delete-orphan')
     
@@ -116,6 +149,20 @@ class SavedModel(db.Model):
     lab_templates = db.relationship('Classwork', backref='lab_template', lazy='dynamic', foreign_keys='Classwork.lab_model_id')
     student_submissions = db.relationship('Submission', backref='submitted_model', lazy='dynamic', foreign_keys='Submission.submission_model_id')
 
+    def is_viewable_by(self, user_id):
+        """Owner, or teacher of a classroom the model was submitted to (a single EXISTS query)"""
+        if self.user_id == user_id:
+            return True
+        submitted_to_class = db.session.query(Submission.id).join(
+            Classwork, Classwork.id == Submission.classwork_id
+        ).join(
+            Classroom, Classroom.id == Classwork.classroom_id
+        ).filter(
+            Submission.submission_model_id == self.id,
+            Classroom.owner_id == user_id
+        ).exists()
+        return db.session.query(submitted_to_class).scalar()
+
     def __repr__(self):
         return f'<SavedModel {self.name}>'
 
@@ -139,14 +186,36 @@ class PipelineVersion(db.Model):
     is_active = db.Column(db.Boolean, default=False)
     parent_version_id = db.Column(db.Integer, db.ForeignKey('pipeline_versions.id'))
     
+    # Delta storage (see app.utils.version_store): 'full' rows hold nodes/edges/generated_code,
+    # 'delta' rows hold a JSON delta against base_version_id and leave them empty
+    storage_format = db.Column(db.String(10), default='full')
+    base_version_id = db.Column(db.Integer, db.ForeignKey('pipeline_versions.id'), index=True)
+    delta_depth = db.Column(db.Integer, default=0)
+    delta = db.Column(db.Text)
+    
+    # Graph summary, maintained on write (see app.utils.pipeline_summary)
+    node_count = db.Column(db.Integer)
+    edge_count = db.Column(db.Integer)
+    component_ids = db.Column(db.String(1000))
+    content_hash = db.Column(db.String(64), index=True)
+    byte_size = db.Column(db.Integer)
+    
     # Relationships
-    parent = db.relationship('PipelineVersion', remote_side=[id], backref='children')
+    parent = db.relationship('PipelineVersion', remote_side=[id], backref='children',
+                             foreign_keys=[parent_version_id])
     metrics = db.relationship('ModelMetric', backref='version', lazy='dynamic', cascade='all, delete-orphan')
     tags_rel = db.relationship('VersionTag', backref='version', lazy='dynamic', cascade='all, delete-orphan')
     comments = db.relationship('VersionComment', backref='version', lazy='dynamic', cascade='all, delete-orphan')
+    metric_aggregates = db.relationship('MetricAggregate', backref='version', lazy='dynamic', cascade='all, delete-orphan')
+    
+    def graph(self):
+        """(nodes, edges, generated_code), reconstructed from deltas if needed"""
+        from app.utils.version_store import materialize
+        return materialize(self)
     
     def to_dict(self):
         """Convert to dictionary for JSON serialization"""
+        nodes, edges, _ = self.graph()
         return {
             'id': self.id,
             'pipeline_id': self.pipeline_id,
@@ -154,13 +223,16 @@ class PipelineVersion(db.Model):
             'version_tag': self.version_tag,
             'name': self.name,
             'description': self.description,
-            'nodes': json.loads(self.nodes) if self.nodes else [],
-            'edges': json.loads(self.edges) if self.edges else [],
+            'nodes': nodes,
+            'edges': edges,
             'metadata': json.loads(self.meta_data) if self.meta_data else {},
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'is_active': self.is_active,
             'created_by': self.created_by,
-            'parent_version_id': self.parent_version_id
+            'parent_version_id': self.parent_version_id,
+            'node_count': self.node_count,
+            'edge_count': self.edge_count,
+            'content_hash': self.content_hash
         }
     
     def __repr__(self):
@@ -170,6 +242,10 @@ class PipelineVersion(db.Model):
 class ModelMetric(db.Model):
     """Metrics for model experiments"""
     __tablename__ = 'model_metrics'
+    __table_args__ = (
+        # Time-series reads filter by version and metric, ordered by epoch
+        db.Index('idx_model_metrics_version_name_epoch', 'version_id', 'metric_name', 'epoch'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     version_id = db.Column(db.Integer, db.ForeignKey('pipeline_versions.id'), nullable=False)
@@ -196,6 +272,48 @@ class ModelMetric(db.Model):
         return f'<ModelMetric {self.metric_name}={self.metric_value}>'
 
 
+class MetricAggregate(db.Model):
+    """Running aggregates per (version, metric name, metric type), updated as metrics arrive"""
+    __tablename__ = 'metric_aggregates'
+    __table_args__ = (
+        db.UniqueConstraint('version_id', 'metric_name', 'metric_type', name='uq_metric_aggregate'),
+        # Leaderboards look up one metric across all versions
+        db.Index('idx_metric_aggregates_name', 'metric_name', 'metric_type'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version_id = db.Column(db.Integer, db.ForeignKey('pipeline_versions.id'), nullable=False)
+    metric_name = db.Column(db.String(100), nullable=False)
+    metric_type = db.Column(db.String(50))
+    count = db.Column(db.Integer, default=0)  # non-null values
+    sum_value = db.Column(db.Float, default=0.0)
+    min_value = db.Column(db.Float)
+    max_value = db.Column(db.Float)
+    last_value = db.Column(db.Float)  # value at the highest epoch, latest arrival on ties
+    last_epoch = db.Column(db.Integer)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    @property
+    def mean_value(self):
+        return self.sum_value / self.count if self.count else None
+    
+    def to_dict(self):
+        return {
+            'version_id': self.version_id,
+            'metric_name': self.metric_name,
+            'metric_type': self.metric_type,
+            'count': self.count,
+            'last': self.last_value,
+            'last_epoch': self.last_epoch,
+            'min': self.min_value,
+            'max': self.max_value,
+            'mean': self.mean_value
+        }
+    
+    def __repr__(self):
+        return f'<MetricAggregate {self.version_id}:{self.metric_name}>'
+
+
 class VersionTag(db.Model):
     """Tags for version releases (production, staging, etc.)"""
     __tablename__ = 'version_tags'
@@ -240,3 +358,50 @@ class VersionComment(db.Model):
     
     def __repr__(self):
         return f'<VersionComment {self.id}>'
+
+
+class BackgroundJob(db.Model):
+    """
+    A pipeline run or export handed to the execution pool.
+
+    The table doubles as the job queue (see app.execution.jobs): rows are
+    claimed oldest first while status is 'queued'.
+    """
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('idx_jobs_status_created', 'status', 'created_at'),
+    )
+    
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    pipeline_id = db.Column(db.Integer)  # SavedModel id, when the job belongs to a saved pipeline
+    kind = db.Column(db.String(20), nullable=False)  # 'run' or 'export'
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    payload = db.Column(db.Text, nullable=False)  # JSON task for the executor
+    progress = db.Column(db.Text)  # JSON {node_id: status}
+    result = db.Column(db.Text)  # JSON
+    error = db.Column(db.Text)
+    worker = db.Column(db.String(120))  # host:pid of the server process running it
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        data = {
+            'id': self.id,
+            'pipeline_id': self.pipeline_id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': json.loads(self.progress) if self.progress else {},
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+        if self.result:
+            data.update({key: value for key, value in json.loads(self.result).items() if key != 'status'})
+        elif self.error:
+            data['error'] = self.error
+        return data
+    
+    def __repr__(self):
+        return f'<BackgroundJob {self.id} {self.status}>'
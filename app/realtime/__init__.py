@@ -0,0 +1,7 @@
+"""
+Realtime - Server-side state for collaborative pipeline editing
+"""
+from app.realtime.bus import BusManager, LocalBus, MessageBus, SQLiteBus, create_bus
+from app.realtime.document import OpError, PipelineDocument
+from app.realtime.engine import CollaborationEngine, engine
+from app.realtime.presence import Presence, presence
@@ -0,0 +1,231 @@
+"""
+Bus - Message bus shared by the server processes
+
+Lets several server processes (e.g. gunicorn workers) act as one
+Socket.IO server:
+- BusManager plugs a bus into Socket.IO as its client manager, the way
+  Flask-SocketIO's message_queue does for Redis, so an emit to a room
+  reaches members connected to any process.
+- Leases give every open pipeline a single owning process, which holds
+  its authoritative document (see app.realtime.engine); other processes
+  forward commands to the owner's channel.
+
+LocalBus keeps everything in memory for a single process. SQLiteBus shares
+one SQLite file between the processes of a box, configured with
+COLLAB_BUS_URL = 'sqlite:////var/run/dominoml/bus.db'.
+"""
+import base64
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Iterator, Optional
+
+from socketio import PubSubManager
+
+
+class MessageBus(ABC):
+    """
+    Interface for a bus. Messages are strings. listen() subscribes when it
+    is called and returns an iterator of the messages published from then
+    on, which calls sleep() while waiting so other green threads run.
+    """
+
+    shared = False  # True if other processes see the same channels and leases
+
+    @abstractmethod
+    def publish(self, channel: str, message: str) -> None:
+        """Deliver message to everyone listening on channel"""
+
+    @abstractmethod
+    def listen(self, channel: str, sleep: Callable[[float], None]) -> Iterator[str]:
+        """Subscribe to channel; see the class docstring"""
+
+    @abstractmethod
+    def claim(self, key: str, owner: str, ttl: float) -> str:
+        """Take or renew the lease on key unless someone else holds it; returns the holder"""
+
+    @abstractmethod
+    def owner(self, key: str) -> Optional[str]:
+        """Current holder of key, if the lease hasn't expired"""
+
+    @abstractmethod
+    def release(self, key: str, owner: str) -> None:
+        """Drop the lease on key if owner holds it"""
+
+
+class LocalBus(MessageBus):
+    def __init__(self, poll_interval=0.02):
+        self.poll_interval = poll_interval
+        self._subscribers = {}  # channel -> [deque]
+        self._leases = {}  # key -> (owner, expires at)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            for queue in self._subscribers.get(channel, ()):
+                queue.append(message)
+
+    def listen(self, channel, sleep):
+        queue = deque()
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(queue)
+        return self._drain(channel, queue, sleep)
+
+    def _drain(self, channel, queue, sleep):
+        try:
+            while True:
+                while queue:
+                    yield queue.popleft()
+                sleep(self.poll_interval)
+        finally:
+            with self._lock:
+                self._subscribers[channel].remove(queue)
+
+    def claim(self, key, owner, ttl):
+        now = time.time()
+        with self._lock:
+            holder, expires_at = self._leases.get(key, (None, 0))
+            if holder is None or holder == owner or expires_at < now:
+                holder = owner
+                self._leases[key] = (owner, now + ttl)
+            return holder
+
+    def owner(self, key):
+        with self._lock:
+            holder, expires_at = self._leases.get(key, (None, 0))
+            return holder if expires_at >= time.time() else None
+
+    def release(self, key, owner):
+        with self._lock:
+            if self._leases.get(key, (None,))[0] == owner:
+                del self._leases[key]
+
+
+class SQLiteBus(MessageBus):
+    """
+    Bus in a SQLite file (WAL mode), for processes on one machine.
+
+    Listeners poll for new rows every poll_interval; messages older than
+    retention seconds are deleted as new ones are published.
+    """
+
+    shared = True
+
+    def __init__(self, path, poll_interval=0.02, retention=60):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._published = 0
+        self._connection = None
+        self._pid = None
+
+    @property
+    def _db(self):
+        # One connection per process; a connection must not cross a fork
+        if self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            self._pid = os.getpid()
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS bus_messages ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL, '
+                'payload TEXT NOT NULL, created_at REAL NOT NULL)'
+            )
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS idx_bus_messages_channel ON bus_messages (channel, id)'
+            )
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS bus_leases ('
+                'key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+        return self._connection
+
+    def publish(self, channel, message):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO bus_messages (channel, payload, created_at) VALUES (?, ?, ?)',
+                (channel, message, now)
+            )
+            self._published += 1
+            if self._published % 1000 == 0:
+                self._db.execute('DELETE FROM bus_messages WHERE created_at < ?', (now - self.retention,))
+
+    def listen(self, channel, sleep):
+        with self._lock:
+            last_id = self._db.execute('SELECT COALESCE(MAX(id), 0) FROM bus_messages').fetchone()[0]
+        return self._poll(channel, last_id, sleep)
+
+    def _poll(self, channel, last_id, sleep):
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    'SELECT id, payload FROM bus_messages WHERE channel = ? AND id > ? ORDER BY id LIMIT 500',
+                    (channel, last_id)
+                ).fetchall()
+            for last_id, payload in rows:
+                yield payload
+            if not rows:
+                sleep(self.poll_interval)
+
+    def claim(self, key, owner, ttl):
+        now = time.time()
+        with self._lock:
+            # A single upsert, so two processes can't both take an expired lease
+            self._db.execute(
+                'INSERT INTO bus_leases (key, owner, expires_at) VALUES (?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at '
+                'WHERE bus_leases.owner = excluded.owner OR bus_leases.expires_at < ?',
+                (key, owner, now + ttl, now)
+            )
+            return self._db.execute('SELECT owner FROM bus_leases WHERE key = ?', (key,)).fetchone()[0]
+
+    def owner(self, key):
+        with self._lock:
+            row = self._db.execute(
+                'SELECT owner FROM bus_leases WHERE key = ? AND expires_at >= ?', (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def release(self, key, owner):
+        with self._lock:
+            self._db.execute('DELETE FROM bus_leases WHERE key = ? AND owner = ?', (key, owner))
+
+
+def create_bus(url: Optional[str]) -> MessageBus:
+    """Bus for a COLLAB_BUS_URL: empty or 'local://' for LocalBus, 'sqlite:///<path>' for SQLiteBus"""
+    if not url or url == 'local://':
+        return LocalBus()
+    if url.startswith('sqlite:///'):
+        return SQLiteBus(url[len('sqlite:///'):])
+    raise ValueError(f'Unsupported COLLAB_BUS_URL {url!r}')
+
+
+class BusManager(PubSubManager):
+    """
+    Socket.IO client manager that shares rooms and emits between processes
+    over a MessageBus.
+
+    Messages are pickled, like the message queues Flask-SocketIO ships
+    with, so binary payloads (the cursors message) cross the bus intact.
+    """
+
+    name = 'dominoml-bus'
+
+    def __init__(self, bus, channel='socketio', write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.bus = bus
+
+    def _publish(self, data):
+        # Bus messages are strings
+        self.bus.publish(self.channel, base64.b64encode(pickle.dumps(data)).decode('ascii'))
+
+    def _listen(self):
+        for message in self.bus.listen(self.channel, self.server.sleep):
+            yield pickle.loads(base64.b64decode(message))
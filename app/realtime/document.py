@@ -0,0 +1,239 @@
+"""
+Document - Authoritative pipeline graph for a collaboration room
+
+Clients send small operations instead of the whole canvas:
+
+    {"op": "add_node", "node": {"id", "position": {"x", "y"}, "data": {...}}}
+    {"op": "move_node", "id", "position": {"x", "y"}}
+    {"op": "delete_node", "id"}          (also drops the node's edges)
+    {"op": "connect", "edge": {"id", "source", "target", ...}}
+    {"op": "disconnect", "id"}
+    {"op": "set_param", "id", "name", "value"}
+    {"op": "replace", "nodes": [...], "edges": [...]}   (whole graph)
+
+Every applied operation bumps the document version. Applied operations
+collect in a pending batch until the room's next tick, and a newer move
+of a node or value of a parameter replaces the pending one in place, so a
+drag or a slider burst goes out as a single operation.
+"""
+import copy
+import math
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.utils.hashing import canonical_json
+
+MAX_ID_LENGTH = 100
+MAX_ITEM_BYTES = 16 * 1024  # serialized node, edge or parameter value
+MAX_NODES = 1000
+MAX_EDGES = 4000
+
+
+class OpError(ValueError):
+    """An operation that is malformed or doesn't apply to the current document"""
+
+
+def _check_id(value, what='id'):
+    if not isinstance(value, str) or not value or len(value) > MAX_ID_LENGTH:
+        raise OpError(f'{what} must be a non-empty string of at most {MAX_ID_LENGTH} characters')
+    return value
+
+
+def _check_size(value, what):
+    try:
+        size = len(canonical_json(value))
+    except (TypeError, ValueError):
+        raise OpError(f'{what} is not JSON')
+    if size > MAX_ITEM_BYTES:
+        raise OpError(f'{what} is larger than {MAX_ITEM_BYTES} bytes')
+
+
+def _position(value):
+    if not isinstance(value, dict):
+        raise OpError('position must be an object with x and y')
+    try:
+        x, y = float(value['x']), float(value['y'])
+    except (KeyError, TypeError, ValueError):
+        raise OpError('position must be an object with numeric x and y')
+    if not (math.isfinite(x) and math.isfinite(y)):
+        raise OpError('position must be finite')
+    # One decimal is plenty for canvas coordinates and keeps batches small
+    return {'x': round(x, 1), 'y': round(y, 1)}
+
+
+def _node(value):
+    if not isinstance(value, dict):
+        raise OpError('node must be an object')
+    _check_size(value, 'node')
+    node = dict(value)
+    node['id'] = _check_id(node.get('id'), 'node id')
+    node['position'] = _position(node.get('position', {'x': 0, 'y': 0}))
+    data = node.setdefault('data', {})
+    if not isinstance(data, dict):
+        raise OpError('node data must be an object')
+    if not isinstance(data.setdefault('parameters', {}), dict):
+        raise OpError('node parameters must be an object')
+    return node
+
+
+def _edge(value):
+    if not isinstance(value, dict):
+        raise OpError('edge must be an object')
+    _check_size(value, 'edge')
+    edge = dict(value)
+    edge['id'] = _check_id(edge.get('id'), 'edge id')
+    edge['source'] = _check_id(edge.get('source'), 'edge source')
+    edge['target'] = _check_id(edge.get('target'), 'edge target')
+    return edge
+
+
+class PipelineDocument:
+    def __init__(self, nodes: List[Dict], edges: List[Dict], version: int = 0):
+        self.version = version
+        self.nodes = OrderedDict()
+        self.edges = OrderedDict()
+        self._load(nodes, edges)
+        self.pending = []
+        self._pending_from = version
+        self._coalesce = {}  # ('move', id) / ('param', id, name) -> index in pending
+
+    def _load(self, nodes, edges):
+        """Replace the graph, skipping entries that don't validate (e.g. legacy data)"""
+        self.nodes.clear()
+        self.edges.clear()
+        for value in (nodes or [])[:MAX_NODES]:
+            try:
+                node = _node(value)
+            except OpError:
+                continue
+            self.nodes[node['id']] = node
+        for value in (edges or [])[:MAX_EDGES]:
+            try:
+                edge = _edge(value)
+            except OpError:
+                continue
+            if edge['source'] in self.nodes and edge['target'] in self.nodes:
+                self.edges[edge['id']] = edge
+
+    def snapshot(self) -> Dict:
+        """Copy of the graph; later operations don't change it"""
+        return {
+            'version': self.version,
+            'nodes': copy.deepcopy(list(self.nodes.values())),
+            'edges': copy.deepcopy(list(self.edges.values()))
+        }
+
+    def apply(self, op: Dict, user_id: Optional[int] = None) -> Dict:
+        """
+        Validate and apply one operation, queueing it for the next batch.
+
+        Returns the normalized operation; raises OpError without changing
+        the document if it doesn't apply.
+        """
+        if not isinstance(op, dict):
+            raise OpError('operation must be an object')
+        kind = op.get('op')
+        handler = getattr(self, f'_apply_{kind}', None) if isinstance(kind, str) else None
+        if handler is None:
+            raise OpError(f'unknown operation {kind!r}')
+        applied, coalesce_key = handler(op)
+        self.version += 1
+        applied['v'] = self.version
+        if user_id is not None:
+            applied['by'] = user_id
+        self._queue(applied, coalesce_key)
+        return applied
+
+    def _queue(self, applied, coalesce_key):
+        if coalesce_key is not None and coalesce_key in self._coalesce:
+            self.pending[self._coalesce[coalesce_key]] = applied
+            return
+        if coalesce_key is not None:
+            self._coalesce[coalesce_key] = len(self.pending)
+        self.pending.append(applied)
+
+    def _forget(self, node_id):
+        """Stop coalescing into ops queued before node_id was added or removed"""
+        for key in [key for key in self._coalesce if key[1] == node_id]:
+            del self._coalesce[key]
+
+    def take_pending(self) -> Tuple[int, List[Dict]]:
+        """
+        (version the batch starts after, operations) and start a new batch.
+
+        Coalesced operations keep the place of the one they replaced, so
+        they are listed in the order to apply them, not by version.
+        """
+        ops, self.pending = self.pending, []
+        first, self._pending_from = self._pending_from, self.version
+        self._coalesce.clear()
+        return first, ops
+
+    # --- Operations ---
+
+    def _node_for(self, op):
+        node_id = _check_id(op.get('id'), 'node id')
+        if node_id not in self.nodes:
+            raise OpError(f'no node {node_id!r}')
+        return node_id, self.nodes[node_id]
+
+    def _apply_add_node(self, op):
+        node = _node(op.get('node'))
+        if node['id'] in self.nodes:
+            raise OpError(f"node {node['id']!r} already exists")
+        if len(self.nodes) >= MAX_NODES:
+            raise OpError(f'a pipeline holds at most {MAX_NODES} nodes')
+        self.nodes[node['id']] = node
+        self._forget(node['id'])
+        return {'op': 'add_node', 'node': copy.deepcopy(node)}, None
+
+    def _apply_move_node(self, op):
+        node_id, node = self._node_for(op)
+        node['position'] = _position(op.get('position'))
+        return {'op': 'move_node', 'id': node_id, 'position': node['position']}, ('move', node_id)
+
+    def _apply_delete_node(self, op):
+        node_id, _ = self._node_for(op)
+        del self.nodes[node_id]
+        removed = [edge_id for edge_id, edge in self.edges.items() if node_id in (edge['source'], edge['target'])]
+        for edge_id in removed:
+            del self.edges[edge_id]
+        self._forget(node_id)
+        return {'op': 'delete_node', 'id': node_id, 'edges': removed}, None
+
+    def _apply_connect(self, op):
+        edge = _edge(op.get('edge'))
+        if edge['id'] in self.edges:
+            raise OpError(f"edge {edge['id']!r} already exists")
+        for end in ('source', 'target'):
+            if edge[end] not in self.nodes:
+                raise OpError(f'no node {edge[end]!r}')
+        if len(self.edges) >= MAX_EDGES:
+            raise OpError(f'a pipeline holds at most {MAX_EDGES} edges')
+        self.edges[edge['id']] = edge
+        return {'op': 'connect', 'edge': copy.deepcopy(edge)}, None
+
+    def _apply_disconnect(self, op):
+        edge_id = _check_id(op.get('id'), 'edge id')
+        if self.edges.pop(edge_id, None) is None:
+            raise OpError(f'no edge {edge_id!r}')
+        return {'op': 'disconnect', 'id': edge_id}, None
+
+    def _apply_set_param(self, op):
+        node_id, node = self._node_for(op)
+        name = _check_id(op.get('name'), 'parameter name')
+        value = op.get('value')
+        _check_size(value, 'parameter value')
+        node['data']['parameters'][name] = value
+        return {'op': 'set_param', 'id': node_id, 'name': name, 'value': value}, ('param', node_id, name)
+
+    def _apply_replace(self, op):
+        nodes, edges = op.get('nodes'), op.get('edges')
+        if not isinstance(nodes, list) or not isinstance(edges, list):
+            raise OpError('replace needs nodes and edges lists')
+        self._load(nodes, edges)
+        # Nothing queued before a replace matters any more
+        self.pending = []
+        self._coalesce.clear()
+        snapshot = self.snapshot()
+        return {'op': 'replace', 'nodes': snapshot['nodes'], 'edges': snapshot['edges']}, None
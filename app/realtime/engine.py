@@ -0,0 +1,419 @@
+"""
+Engine - Server-side collaboration rooms for the pipeline builder
+
+Each open pipeline has one room holding the authoritative PipelineDocument.
+Editors send operation deltas (see app.realtime.document); the engine
+applies them in arrival order, and a Socket.IO background task broadcasts
+whatever was applied since the last tick as one canvas_ops batch to the
+pipeline_<id> room on the /builder namespace. Rooms are written back to
+their SavedModel every checkpoint interval while they have changes, once
+more when the last member leaves (a room is only closed after that write
+succeeds) and at exit.
+
+With several server processes, a pipeline's room lives in whichever
+process holds its lease on the message bus (app.realtime.bus). Socket
+handlers in any process turn requests into commands and hand them to
+that owner, locally or over the owner's bus channel; the owner answers
+the client directly (canvas_state, canvas_ack, canvas_error), which the
+bus-backed Socket.IO client manager delivers wherever it is connected.
+Presence routes its own commands to the owner the same way (see register).
+"""
+import atexit
+import json
+import os
+import socket
+import threading
+import time
+from typing import Dict, List, Optional
+
+from app.realtime.bus import LocalBus
+from app.realtime.document import OpError, PipelineDocument
+
+NAMESPACE = '/builder'
+MAX_OPS_PER_MESSAGE = 200
+CHECKPOINT_RETRY_SECONDS = 1
+
+
+def room_name(pipeline_id):
+    return f'pipeline_{pipeline_id}'
+
+
+def lease_key(pipeline_id):
+    return f'pipeline:{pipeline_id}'
+
+
+class _Room:
+    def __init__(self, pipeline_id, document):
+        self.pipeline_id = pipeline_id
+        self.document = document
+        self.members = {}  # sid -> (user id, may edit)
+        self.dirty = False
+        self.checkpointed_at = time.monotonic()
+        self.retry_at = 0.0
+        self.renewed_at = time.monotonic()
+
+
+class CollaborationEngine:
+    def __init__(self, tick_seconds=0.05, checkpoint_seconds=10, lease_seconds=10, bus=None):
+        self.tick_seconds = tick_seconds
+        self.checkpoint_seconds = checkpoint_seconds
+        self.lease_seconds = lease_seconds
+        self.bus = bus or LocalBus()
+        self.app = None
+        self._rooms = {}  # pipeline id -> _Room, for pipelines this process owns
+        self._joined = {}  # sid -> {pipeline id}, for clients connected to this process
+        self._lock = threading.Lock()
+        self._ticker = None
+        self._listener = None
+        self._flush_at_exit = False
+        self._worker = None  # defaults to host:pid
+        self._extensions = {}  # command prefix -> object with _cmd_<name> handlers
+
+    def init_app(self, app, bus=None):
+        self.app = app
+        if bus is not None:
+            self.bus = bus
+        if app.config.get('COLLAB_TICK_MS'):
+            self.tick_seconds = app.config['COLLAB_TICK_MS'] / 1000
+        self.checkpoint_seconds = app.config.get('COLLAB_CHECKPOINT_SECONDS') or self.checkpoint_seconds
+        self.lease_seconds = app.config.get('COLLAB_LEASE_SECONDS') or self.lease_seconds
+        if not self._flush_at_exit:
+            # Save open rooms' unsaved changes when the server process exits
+            atexit.register(self.flush)
+            self._flush_at_exit = True
+
+    @property
+    def worker(self):
+        return self._worker or f'{socket.gethostname()}:{os.getpid()}'
+
+    def register(self, prefix, handler):
+        """Route commands named '<prefix>.<name>' to handler._cmd_<name> in the owner (see route)"""
+        self._extensions[prefix] = handler
+
+    def route(self, pipeline_id: int, command: Dict):
+        """Run a registered extension's command in whichever process owns the pipeline"""
+        self._route(pipeline_id, command, notify=False)
+
+    def owns(self, pipeline_id: int) -> bool:
+        with self._lock:
+            return pipeline_id in self._rooms
+
+    # --- Requests from this process's clients ---
+
+    def join(self, pipeline_id: int, sid: str, user_id: int, can_edit: bool):
+        """Add sid to the pipeline's room; the owner sends it canvas_state"""
+        with self._lock:
+            self._joined.setdefault(sid, set()).add(pipeline_id)
+        self._route(pipeline_id, {
+            'cmd': 'join', 'pipeline_id': pipeline_id, 'sid': sid, 'user_id': user_id, 'can_edit': can_edit
+        }, claim=True)
+
+    def leave(self, pipeline_id: int, sid: str) -> bool:
+        """Remove sid from the room; returns False if it hadn't joined"""
+        with self._lock:
+            pipelines = self._joined.get(sid, set())
+            if pipeline_id not in pipelines:
+                return False
+            pipelines.discard(pipeline_id)
+            if not pipelines:
+                del self._joined[sid]
+        self._route(pipeline_id, {'cmd': 'leave', 'pipeline_id': pipeline_id, 'sid': sid})
+        return True
+
+    def disconnect(self, sid: str) -> List[int]:
+        """Remove sid from every room it was in; returns their pipeline ids"""
+        with self._lock:
+            pipelines = sorted(self._joined.pop(sid, ()))
+        for pipeline_id in pipelines:
+            self._route(pipeline_id, {'cmd': 'leave', 'pipeline_id': pipeline_id, 'sid': sid})
+        return pipelines
+
+    def is_member(self, pipeline_id: int, sid: str) -> bool:
+        with self._lock:
+            return pipeline_id in self._joined.get(sid, ())
+
+    def submit(self, pipeline_id: int, sid: str, user_id: int, ops: List[Dict], seq=None):
+        """Apply a client's operations in order; the owner sends the sender canvas_ack"""
+        self._route(pipeline_id, {
+            'cmd': 'submit', 'pipeline_id': pipeline_id, 'sid': sid, 'user_id': user_id, 'ops': ops, 'seq': seq
+        })
+
+    def sync(self, pipeline_id: int, sid: str):
+        """Have the owner resend canvas_state to sid"""
+        self._route(pipeline_id, {'cmd': 'sync', 'pipeline_id': pipeline_id, 'sid': sid})
+
+    def replace(self, pipeline_id: int, nodes: List[Dict], edges: List[Dict], user_id: Optional[int] = None,
+                sid: Optional[str] = None, saved: bool = False):
+        """
+        Replace an open room's whole graph. With a sid the request comes
+        from a client and needs edit rights; without one it comes from the
+        server (e.g. a REST save). saved=True means the caller already wrote
+        this graph to the SavedModel, so it doesn't need a checkpoint.
+        Nothing happens if the pipeline isn't open anywhere.
+        """
+        self._route(pipeline_id, {
+            'cmd': 'replace', 'pipeline_id': pipeline_id, 'nodes': nodes, 'edges': edges,
+            'user_id': user_id, 'sid': sid, 'saved': saved
+        })
+
+    def _route(self, pipeline_id, command, claim=False, notify=True):
+        """Run command here if this process owns the pipeline, else publish it to the owner"""
+        key = lease_key(pipeline_id)
+        owner = self.bus.claim(key, self.worker, self.lease_seconds) if claim else self.bus.owner(key)
+        if owner == self.worker:
+            self._handle(command)
+        elif owner is not None:
+            self.bus.publish(f'collab:{owner}', json.dumps(command))
+        elif notify and command.get('sid') and command['cmd'] != 'leave':
+            # The owner went away and nobody reopened the pipeline yet
+            self._reply(command['sid'], 'canvas_error', {
+                'pipeline_id': pipeline_id, 'error': 'Pipeline is not open, join it again'
+            })
+
+    # --- Commands, run by the owner ---
+
+    def _handle(self, command):
+        prefix, _, name = command['cmd'].rpartition('.')
+        target = self._extensions[prefix] if prefix else self
+        handler = getattr(target, f'_cmd_{name}')
+        handler(**{name: value for name, value in command.items() if name != 'cmd'})
+
+    def _reply(self, sid, event, data):
+        from app import socketio
+        socketio.emit(event, data, to=sid, namespace=NAMESPACE)
+
+    def _cmd_join(self, pipeline_id, sid, user_id, can_edit):
+        with self._lock:
+            room = self._rooms.get(pipeline_id)
+        if room is None:
+            room = self._load(pipeline_id)
+            if room is None:
+                self.bus.release(lease_key(pipeline_id), self.worker)
+                self._reply(sid, 'canvas_error', {'pipeline_id': pipeline_id, 'error': 'Pipeline not found'})
+                return
+
+        with self._lock:
+            # Another member may have loaded the room meanwhile; keep theirs
+            room = self._rooms.setdefault(pipeline_id, room)
+            room.members[sid] = (user_id, can_edit)
+            snapshot = room.document.snapshot()
+        self._start()
+        self._reply(sid, 'canvas_state', dict(snapshot, pipeline_id=pipeline_id, can_edit=can_edit))
+
+    def _load(self, pipeline_id):
+        from app import db
+        from app.models import SavedModel
+
+        with self.app.app_context():
+            model = db.session.get(SavedModel, pipeline_id)
+            if model is None:
+                return None
+            return _Room(pipeline_id, PipelineDocument(
+                json.loads(model.nodes) if model.nodes else [],
+                json.loads(model.edges) if model.edges else []
+            ))
+
+    def _cmd_leave(self, pipeline_id, sid):
+        """The next tick checkpoints and closes a room left empty"""
+        with self._lock:
+            room = self._rooms.get(pipeline_id)
+            if room is not None:
+                room.members.pop(sid, None)
+
+    def _cmd_sync(self, pipeline_id, sid):
+        with self._lock:
+            room = self._rooms.get(pipeline_id)
+            member = room.members.get(sid) if room is not None else None
+            snapshot = room.document.snapshot() if member is not None else None
+        if snapshot is None:
+            self._reply(sid, 'canvas_error', {'pipeline_id': pipeline_id, 'error': 'Join the pipeline first'})
+            return
+        self._reply(sid, 'canvas_state', dict(snapshot, pipeline_id=pipeline_id, can_edit=member[1]))
+
+    def _cmd_submit(self, pipeline_id, sid, user_id, ops, seq):
+        """
+        Operations that don't apply are skipped and reported back by index;
+        the rest still go through. The ack carries the document version
+        after the last applied operation.
+        """
+        ack = {'pipeline_id': pipeline_id, 'seq': seq}
+        try:
+            if not isinstance(ops, list) or len(ops) > MAX_OPS_PER_MESSAGE:
+                raise OpError(f'ops must be a list of at most {MAX_OPS_PER_MESSAGE} operations')
+            rejected = []
+            with self._lock:
+                room = self._rooms.get(pipeline_id)
+                member = room.members.get(sid) if room is not None else None
+                if member is None:
+                    raise OpError('Join the pipeline first')
+                if not member[1]:
+                    raise OpError('Read-only')
+                for index, op in enumerate(ops):
+                    try:
+                        room.document.apply(op, user_id)
+                    except OpError as e:
+                        rejected.append({'index': index, 'error': str(e)})
+                if len(rejected) < len(ops):
+                    room.dirty = True
+                ack.update(version=room.document.version, rejected=rejected)
+        except OpError as e:
+            ack['error'] = str(e)
+        self._reply(sid, 'canvas_ack', ack)
+
+    def _cmd_replace(self, pipeline_id, nodes, edges, user_id, sid, saved):
+        with self._lock:
+            room = self._rooms.get(pipeline_id)
+            if room is None:
+                return
+            if sid is not None and not room.members.get(sid, (None, False))[1]:
+                return
+            room.document.apply({'op': 'replace', 'nodes': nodes, 'edges': edges}, user_id)
+            if saved:
+                room.dirty = False
+                room.checkpointed_at = time.monotonic()
+            else:
+                room.dirty = True
+
+    # --- Broadcast, checkpoints and leases ---
+
+    def _start(self):
+        from app import socketio
+
+        with self._lock:
+            if self._ticker is None:
+                self._ticker = socketio.start_background_task(self._run)
+        self._start_listener()
+
+    def _start_listener(self):
+        """Receive commands other processes route to this one (shared buses only)"""
+        from app import socketio
+
+        with self._lock:
+            if self._listener is None and self.bus.shared:
+                # Subscribe now, so nothing routed here after the claim is missed
+                messages = self.bus.listen(f'collab:{self.worker}', socketio.sleep)
+                self._listener = socketio.start_background_task(self._listen, messages)
+
+    def _listen(self, messages):
+        for message in messages:
+            try:
+                self._handle(json.loads(message))
+            except Exception:
+                self.app.logger.exception('Failed to handle collaboration command')
+
+    def _run(self):
+        from app import socketio
+
+        while True:
+            socketio.sleep(self.tick_seconds)
+            with self._lock:
+                if not self._rooms:
+                    self._ticker = None
+                    return
+            try:
+                self.tick()
+            except Exception:
+                self.app.logger.exception('Collaboration tick failed')
+
+    def tick(self):
+        """Broadcast pending batches, renew leases, then checkpoint rooms that are due"""
+        from app import socketio
+
+        now = time.monotonic()
+        batches, due, renew = [], [], []
+        with self._lock:
+            for room in self._rooms.values():
+                from_version, ops = room.document.take_pending()
+                if ops:
+                    batches.append((room.pipeline_id, {
+                        'pipeline_id': room.pipeline_id,
+                        'from_version': from_version,
+                        'version': room.document.version,
+                        'ops': ops
+                    }))
+                closing = not room.members
+                if room.dirty and now >= room.retry_at and (
+                        closing or now - room.checkpointed_at >= self.checkpoint_seconds):
+                    due.append((room.pipeline_id, room.document.version, room.document.snapshot()))
+                elif closing and not room.dirty:
+                    due.append((room.pipeline_id, None, None))
+                # A closing room keeps its lease until its last changes are saved
+                if now - room.renewed_at >= self.lease_seconds / 3:
+                    renew.append(room.pipeline_id)
+                    room.renewed_at = now
+
+        for pipeline_id, batch in batches:
+            socketio.emit('canvas_ops', batch, room=room_name(pipeline_id), namespace=NAMESPACE)
+
+        for pipeline_id in renew:
+            if self.bus.claim(lease_key(pipeline_id), self.worker, self.lease_seconds) != self.worker:
+                # Stalled past the lease and another process took the pipeline over
+                with self._lock:
+                    room = self._rooms.pop(pipeline_id, None)
+                    snapshot = room.document.snapshot() if room is not None and room.dirty else None
+                if snapshot is None:
+                    self.app.logger.warning('Lost the lease on pipeline %s', pipeline_id)
+                    continue
+                # Save what only this process has; the new owner's next checkpoint wins
+                self.app.logger.warning('Lost the lease on pipeline %s; checkpointing its unsaved changes', pipeline_id)
+                try:
+                    self._checkpoint(pipeline_id, snapshot)
+                except Exception:
+                    self.app.logger.exception('Discarded unsaved changes to pipeline %s', pipeline_id)
+
+        for pipeline_id, version, snapshot in due:
+            if snapshot is not None and not self._save(pipeline_id, version, snapshot):
+                continue
+            with self._lock:
+                room = self._rooms.get(pipeline_id)
+                # Somebody may have rejoined while the checkpoint was written
+                if room is not None and not room.members and not room.dirty:
+                    del self._rooms[pipeline_id]
+                    self.bus.release(lease_key(pipeline_id), self.worker)
+
+    def _save(self, pipeline_id, version, snapshot):
+        """
+        Checkpoint a snapshot taken at version; returns whether it was written.
+
+        The room stays dirty if the write fails (it is retried after
+        CHECKPOINT_RETRY_SECONDS) or if it changed while the write was in
+        progress.
+        """
+        try:
+            self._checkpoint(pipeline_id, snapshot)
+        except Exception:
+            self.app.logger.exception('Failed to checkpoint pipeline %s', pipeline_id)
+            with self._lock:
+                room = self._rooms.get(pipeline_id)
+                if room is not None:
+                    room.retry_at = time.monotonic() + CHECKPOINT_RETRY_SECONDS
+            return False
+        with self._lock:
+            room = self._rooms.get(pipeline_id)
+            if room is not None:
+                room.checkpointed_at = time.monotonic()
+                if room.document.version == version:
+                    room.dirty = False
+        return True
+
+    def _checkpoint(self, pipeline_id, snapshot):
+        from app import db
+        from app.models import SavedModel
+        from app.utils.pipeline_summary import store_graph
+
+        with self.app.app_context():
+            model = db.session.get(SavedModel, pipeline_id)
+            if model is None:
+                return
+            store_graph(model, snapshot['nodes'], snapshot['edges'])
+            db.session.commit()
+
+    def flush(self):
+        """Checkpoint every room with unsaved changes; registered to run at exit"""
+        with self._lock:
+            due = [(room.pipeline_id, room.document.version, room.document.snapshot())
+                   for room in self._rooms.values() if room.dirty]
+        for pipeline_id, version, snapshot in due:
+            self._save(pipeline_id, version, snapshot)
+
+engine = CollaborationEngine()
@@ -0,0 +1,278 @@
+"""
+Presence - Who is in a pipeline room and where their cursors are
+
+Cursor moves only overwrite the sender's latest position. A Socket.IO
+background task flushes every room with changes at a fixed rate as one
+cursors message per room, whatever the number of moves, and sends the
+participant list (presence) whenever somebody joins or leaves. Cursors
+that haven't moved for stale_seconds are dropped. A joining client gets
+both messages on the next flush.
+
+The cursors payload is binary: one CURSOR record per visible cursor,
+little-endian (user id uint32, x float32, y float32), and always lists
+every live cursor in the room, so a client can replace what it draws.
+
+With several server processes (see app.realtime.bus) a room's roster and
+cursors are kept by the process that owns the pipeline: joins, leaves and
+moves are routed to it as commands through the collaboration engine, so
+every message describes the whole room. Each process with clients renews
+a process lease while it runs; the owner drops the members of a process
+whose lease has expired (e.g. one that was killed).
+"""
+import math
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Dict, List, Optional
+
+NAMESPACE = '/builder'
+CURSOR = struct.Struct('<Iff')
+
+
+def pack_cursors(cursors: Dict[int, tuple]) -> bytes:
+    """{user id: (x, y, ...)} -> packed CURSOR records"""
+    buffer = bytearray(CURSOR.size * len(cursors))
+    for index, (user_id, cursor) in enumerate(cursors.items()):
+        CURSOR.pack_into(buffer, index * CURSOR.size, user_id, cursor[0], cursor[1])
+    return bytes(buffer)
+
+
+def unpack_cursors(data: bytes) -> List[tuple]:
+    """Packed CURSOR records -> [(user id, x, y)]"""
+    return list(CURSOR.iter_unpack(data))
+
+
+def process_key(source):
+    return f'process:{source}'
+
+
+class _Room:
+    def __init__(self):
+        self.members = {}  # sid -> (user id, username, source process)
+        self.cursors = {}  # user id -> (x, y, monotonic time of the move)
+        self.cursors_changed = False
+        self.roster_changed = False
+
+
+class Presence:
+    def __init__(self, flush_seconds=0.05, stale_seconds=10, engine=None):
+        self.flush_seconds = flush_seconds
+        self.stale_seconds = stale_seconds
+        self.engine = engine
+        self.app = None
+        self._rooms = {}  # pipeline id -> _Room, for pipelines this process owns
+        self._joined = {}  # sid -> {pipeline id}, for clients connected to this process
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._heartbeat_at = 0.0
+
+    def init_app(self, app, engine=None):
+        self.app = app
+        if app.config.get('PRESENCE_FLUSH_MS'):
+            self.flush_seconds = app.config['PRESENCE_FLUSH_MS'] / 1000
+        self.stale_seconds = app.config.get('PRESENCE_STALE_SECONDS') or self.stale_seconds
+        if engine is not None:
+            self.engine = engine
+            engine.register('presence', self)
+
+    @property
+    def source(self):
+        return self.engine.worker if self.engine is not None else f'{socket.gethostname()}:{os.getpid()}'
+
+    @property
+    def _shared_bus(self):
+        return self.engine is not None and self.engine.bus.shared
+
+    # --- Requests from this process's clients ---
+
+    def join(self, pipeline_id: int, sid: str, user_id: int, username: str):
+        with self._lock:
+            self._joined.setdefault(sid, set()).add(pipeline_id)
+        self._heartbeat(force=True)
+        self._route(pipeline_id, {
+            'cmd': 'presence.join', 'pipeline_id': pipeline_id, 'sid': sid,
+            'user_id': user_id, 'username': username, 'source': self.source
+        })
+        self._start()
+
+    def leave(self, pipeline_id: int, sid: str):
+        with self._lock:
+            pipelines = self._joined.get(sid, set())
+            if pipeline_id not in pipelines:
+                return
+            pipelines.discard(pipeline_id)
+            if not pipelines:
+                del self._joined[sid]
+        self._route(pipeline_id, {'cmd': 'presence.leave', 'pipeline_id': pipeline_id, 'sid': sid})
+
+    def disconnect(self, sid: str):
+        with self._lock:
+            pipelines = sorted(self._joined.pop(sid, ()))
+        for pipeline_id in pipelines:
+            self._route(pipeline_id, {'cmd': 'presence.leave', 'pipeline_id': pipeline_id, 'sid': sid})
+
+    def move(self, pipeline_id: int, sid: str, x, y) -> bool:
+        """Record the latest cursor of sid's user; False if sid isn't in the room or x/y are bad"""
+        try:
+            x, y = float(x), float(y)
+        except (TypeError, ValueError):
+            return False
+        if not (math.isfinite(x) and math.isfinite(y)):
+            return False
+        with self._lock:
+            if pipeline_id not in self._joined.get(sid, ()):
+                return False
+        self._route(pipeline_id, {'cmd': 'presence.move', 'pipeline_id': pipeline_id, 'sid': sid, 'x': x, 'y': y})
+        return True
+
+    def roster(self, pipeline_id: int) -> List[Dict]:
+        """Users in a room this process owns"""
+        with self._lock:
+            room = self._rooms.get(pipeline_id)
+            return self._roster(room) if room is not None else []
+
+    def _route(self, pipeline_id, command):
+        if self.engine is None:
+            _, _, name = command.pop('cmd').partition('.')
+            getattr(self, f'_cmd_{name}')(**command)
+        else:
+            self.engine.route(pipeline_id, command)
+
+    # --- Commands, run by the owner ---
+
+    def _cmd_join(self, pipeline_id, sid, user_id, username, source):
+        with self._lock:
+            room = self._rooms.setdefault(pipeline_id, _Room())
+            room.members[sid] = (user_id, username, source)
+            room.roster_changed = True
+            # The new client needs the cursors drawn so far
+            room.cursors_changed = True
+        self._start()
+
+    def _cmd_leave(self, pipeline_id, sid):
+        with self._lock:
+            room = self._rooms.get(pipeline_id)
+            if room is not None:
+                self._remove(room, sid)
+
+    def _cmd_move(self, pipeline_id, sid, x, y):
+        with self._lock:
+            room = self._rooms.get(pipeline_id)
+            member = room.members.get(sid) if room is not None else None
+            if member is None:
+                return
+            room.cursors[member[0]] = (x, y, time.monotonic())
+            room.cursors_changed = True
+
+    def _remove(self, room, sid):
+        member = room.members.pop(sid, None)
+        if member is None:
+            return
+        room.roster_changed = True
+        # A user can have the pipeline open in several tabs
+        if all(user_id != member[0] for user_id, _, _ in room.members.values()):
+            if room.cursors.pop(member[0], None) is not None:
+                room.cursors_changed = True
+
+    @staticmethod
+    def _roster(room):
+        users = {}
+        for user_id, username, _ in room.members.values():
+            entry = users.setdefault(user_id, {'user_id': user_id, 'username': username, 'sessions': 0})
+            entry['sessions'] += 1
+        return list(users.values())
+
+    # --- Process leases ---
+
+    def _heartbeat(self, force=False):
+        """Renew this process's lease while it has clients, at most every third of stale_seconds"""
+        if not self._shared_bus:
+            return
+        now = time.monotonic()
+        if not force and now - self._heartbeat_at < self.stale_seconds / 3:
+            return
+        self._heartbeat_at = now
+        self.engine.bus.claim(process_key(self.source), self.source, self.stale_seconds)
+
+    def _drop_dead_members(self):
+        """Remove members connected through processes whose lease has expired"""
+        with self._lock:
+            sources = {member[2] for room in self._rooms.values() for member in room.members.values()}
+        sources.discard(self.source)
+        dead = {source for source in sources if self.engine.bus.owner(process_key(source)) != source}
+        if not dead:
+            return
+        with self._lock:
+            for room in self._rooms.values():
+                for sid, member in list(room.members.items()):
+                    if member[2] in dead:
+                        self._remove(room, sid)
+
+    # --- Flushing ---
+
+    def _start(self):
+        from app import socketio
+
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = socketio.start_background_task(self._run)
+
+    def _run(self):
+        from app import socketio
+
+        while True:
+            socketio.sleep(self.flush_seconds)
+            with self._lock:
+                if not self._rooms and not self._joined:
+                    self._flusher = None
+                    return
+            try:
+                self.flush()
+            except Exception:
+                self.app.logger.exception('Presence flush failed')
+
+    def flush(self, now: Optional[float] = None):
+        """Emit changed rosters and cursor sets, dropping stale cursors and empty rooms"""
+        from app import socketio
+
+        now = time.monotonic() if now is None else now
+        if self._shared_bus and now - self._heartbeat_at >= self.stale_seconds / 3:
+            self._heartbeat()
+            self._drop_dead_members()
+        owned = None if self.engine is None else {
+            pipeline_id for pipeline_id in list(self._rooms) if self.engine.owns(pipeline_id)
+        }
+
+        messages = []
+        with self._lock:
+            for pipeline_id, room in list(self._rooms.items()):
+                if owned is not None and pipeline_id not in owned:
+                    # Another process took the pipeline over; its clients join there again
+                    del self._rooms[pipeline_id]
+                    continue
+                stale = [user_id for user_id, cursor in room.cursors.items() if now - cursor[2] > self.stale_seconds]
+                for user_id in stale:
+                    del room.cursors[user_id]
+                    room.cursors_changed = True
+
+                if room.roster_changed:
+                    messages.append(('presence', pipeline_id, {
+                        'pipeline_id': pipeline_id,
+                        'users': self._roster(room)
+                    }))
+                if room.cursors_changed:
+                    messages.append(('cursors', pipeline_id, {
+                        'pipeline_id': pipeline_id,
+                        'cursors': pack_cursors(room.cursors)
+                    }))
+                room.roster_changed = room.cursors_changed = False
+                if not room.members:
+                    del self._rooms[pipeline_id]
+
+        for name, pipeline_id, data in messages:
+            socketio.emit(name, data, room=f'pipeline_{pipeline_id}', namespace=NAMESPACE)
+
+
+presence = Presence()
@@ -1,26 +1,114 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
 from flask_login import login_required, current_user
 from app import db
-from app.models import SavedModel, PipelineVersion, ModelMetric, VersionTag, VersionComment
+from app.models import SavedModel, PipelineVersion, ModelMetric, MetricAggregate, VersionTag, VersionComment, BackgroundJob
+from app.utils import graph_diff, version_store
+from app.utils.pipeline_summary import component_filter, decode_component_ids, store_graph
 import json
 from datetime import datetime
 
 bp = Blueprint('api', __name__, url_prefix='/api')
 
+MODEL_LIST_FIELDS = (
+    'id', 'name', 'description', 'nodes', 'edges', 'created_at', 'updated_at',
+    'tags', 'is_public', 'node_count', 'edge_count', 'component_ids', 'content_hash', 'byte_size'
+)
+MODEL_SUMMARY_FIELDS = (
+    'id', 'name', 'description', 'created_at', 'updated_at', 'tags',
+    'node_count', 'edge_count', 'component_ids'
+)
+MODEL_LEGACY_FIELDS = ('id', 'name', 'description', 'nodes', 'edges', 'created_at', 'updated_at', 'tags')
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def _serialize_model(model, fields):
+    """Serialize only the requested fields; nodes/edges are parsed only if asked for"""
+    result = {}
+    for field in fields:
+        value = getattr(model, field)
+        if field in ('nodes', 'edges'):
+            value = json.loads(value)
+        elif field in ('created_at', 'updated_at'):
+            value = value.isoformat() if value else None
+        elif field == 'tags':
+            value = value.split(',') if value else []
+        elif field == 'component_ids':
+            value = decode_component_ids(value)
+        result[field] = value
+    return result
+
+def _parse_cursor(cursor):
+    """Parse an ``<updated_at ISO>,<id>`` keyset cursor"""
+    updated_at, _, model_id = cursor.rpartition(',')
+    return datetime.fromisoformat(updated_at), int(model_id)
+
 @bp.route('/models', methods=['GET'])
 @login_required
 def get_models():
-    models = SavedModel.query.filter_by(user_id=current_user.id).order_by(SavedModel.updated_at.desc()).all()
-    return jsonify([{
-        'id': model.id,
-        'name': model.name,
-        'description': model.description,
-        'nodes': json.loads(model.nodes),
-        'edges': json.loads(model.edges),
-        'created_at': model.created_at.isoformat(),
-        'updated_at': model.updated_at.isoformat(),
-        'tags': model.tags.split(',') if model.tags else []
-    } for model in models])
+    """
+    List the current user's models.
+    
+    Query params:
+        fields  - comma-separated projection (nodes/edges are only loaded if listed)
+        summary - shorthand for a projection without nodes/edges, with node/edge counts
+        limit   - page size; enables keyset pagination
+        after   - cursor from a previous page's next_after
+        component    - only models using this componentId
+        content_hash - only models with exactly this graph (dedupe)
+    Without limit/after the response is a plain list, as before.
+    """
+    if request.args.get('fields'):
+        fields = [f for f in request.args['fields'].split(',') if f in MODEL_LIST_FIELDS]
+        if 'id' not in fields:
+            fields.insert(0, 'id')
+    elif request.args.get('summary'):
+        fields = list(MODEL_SUMMARY_FIELDS)
+    else:
+        fields = list(MODEL_LEGACY_FIELDS)
+    
+    from sqlalchemy import and_, or_
+    from sqlalchemy.orm import load_only
+    
+    columns = set(fields) | {'updated_at'}
+    query = SavedModel.query.options(
+        load_only(*[getattr(SavedModel, column) for column in columns])
+    ).filter_by(user_id=current_user.id)
+    
+    if request.args.get('component'):
+        query = query.filter(component_filter(SavedModel.component_ids, request.args['component']))
+    if request.args.get('content_hash'):
+        query = query.filter_by(content_hash=request.args['content_hash'])
+    
+    paginate = 'limit' in request.args or 'after' in request.args
+    if request.args.get('after'):
+        try:
+            after_updated, after_id = _parse_cursor(request.args['after'])
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.filter(or_(
+            SavedModel.updated_at < after_updated,
+            and_(SavedModel.updated_at == after_updated, SavedModel.id < after_id)
+        ))
+    
+    query = query.order_by(SavedModel.updated_at.desc(), SavedModel.id.desc())
+    
+    if not paginate:
+        return jsonify([_serialize_model(model, fields) for model in query.all()])
+    
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    models = query.limit(limit + 1).all()
+    has_more = len(models) > limit
+    models = models[:limit]
+    
+    next_after = None
+    if has_more:
+        last = models[-1]
+        next_after = f"{last.updated_at.isoformat()},{last.id}"
+    
+    return jsonify({
+        'models': [_serialize_model(model, fields) for model in models],
+        'next_after': next_after
+    })
 
 @bp.route('/models', methods=['POST'])
 @login_required
@@ -29,10 +117,9 @@ def save_model():
     model = SavedModel(
         name=data.get('name', 'Untitled Pipeline'),
         description=data.get('description', ''),
-        user_id=current_user.id,
-        nodes=json.dumps(data.get('nodes', [])),
-        edges=json.dumps(data.get('edges', []))
+        user_id=current_user.id
     )
+    store_graph(model, data.get('nodes', []), data.get('edges', []))
     db.session.add(model)
     db.session.commit()
     return jsonify({'id': model.id, 'message': 'Model saved successfully'}), 201
@@ -43,16 +130,7 @@ def get_model(model_id):
     model = SavedModel.query.get_or_404(model_id)
     
     # Access Control: Owner OR Teacher of submitted work
-    has_access = False
-    if model.user_id == current_user.id:
-        has_access = True
-    else:
-        # Check if this model is part of a submission for a class the current user owns
-        submission = model.student_submissions.first()
-        if submission and submission.work.classroom.owner_id == current_user.id:
-            has_access = True
-            
-    if not has_access:
+    if not model.is_viewable_by(current_user.id):
         return jsonify({'error': 'Unauthorized'}), 403
     
     return jsonify({
@@ -76,9 +154,11 @@ def update_model(model_id):
     data = request.get_json()
     model.name = data.get('name', model.name)
     model.description = data.get('description', model.description)
-    model.nodes = json.dumps(data.get('nodes', []))
-    model.edges = json.dumps(data.get('edges', []))
+    store_graph(model, data.get('nodes', []), data.get('edges', []))
     db.session.commit()
+    # Collaborators with the pipeline open get the saved graph as a replace
+    from app.realtime import engine
+    engine.replace(model.id, data.get('nodes', []), data.get('edges', []), current_user.id, saved=True)
     return jsonify({'message': 'Model updated successfully'})
 
 @bp.route('/models/<int:model_id>', methods=['DELETE'])
@@ -115,6 +195,40 @@ def generate_code():
     )
     return jsonify({'code': code})
 
+@bp.route('/generate-code/session', methods=['POST'])
+def create_codegen_session():
+    """Start an incremental live-preview session"""
+    data = request.get_json() or {}
+    from app.utils.codegen_session import codegen_sessions
+    session_id, session = codegen_sessions.create(
+        data.get('nodes', []),
+        data.get('edges', []),
+        data.get('name', 'ML Pipeline')
+    )
+    return jsonify({'session_id': session_id, 'code': session.code}), 201
+
+@bp.route('/generate-code/session/<session_id>', methods=['POST'])
+def apply_codegen_delta(session_id):
+    """Apply a node/edge delta to a live-preview session"""
+    from app.utils.codegen_session import codegen_sessions
+    session = codegen_sessions.get(session_id)
+    if session is None:
+        # Evicted or owned by another worker; the client should start a new session
+        return jsonify({'error': 'Unknown or expired session'}), 404
+    
+    data = request.get_json() or {}
+    code, changed = session.apply(data.get('delta', {}))
+    return jsonify({
+        'code': code,
+        'changed_line_ranges': [list(span) for span in changed]
+    })
+
+@bp.route('/generate-code/session/<session_id>', methods=['DELETE'])
+def close_codegen_session(session_id):
+    from app.utils.codegen_session import codegen_sessions
+    codegen_sessions.discard(session_id)
+    return jsonify({'message': 'Session closed'})
+
 @bp.route('/validate', methods=['POST'])
 def validate_pipeline():
     try:
@@ -123,24 +237,23 @@ def validate_pipeline():
         edges = data.get('edges', [])
         
         from app.utils.validation import validate_pipeline_structure, validate_hyperparameters
-        from app.utils.data_loader import get_components
+        from app.utils.data_loader import component_registry
         
         # Structure validation
-        errors, warnings = validate_pipeline_structure(nodes, edges)
+        errors, warnings, cycles = validate_pipeline_structure(nodes, edges)
         
         # Hyperparameter validation
-        # data_loader.get_components returns a dict {'components': [...]}, not a list directly
-        components_data = get_components()
-        components = components_data.get('components', [])
-        component_map = {c['id']: c for c in components}
-        
         for node in nodes:
-            comp_id = node.get('data', {}).get('componentId')
-            if comp_id in component_map:
-                node_errors = validate_hyperparameters(node, component_map[comp_id])
+            component = component_registry.get(node.get('data', {}).get('componentId'))
+            if component:
+                node_errors = validate_hyperparameters(node, component)
                 errors.extend(node_errors)
                 
-        return jsonify({'errors': errors, 'warnings': warnings})
+        return jsonify({
+            'errors': errors,
+            'warnings': warnings,
+            'cycles': cycles
+        })
     except Exception as e:
         import traceback
         print(f"Validation error: {str(e)}")
@@ -181,15 +294,22 @@ def create_version(model_id):
         version_tag=data.get('version_tag'),
         name=data.get('name', f'Version {next_version_number}'),
         description=data.get('description', ''),
-        nodes=json.dumps(data.get('nodes', [])),
-        edges=json.dumps(data.get('edges', [])),
-        generated_code=generated_code,
         meta_data=json.dumps(data.get('metadata', {})),
         created_by=current_user.id,
         is_active=data.get('is_active', False),
         parent_version_id=data.get('parent_version_id')
     )
     
+    # Stored as a delta against the latest version, with periodic keyframes
+    version_store.store(
+        version,
+        data.get('nodes', []),
+        data.get('edges', []),
+        generated_code,
+        previous=last_version,
+        keyframe_interval=current_app.config.get('VERSION_KEYFRAME_INTERVAL', version_store.KEYFRAME_INTERVAL)
+    )
+    
     # If this is set as active, deactivate others
     if version.is_active:
         PipelineVersion.query.filter_by(pipeline_id=model_id, is_active=True).update({'is_active': False})
@@ -262,6 +382,9 @@ def delete_version(version_id):
     if version.is_active:
         return jsonify({'error': 'Cannot delete active version'}), 400
     
+    # Versions stored as deltas against this one become keyframes
+    version_store.detach_dependents(version)
+    graph_diff.discard_version(version)
     db.session.delete(version)
     db.session.commit()
     
@@ -279,32 +402,32 @@ def compare_versions():
     version1 = PipelineVersion.query.get_or_404(version1_id)
     version2 = PipelineVersion.query.get_or_404(version2_id)
     
-    # Check authorization
-    model = SavedModel.query.get(version1.pipeline_id)
-    if model.user_id != current_user.id:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    # Parse nodes and edges
-    nodes1 = json.loads(version1.nodes) if version1.nodes else []
-    nodes2 = json.loads(version2.nodes) if version2.nodes else []
-    edges1 = json.loads(version1.edges) if version1.edges else []
-    edges2 = json.loads(version2.edges) if version2.edges else []
-    
-    # Simple diff
-    diff = {
-        'version1': version1.to_dict(),
-        'version2': version2.to_dict(),
-        'changes': {
-            'nodes_added': len(nodes2) - len(nodes1),
-            'edges_added': len(edges2) - len(edges1),
-            'total_nodes_v1': len(nodes1),
-            'total_nodes_v2': len(nodes2),
-            'total_edges_v1': len(edges1),
-            'total_edges_v2': len(edges2)
+    # Check authorization (both versions must belong to the user's pipelines)
+    for version in (version1, version2):
+        model = SavedModel.query.get(version.pipeline_id)
+        if model.user_id != current_user.id:
+            return jsonify({'error': 'Unauthorized'}), 403
+    
+    def header(version):
+        return {
+            'id': version.id,
+            'pipeline_id': version.pipeline_id,
+            'version_number': version.version_number,
+            'version_tag': version.version_tag,
+            'name': version.name,
+            'node_count': version.node_count,
+            'edge_count': version.edge_count,
+            'created_at': version.created_at.isoformat() if version.created_at else None
         }
-    }
     
-    return jsonify(diff)
+    # Structural diff, cached per version pair
+    diff = graph_diff.diff_versions(version1, version2)
+    
+    return jsonify({
+        'version1': header(version1),
+        'version2': header(version2),
+        'diff': diff
+    })
 
 
 # ===== METRICS ENDPOINTS =====
@@ -313,6 +436,8 @@ def compare_versions():
 @login_required
 def add_metrics(version_id):
     """Add metrics to a version"""
+    from app.utils import metric_store
+    
     version = PipelineVersion.query.get_or_404(version_id)
     model = SavedModel.query.get(version.pipeline_id)
     
@@ -322,12 +447,17 @@ def add_metrics(version_id):
     data = request.get_json()
     metrics = data.get('metrics', [])
     
+    try:
+        values = [metric_store.coerce_value(metric_data.get('value')) for metric_data in metrics]
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     created_metrics = []
-    for metric_data in metrics:
+    for metric_data, value in zip(metrics, values):
         metric = ModelMetric(
             version_id=version_id,
             metric_name=metric_data.get('name'),
-            metric_value=metric_data.get('value'),
+            metric_value=value,
             metric_type=metric_data.get('type', 'training'),
             epoch=metric_data.get('epoch'),
             meta_data=json.dumps(metric_data.get('metadata', {}))
@@ -335,6 +465,9 @@ def add_metrics(version_id):
         db.session.add(metric)
         created_metrics.append(metric)
     
+    metric_store.update_aggregates(
+        (m.version_id, m.metric_name, m.metric_type, m.epoch, m.metric_value) for m in created_metrics
+    )
     db.session.commit()
     
     return jsonify({
@@ -343,6 +476,37 @@ def add_metrics(version_id):
     }), 201
 
 
+@bp.route('/versions/<int:version_id>/metrics/bulk', methods=['POST'])
+@login_required
+def add_metrics_bulk(version_id):
+    """Bulk-add metrics from columnar JSON arrays or NDJSON"""
+    from app.utils import metric_store
+    
+    version = PipelineVersion.query.get_or_404(version_id)
+    model = SavedModel.query.get(version.pipeline_id)
+    
+    if model.user_id != current_user.id:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    max_points = current_app.config.get('METRICS_BULK_MAX_POINTS')
+    try:
+        if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+            columns = metric_store.parse_ndjson(version_id, request.get_data(as_text=True), max_points)
+        else:
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict):
+                return jsonify({'error': 'Expected a JSON object or NDJSON body'}), 400
+            columns = metric_store.parse_columnar(version_id, data, max_points)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    count = metric_store.insert_metrics(columns)
+    metric_store.update_aggregates(metric_store.column_points(columns))
+    db.session.commit()
+    
+    return jsonify({'message': f'{count} metrics added', 'count': count}), 201
+
+
 @bp.route('/versions/<int:version_id>/metrics', methods=['GET'])
 @login_required
 def get_metrics(version_id):
@@ -357,96 +521,272 @@ def get_metrics(version_id):
     return jsonify([m.to_dict() for m in metrics])
 
 
-# ===== EXPORT ENDPOINTS (Phase 3) =====
-
-@bp.route('/models/<int:model_id>/export/python', methods=['POST'])
+@bp.route('/versions/<int:version_id>/metrics/series', methods=['GET'])
 @login_required
-def export_python(model_id):
-    """Export pipeline as Python script"""
-    from app.utils.exporters.python_exporter import PythonExporter
+def get_metric_series(version_id):
+    """Get downsampled metric curves for a version as columnar arrays"""
+    from app.utils import metric_store
+    from app.utils.downsample import DEFAULT_POINTS, MAX_POINTS, METHODS, LTTB, downsample
+    
+    version = PipelineVersion.query.get_or_404(version_id)
+    model = SavedModel.query.get(version.pipeline_id)
     
-    model = SavedModel.query.get_or_404(model_id)
     if model.user_id != current_user.id:
         return jsonify({'error': 'Unauthorized'}), 403
     
-    nodes = json.loads(model.nodes)
-    edges = json.loads(model.edges)
-    
-    result = PythonExporter.export_pipeline(
-        nodes=nodes,
-        edges=edges,
-        pipeline_name=model.name,
-        description=model.description,
-        include_cli=True
+    points = request.args.get('points', DEFAULT_POINTS, type=int)
+    if points is None or not 3 <= points <= MAX_POINTS:
+        return jsonify({'error': f'points must be between 3 and {MAX_POINTS}'}), 400
+    method = request.args.get('method', LTTB)
+    if method not in METHODS:
+        return jsonify({'error': f"method must be one of: {', '.join(METHODS)}"}), 400
+    
+    series = metric_store.load_series(
+        version_id,
+        metric_name=request.args.get('metric_name'),
+        metric_type=request.args.get('metric_type'),
+        epoch_min=request.args.get('epoch_min', type=int),
+        epoch_max=request.args.get('epoch_max', type=int)
     )
     
-    return jsonify(result)
+    result = []
+    for (name, metric_type), (epochs, values) in series.items():
+        sampled_epochs, sampled_values = downsample(epochs, values, points, method)
+        result.append({
+            'metric_name': name,
+            'metric_type': metric_type,
+            'total_points': len(epochs),
+            'epochs': sampled_epochs,
+            'values': sampled_values
+        })
+    
+    return jsonify({
+        'version_id': version_id,
+        'method': method,
+        'points': points,
+        'series': result
+    })
 
 
-@bp.route('/models/<int:model_id>/export/notebook', methods=['POST'])
+@bp.route('/models/<int:model_id>/leaderboard', methods=['GET'])
 @login_required
-def export_notebook(model_id):
-    """Export pipeline as Jupyter notebook"""
-    from app.utils.exporters.notebook_exporter import NotebookExporter
+def get_leaderboard(model_id):
+    """Rank a pipeline's versions by an aggregated metric"""
+    from app.utils import metric_store
     
     model = SavedModel.query.get_or_404(model_id)
     if model.user_id != current_user.id:
         return jsonify({'error': 'Unauthorized'}), 403
     
-    nodes = json.loads(model.nodes)
-    edges = json.loads(model.edges)
-    
-    result = NotebookExporter.export_notebook(
-        nodes=nodes,
-        edges=edges,
-        pipeline_name=model.name,
-        description=model.description
+    metric_name = request.args.get('metric')
+    if not metric_name:
+        return jsonify({'error': 'metric is required'}), 400
+    agg = request.args.get('agg', 'last')
+    columns = {
+        'last': MetricAggregate.last_value,
+        'min': MetricAggregate.min_value,
+        'max': MetricAggregate.max_value,
+        'mean': MetricAggregate.sum_value / MetricAggregate.count
+    }
+    if agg not in columns:
+        return jsonify({'error': f"agg must be one of: {', '.join(columns)}"}), 400
+    order = request.args.get('order', 'desc')
+    if order not in ('asc', 'desc'):
+        return jsonify({'error': 'order must be asc or desc'}), 400
+    limit = max(1, min(request.args.get('limit', 50, type=int), 500))
+    # Aggregates are kept per type, so rank one type to give each version a single entry
+    metric_type = request.args.get('type') or metric_store.DEFAULT_METRIC_TYPE
+    
+    score = columns[agg]
+    query = db.session.query(
+        MetricAggregate, PipelineVersion.version_number, PipelineVersion.name, PipelineVersion.version_tag
+    ).join(PipelineVersion, MetricAggregate.version_id == PipelineVersion.id).filter(
+        PipelineVersion.pipeline_id == model_id,
+        MetricAggregate.metric_name == metric_name,
+        MetricAggregate.count > 0
     )
+    query = query.filter(MetricAggregate.metric_type == metric_type)
+    query = query.order_by(score.desc() if order == 'desc' else score.asc(), PipelineVersion.version_number)
+    
+    entries = []
+    for rank, (aggregate, version_number, name, version_tag) in enumerate(query.limit(limit), 1):
+        entry = aggregate.to_dict()
+        entry.update({
+            'rank': rank,
+            'score': entry[agg],
+            'version_number': version_number,
+            'version_name': name,
+            'version_tag': version_tag
+        })
+        entries.append(entry)
     
-    return jsonify(result)
+    return jsonify({
+        'model_id': model_id,
+        'metric': metric_name,
+        'type': metric_type,
+        'agg': agg,
+        'order': order,
+        'entries': entries
+    })
 
 
-@bp.route('/models/<int:model_id>/export/docker', methods=['POST'])
+# ===== EXECUTION ENDPOINTS =====
+
+@bp.route('/execution/run', methods=['POST'])
 @login_required
-def export_docker(model_id):
-    """Export pipeline as Docker container"""
-    from app.utils.exporters.docker_exporter import DockerExporter
+def run_pipeline():
+    """Queue a run of a saved or posted pipeline in the execution pool"""
+    from app.execution import QueueFull, job_queue
+    from app.execution.data_paths import confine_data_paths
+    from app.execution.planner import plan_nodes
+    from app.utils.code_generator import generate_python_code
+    from app.utils.validation import validate_pipeline_structure
+    
+    data = request.get_json() or {}
+    model_id = data.get('model_id')
+    if model_id is not None:
+        model = SavedModel.query.get_or_404(model_id)
+        if model.user_id != current_user.id:
+            return jsonify({'error': 'Unauthorized'}), 403
+        nodes, edges, name = json.loads(model.nodes), json.loads(model.edges), model.name
+    else:
+        nodes, edges = data.get('nodes', []), data.get('edges', [])
+        name = data.get('name', 'ML Pipeline')
+    
+    # Only server-generated code is executed; scripts are never accepted from the client
+    errors, _, _ = validate_pipeline_structure(nodes, edges)
+    if errors:
+        return jsonify({'error': 'Pipeline is not valid', 'errors': errors}), 400
+    
+    # Loaders read only from the data directory: no URLs, absolute paths or '..'
+    nodes, errors = confine_data_paths(nodes, current_app.config['EXECUTION_DATA_DIR'])
+    if errors:
+        return jsonify({'error': 'Pipeline is not valid', 'errors': errors}), 400
+    
+    mode = data.get('mode', 'script')
+    if mode == 'nodes':
+        # Node by node, re-running only nodes whose cached outputs are stale
+        steps, errors = plan_nodes(nodes, edges)
+        if errors:
+            return jsonify({'error': 'Pipeline is not valid', 'errors': errors}), 400
+        task = {'task': 'nodes', 'steps': steps}
+    elif mode == 'script':
+        task = {'task': 'script', 'script': generate_python_code(nodes, edges, name)}
+    else:
+        return jsonify({'error': "mode must be 'script' or 'nodes'"}), 400
+    
+    try:
+        job = job_queue.enqueue(current_user.id, 'run', task, pipeline_id=model_id)
+    except QueueFull:
+        return jsonify({'error': 'Execution queue is full, try again shortly'}), 429
+    
+    return jsonify({'job_id': job.id, 'status': job.status}), 202
+
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+@login_required
+def get_job(job_id):
+    """Get the status, node progress and, once finished, the result of a job"""
+    job = BackgroundJob.query.filter_by(id=job_id, user_id=current_user.id).first()
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+
+# ===== EXPORT ENDPOINTS (Phase 3) =====
+
+def _export_model(model_id, fmt, options=None):
+    """
+    Export a saved pipeline in the given format.
+    
+    With "async": true in the body the export runs as a background job and
+    the response is 202 with its job id (see GET /api/jobs/<job_id>).
+    """
+    from app.execution import QueueFull, job_queue
+    from app.utils.exporters import export_pipeline
     
     model = SavedModel.query.get_or_404(model_id)
     if model.user_id != current_user.id:
         return jsonify({'error': 'Unauthorized'}), 403
     
-    data = request.get_json() or {}
+    data = request.get_json(silent=True) or {}
     nodes = json.loads(model.nodes)
     edges = json.loads(model.edges)
     
-    result = DockerExporter.export_docker(
-        nodes=nodes,
-        edges=edges,
-        pipeline_name=model.name,
-        description=model.description,
-        python_version=data.get('python_version', '3.10')
-    )
+    if data.get('async'):
+        task = {
+            'task': 'export',
+            'format': fmt,
+            'nodes': nodes,
+            'edges': edges,
+            'name': model.name,
+            'description': model.description,
+            'options': options
+        }
+        try:
+            job = job_queue.enqueue(current_user.id, 'export', task, pipeline_id=model.id)
+        except QueueFull:
+            return jsonify({'error': 'Execution queue is full, try again shortly'}), 429
+        return jsonify({'job_id': job.id, 'status': job.status}), 202
     
-    return jsonify(result)
+    return jsonify(export_pipeline(fmt, nodes, edges, model.name, model.description, options))
+
+
+@bp.route('/models/<int:model_id>/export/python', methods=['POST'])
+@login_required
+def export_python(model_id):
+    """Export pipeline as Python script"""
+    return _export_model(model_id, 'python')
+
+
+@bp.route('/models/<int:model_id>/export/notebook', methods=['POST'])
+@login_required
+def export_notebook(model_id):
+    """Export pipeline as Jupyter notebook"""
+    return _export_model(model_id, 'notebook')
+
+
+@bp.route('/models/<int:model_id>/export/docker', methods=['POST'])
+@login_required
+def export_docker(model_id):
+    """Export pipeline as Docker container"""
+    data = request.get_json(silent=True) or {}
+    return _export_model(model_id, 'docker', {'python_version': data.get('python_version', '3.10')})
 
 
 @bp.route('/models/<int:model_id>/export/requirements', methods=['POST'])
 @login_required
 def export_requirements(model_id):
     """Export pipeline requirements.txt"""
-    from app.utils.exporters.requirements_builder import RequirementsBuilder
+    return _export_model(model_id, 'requirements')
+
+
+@bp.route('/models/<int:model_id>/export/bundle', methods=['GET'])
+@login_required
+def export_bundle(model_id):
+    """Stream the whole project (script, notebook, Docker files, requirements) as a ZIP"""
+    from werkzeug.utils import secure_filename
+    from app.utils.exporters import bundle_name, pipeline_bundle, stream_zip
     
     model = SavedModel.query.get_or_404(model_id)
     if model.user_id != current_user.id:
         return jsonify({'error': 'Unauthorized'}), 403
     
     nodes = json.loads(model.nodes)
+    edges = json.loads(model.edges)
+    folder = secure_filename(bundle_name(model.name)) or 'pipeline'
     
-    requirements = RequirementsBuilder.from_nodes(nodes, pinned=True)
-    
-    return jsonify({
-        'requirements': requirements,
-        'filename': 'requirements.txt'
-    })
+    entries = pipeline_bundle(
+        nodes=nodes,
+        edges=edges,
+        pipeline_name=model.name,
+        description=model.description,
+        python_version=request.args.get('python_version', '3.10'),
+        prefix=folder + '/'
+    )
+    return Response(
+        stream_zip(entries),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{folder}.zip"'}
+    )
 
@@ -15,6 +15,11 @@ def login():
     if form.validate_on_submit():
         user = User.query.filter_by(email=form.email.data).first()
         if user and user.check_password(form.password.data):
+            # Upgrade hashes made with an older PASSWORD_HASH_METHOD
+            from app.utils.passwords import passwords
+            if passwords.needs_rehash(user.password_hash):
+                user.set_password(form.password.data)
+                db.session.commit()
             login_user(user, remember=form.remember_me.data)
             flash('Logged in successfully!', 'success')
             return redirect(url_for('main.dashboard'))
@@ -1,8 +1,10 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
+from flask import Blueprint, Response, current_app, render_template, request, flash, redirect, stream_with_context, url_for, jsonify
 from flask_login import login_required, current_user
 from app import db
-from app.models import Classroom, Enrollment, Classwork, Submission, SavedModel
+from app.models import Classroom, Enrollment, Classwork, Submission, SavedModel, User
 from datetime import datetime
+from sqlalchemy.orm import joinedload
+import json
 
 try:
     import markdown
@@ -96,11 +98,16 @@ def classroom_view(class_id):
             
     # organizing classwork by topic
     classworks = classroom.classwork.order_by(Classwork.created_at.desc()).all()
+    # Roster with each student's user row in one query
+    enrollments = Enrollment.query.filter_by(classroom_id=class_id).options(
+        joinedload(Enrollment.user)
+    ).order_by(Enrollment.id).all()
     
     return render_template('lms/classroom.html', 
                          classroom=classroom, 
                          is_teacher=is_teacher,
-                         classworks=classworks)
+                         classworks=classworks,
+                         enrollments=enrollments)
 
 @bp.route('/classroom/<int:class_id>/classwork/add', methods=['POST'])
 @login_required
@@ -146,13 +153,22 @@ def view_classwork(cw_id):
             return redirect(url_for('lms.dashboard'))
             
     submission = None
-    if not is_teacher:
+    enrollments, submissions = [], {}
+    if is_teacher:
+        # Roster and every submission up front rather than a lookup per student
+        enrollments = Enrollment.query.filter_by(classroom_id=classroom.id).options(
+            joinedload(Enrollment.user)
+        ).order_by(Enrollment.id).all()
+        submissions = {sub.student_id: sub for sub in work.submissions}
+    else:
         submission = Submission.query.filter_by(classwork_id=cw_id, student_id=current_user.id).first()
         
     return render_template('lms/assignment.html', 
                          work=work, 
                          is_teacher=is_teacher,
-                         submission=submission)
+                         submission=submission,
+                         enrollments=enrollments,
+                         submissions=submissions)
 
 @bp.route('/classwork/<int:cw_id>/edit', methods=['POST'])
 @login_required
@@ -214,6 +230,53 @@ def submit_assignment(cw_id):
     flash('Work submitted successfully!', 'success')
     return redirect(url_for('lms.view_classwork', cw_id=cw_id))
 
+@bp.route('/classwork/<int:cw_id>/submissions/export')
+@login_required
+def export_submissions(cw_id):
+    """Download every submitted pipeline as one streamed ZIP, a folder per student"""
+    from werkzeug.utils import secure_filename
+    from app.utils.exporters import export_many, stream_zip
+    
+    work = Classwork.query.get_or_404(cw_id)
+    if work.classroom.owner_id != current_user.id:
+        flash('Only teachers can export submissions', 'error')
+        return redirect(url_for('lms.view_classwork', cw_id=cw_id))
+    
+    fmt = request.args.get('format', 'python')
+    if fmt not in ('python', 'notebook'):
+        flash('Unknown export format', 'error')
+        return redirect(url_for('lms.view_classwork', cw_id=cw_id))
+    
+    # One query for all submissions, read in batches as the archive is written
+    rows = db.session.query(
+        User.id, User.username, SavedModel.name, SavedModel.description, SavedModel.nodes, SavedModel.edges
+    ).join(
+        Submission, Submission.student_id == User.id
+    ).join(
+        SavedModel, SavedModel.id == Submission.submission_model_id
+    ).filter(
+        Submission.classwork_id == cw_id
+    ).order_by(User.username).yield_per(50)
+    
+    def items():
+        for student_id, username, name, description, nodes, edges in rows:
+            # Different usernames can sanitize to the same name; the id keeps folders apart
+            safe = secure_filename(username)
+            folder = f'{safe}_{student_id}' if safe else f'student_{student_id}'
+            yield folder + '/', json.loads(nodes), json.loads(edges), name, description
+    
+    entries = export_many(
+        items(), fmt,
+        max_workers=current_app.config.get('SUBMISSION_EXPORT_WORKERS', 4),
+        window=current_app.config.get('SUBMISSION_EXPORT_WINDOW', 16)
+    )
+    filename = secure_filename(f'{work.title}_submissions') or 'submissions'
+    return Response(
+        stream_with_context(stream_zip(entries)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{filename}.zip"'}
+    )
+
 @bp.route('/submission/<int:sub_id>/grade', methods=['POST'])
 @login_required
 def grade_submission(sub_id):
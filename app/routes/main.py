@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, send_from_directory
 from flask_login import login_required, current_user
+from sqlalchemy.orm import joinedload, load_only
 import os
 
 bp = Blueprint('main', __name__)
@@ -8,15 +9,23 @@ bp = Blueprint('main', __name__)
 def landing():
     return render_template('landing.html')
 
-from app.models import Classroom, Enrollment
+from app.models import Classroom, Enrollment, SavedModel
 
 @bp.route('/dashboard')
 @login_required
 def dashboard():
     teaching = Classroom.query.filter_by(owner_id=current_user.id).all()
-    enrollments = Enrollment.query.filter_by(user_id=current_user.id).all()
-    enrolled = [e.classroom for e in enrollments]
-    return render_template('dashboard.html', teaching=teaching, enrolled=enrolled)
+    # Enrolled classrooms and their owners in one query
+    enrolled = Classroom.query.join(
+        Enrollment, Enrollment.classroom_id == Classroom.id
+    ).filter(
+        Enrollment.user_id == current_user.id
+    ).options(joinedload(Classroom.owner)).order_by(Enrollment.id).all()
+    # Only the columns the model cards show; nodes/edges hold the whole graph
+    models = SavedModel.query.options(
+        load_only(SavedModel.id, SavedModel.name, SavedModel.description, SavedModel.created_at)
+    ).filter_by(user_id=current_user.id).order_by(SavedModel.id).all()
+    return render_template('dashboard.html', teaching=teaching, enrolled=enrolled, models=models)
 
 @bp.route('/builder')
 def builder():
@@ -6,57 +6,129 @@ from flask_login import current_user
 # Namespace for Builder Collaboration
 NAMESPACE = '/builder'
 
+# Identity of each connected sid, captured at connect so events don't load the user
+_identities = {}
+
 @socketio.on('connect', namespace=NAMESPACE)
 def handle_connect():
     if current_user.is_authenticated:
-        pass # User connected
+        _identities[request.sid] = current_user._get_current_object()
     else:
         return False # Reject anonymous
 
+def _user():
+    return _identities.get(request.sid)
+
+def _pipeline_id(data):
+    try:
+        return int((data or {}).get('pipeline_id'))
+    except (TypeError, ValueError):
+        return None
+
 @socketio.on('join_pipeline', namespace=NAMESPACE)
 def on_join(data):
-    """User joins a pipeline room for collaboration"""
-    pipeline_id = data.get('pipeline_id')
+    """User joins a pipeline room and receives its current state (canvas_state)"""
+    from app.models import SavedModel
+    from app.realtime import engine, presence
+
+    user = _user()
+    pipeline_id = _pipeline_id(data)
+    model = db.session.get(SavedModel, pipeline_id) if pipeline_id is not None and user else None
+    if model is None or not (model.is_public or model.is_viewable_by(user.id)):
+        emit('canvas_error', {'pipeline_id': pipeline_id, 'error': 'Pipeline not found'})
+        return
+
     room = f"pipeline_{pipeline_id}"
     join_room(room)
+    engine.join(pipeline_id, request.sid, user.id, can_edit=model.user_id == user.id)
+    presence.join(pipeline_id, request.sid, user.id, user.username)
     
     emit('user_joined', {
-        'username': current_user.username,
-        'user_id': current_user.id
+        'username': user.username,
+        'user_id': user.id
     }, room=room, include_self=False)
 
 @socketio.on('leave_pipeline', namespace=NAMESPACE)
 def on_leave(data):
-    pipeline_id = data.get('pipeline_id')
+    from app.realtime import engine, presence
+
+    pipeline_id = _pipeline_id(data)
+    if pipeline_id is None or not engine.leave(pipeline_id, request.sid):
+        return
+    presence.leave(pipeline_id, request.sid)
     room = f"pipeline_{pipeline_id}"
     leave_room(room)
+    user = _user()
     
     emit('user_left', {
-        'username': current_user.username,
-        'user_id': current_user.id
+        'username': user.username,
+        'user_id': user.id
     }, room=room)
 
+@socketio.on('disconnect', namespace=NAMESPACE)
+def handle_disconnect():
+    from app.realtime import engine, presence
+
+    user = _identities.pop(request.sid, None)
+    presence.disconnect(request.sid)
+    for pipeline_id in engine.disconnect(request.sid):
+        emit('user_left', {
+            'username': user.username,
+            'user_id': user.id
+        }, room=f"pipeline_{pipeline_id}", include_self=False)
+
+@socketio.on('canvas_ops', namespace=NAMESPACE)
+def on_canvas_ops(data):
+    """
+    Apply operation deltas to the room's document (see app.realtime.document).
+    data: {pipeline_id, ops: [...], seq}. Applied ops reach the room in the
+    next canvas_ops batch; the sender gets canvas_ack {seq, version, rejected}.
+    """
+    from app.realtime import engine
+
+    pipeline_id = _pipeline_id(data)
+    seq = (data or {}).get('seq')
+    if pipeline_id is None or not engine.is_member(pipeline_id, request.sid):
+        emit('canvas_ack', {'pipeline_id': pipeline_id, 'seq': seq, 'error': 'Join the pipeline first'})
+        return
+    engine.submit(pipeline_id, request.sid, _user().id, data.get('ops'), seq)
+
+@socketio.on('canvas_sync', namespace=NAMESPACE)
+def on_canvas_sync(data):
+    """Resend the full state, e.g. after a client missed a batch (version gap)"""
+    from app.realtime import engine
+
+    pipeline_id = _pipeline_id(data)
+    if pipeline_id is not None and engine.is_member(pipeline_id, request.sid):
+        engine.sync(pipeline_id, request.sid)
+
 @socketio.on('canvas_update', namespace=NAMESPACE)
 def on_canvas_update(data):
     """
-    Broadcast canvas changes to all other users in the room.
-    data includes: {pipeline_id, action, changelog/state}
+    Legacy whole-canvas update: {pipeline_id, action, changelog/state}.
+    A state with nodes/edges replaces the room's document and goes out in
+    the next canvas_ops batch; anything else is relayed as before.
     """
-    pipeline_id = data.get('pipeline_id')
+    from app.realtime import engine
+
+    pipeline_id = _pipeline_id(data)
+    if pipeline_id is None or not engine.is_member(pipeline_id, request.sid):
+        return
     room = f"pipeline_{pipeline_id}"
+
+    state = data.get('state')
+    if isinstance(state, dict) and isinstance(state.get('nodes'), list) and isinstance(state.get('edges'), list):
+        engine.replace(pipeline_id, state['nodes'], state['edges'], _user().id, sid=request.sid)
+        return
     
     # Broadcast to everyone else
     emit('canvas_updated', data, room=room, include_self=False)
 
 @socketio.on('cursor_move', namespace=NAMESPACE)
 def on_cursor(data):
-    """Broadcast cursor position"""
-    pipeline_id = data.get('pipeline_id')
-    room = f"pipeline_{pipeline_id}"
-    
-    emit('remote_cursor', {
-        'user_id': current_user.id,
-        'username': current_user.username,
-        'x': data.get('x'),
-        'y': data.get('y')
-    }, room=room, include_self=False)
+    """Record the cursor position; the room gets every member's latest at the next presence flush"""
+    from app.realtime import presence
+
+    pipeline_id = _pipeline_id(data)
+    if pipeline_id is not None:
+        presence.move(pipeline_id, request.sid, data.get('x'), data.get('y'))
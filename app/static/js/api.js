@@ -47,9 +47,23 @@
         }
     }
 
+    // Every item of a keyset-paginated list, following next_after page by page
+    async function fetchAllPages(endpoint, key, pageSize = 200) {
+        const items = [];
+        let after = null;
+        do {
+            const separator = endpoint.includes('?') ? '&' : '?';
+            const cursor = after ? `&after=${encodeURIComponent(after)}` : '';
+            const page = await apiCall(`${endpoint}${separator}limit=${pageSize}${cursor}`);
+            items.push(...page[key]);
+            after = page.next_after;
+        } while (after);
+        return items;
+    }
+
     // Models API
     const modelsAPI = {
-        getAll: () => apiCall('/models'),
+        getAll: () => fetchAllPages('/models?summary=1', 'models'),
 
         get: (id) => apiCall(`/models/${id}`),
 
@@ -185,10 +199,28 @@
             method: 'POST',
             body: JSON.stringify({ python_version: pythonVersion })
         }),
-        exportRequirements: (modelId) => apiCall(`/models/${modelId}/export/requirements`, { method: 'POST' })
+        exportRequirements: (modelId) => apiCall(`/models/${modelId}/export/requirements`, { method: 'POST' }),
+        // URL of the streamed ZIP with every format; point a link or window.location at it
+        bundleUrl: (modelId, pythonVersion = '3.10') =>
+            `${API_BASE}/models/${modelId}/export/bundle?python_version=${encodeURIComponent(pythonVersion)}`,
+        // Background export; resolves to {job_id}, poll api.execution.getJob or listen for job_finished
+        exportAsync: (modelId, format, options = {}) => apiCall(`/models/${modelId}/export/${format}`, {
+            method: 'POST',
+            body: JSON.stringify({ ...options, async: true })
+        })
+    };
+
+    // Execution API
+    const executionAPI = {
+        run: (pipeline) => apiCall('/execution/run', {
+            method: 'POST',
+            body: JSON.stringify(pipeline),
+        }),
+        getJob: (jobId) => apiCall(`/jobs/${jobId}`),
     };
 
     // Export all APIs
     window.api.export = exportAPI;
+    window.api.execution = executionAPI;
     window.api.showToast = window.showToast;
 })();
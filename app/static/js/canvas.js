@@ -974,7 +974,7 @@
                     <div class="model-list-item" data-model-id="${model.id}">
                         <div class="model-info">
                             <div class="model-name">${model.name}</div>
-                            <div class="model-meta">${model.nodes.length} nodes</div>
+                            <div class="model-meta">${model.node_count ?? 0} nodes</div>
                         </div>
                         <button class="btn btn-sm btn-primary" onclick="window.loadModelById(${model.id})">
                             Open
@@ -131,10 +131,9 @@
                     break;
 
                 case 'docker':
-                    result = await window.api.export.exportDocker(currentModelId);
-                    // Create a zip file with all Docker artifacts
-                    await downloadDockerArtifacts(result);
-                    window.showToast('Docker files exported successfully!', 'success');
+                    // The server streams a ZIP with the Docker files, script, notebook and requirements
+                    downloadUrl(window.api.export.bundleUrl(currentModelId));
+                    window.showToast('Docker project exported as a ZIP!', 'success');
                     break;
 
                 case 'requirements':
@@ -194,30 +193,14 @@
     }
 
     /**
-     * Download Docker artifacts as multiple files
+     * Download a server response directly, letting the browser stream it to disk
      */
-    async function downloadDockerArtifacts(result) {
-        // Download each file separately
-        const files = {
-            'Dockerfile': result.Dockerfile,
-            'docker-compose.yml': result['docker-compose.yml'],
-            '.dockerignore': result['.dockerignore'],
-            'README.md': result['README.md'],
-            [result.script_filename]: result.script,
-            'requirements.txt': result.requirements
-        };
-
-        // Download with small delays to prevent browser blocking
-        for (const [filename, content] of Object.entries(files)) {
-            await new Promise(resolve => setTimeout(resolve, 100));
-            downloadFile(content, filename, 'text/plain');
-        }
-
-        // Show instruction
-        window.showToast(
-            'Docker files downloaded. Check your downloads folder!',
-            'success'
-        );
+    function downloadUrl(url) {
+        const a = document.createElement('a');
+        a.href = url;
+        document.body.appendChild(a);
+        a.click();
+        document.body.removeChild(a);
     }
 
     /**
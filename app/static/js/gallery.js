@@ -68,6 +68,21 @@ document.addEventListener('DOMContentLoaded', () => {
     // Initialize
     initGallery();
 
+    // The user's models (id and name), one keyset page at a time
+    async function fetchUserModels() {
+        const models = [];
+        let after = null;
+        do {
+            const params = new URLSearchParams({ fields: 'id,name', limit: '200' });
+            if (after) params.set('after', after);
+            const response = await fetch(`/api/models?${params}`);
+            const page = await response.json();
+            models.push(...page.models);
+            after = page.next_after;
+        } while (after);
+        return models;
+    }
+
     async function initGallery() {
         try {
             const promises = [
@@ -76,7 +91,7 @@ document.addEventListener('DOMContentLoaded', () => {
             ];
 
             if (window.isAuthenticated) {
-                promises.push(fetch('/api/models'));
+                promises.push(fetchUserModels());
             }
 
             const results = await Promise.all(promises);
@@ -84,7 +99,7 @@ document.addEventListener('DOMContentLoaded', () => {
             const tempData = await results[1].json();
 
             if (window.isAuthenticated) {
-                userModels = await results[2].json();
+                userModels = results[2];
                 populateModelSelect();
             }
 
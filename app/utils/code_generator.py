@@ -1,109 +1,84 @@
+from app.utils.codegen_cache import cache_key, code_cache
+from app.utils.pipeline_graph import PipelineGraph
+
+EMPTY_PIPELINE_CODE = '# No nodes in pipeline\nprint("Please add components to your pipeline first!")'
+
+PIPELINE_PREAMBLE = (
+    '# Main Pipeline\n'
+    'def run_ml_pipeline():\n'
+    '    """Execute the complete ML pipeline"""\n'
+    '    print("Starting ML Pipeline execution...")\n    \n'
+)
+
+PIPELINE_FOOTER = (
+    '    print("Pipeline execution completed!")\n\n'
+    '# Execute the pipeline\n'
+    'if __name__ == "__main__":\n'
+    '    run_ml_pipeline()\n'
+)
+
 def topological_sort(nodes, edges):
     """Perform topological sort on nodes based on edges"""
-    # Create adjacency list and in-degree count
-    graph = {node['id']: [] for node in nodes}
-    in_degree = {node['id']: 0 for node in nodes}
-    
-    # Build graph
-    for edge in edges:
-        graph[edge['source']].append(edge['target'])
-        in_degree[edge['target']] += 1
-    
-    # Find nodes with no incoming edges
-    queue = [node_id for node_id, degree in in_degree.items() if degree == 0]
-    result = []
-    
-    # Kahn's algorithm
-    while queue:
-        node_id = queue.pop(0)
-        node = next((n for n in nodes if n['id'] == node_id), None)
-        if node:
-            result.append(node)
-        
-        for neighbor in graph[node_id]:
-            in_degree[neighbor] -= 1
-            if in_degree[neighbor] == 0:
-                queue.append(neighbor)
-    
-    return result
+    return PipelineGraph(nodes, edges).sorted_nodes()
 
 def generate_python_code(nodes, edges, pipeline_name):
-    """Generate Python code from ML pipeline nodes and edges"""
+    """Generate Python code from ML pipeline nodes and edges (cached by content)"""
+    key = cache_key('python_code', nodes, edges, pipeline_name)
+    return code_cache.get_or_render(key, lambda: _render_python_code(nodes, edges, pipeline_name))
+
+def comment_text(value, limit=200):
+    """
+    User text (a pipeline name, description or node label) as one printable
+    line with no backslashes or double quotes, so it can't end the comment,
+    docstring or quoted string it is pasted into
+    """
+    text = ''.join(ch if ch.isprintable() else ' ' for ch in str(value or ''))
+    text = ' '.join(text.split()).replace('\\', '/').replace('"', "'")
+    return text[:limit]
+
+def render_header(pipeline_name):
+    """Comment banner at the top of the generated script"""
+    return f"# {comment_text(pipeline_name)}\n# Generated ML Pipeline Code\n\n"
+
+def node_parameters(node):
+    """Parameter values set on a canvas node"""
+    return node.get('data', {}).get('parameters') or {}
+
+def render_imports(import_lines):
+    """Sorted, de-duplicated import block"""
+    return '\n'.join(sorted(set(import_lines))) + '\n\n'
+
+def render_step(index, node, template):
+    """Code block for one pipeline step, or '' when the node has no compiled template"""
+    if template is None:
+        return ''
+
+    title = f'Step {index + 1}: {comment_text(node["data"]["label"])}'
+    block = f'    # {title}\n'
+    block += f'    print({title!r})\n'
+    return block + template.render_step(node_parameters(node)) + '\n    \n'
+
+def _render_python_code(nodes, edges, pipeline_name):
+    """Render the pipeline script without consulting the cache"""
     if not nodes:
-        return '# No nodes in pipeline\nprint("Please add components to your pipeline first!")'
-    
+        return EMPTY_PIPELINE_CODE
+
     # Load components to get templates
-    from app.utils.data_loader import get_components
-    comp_data = get_components()
-    components_list = comp_data.get('components', [])
-    components = {comp['id']: comp for comp in components_list}
-    
-    # Sort nodes topologically
-    sorted_nodes = topological_sort(nodes, edges)
-    
-    code = f"# {pipeline_name}\n# Generated ML Pipeline Code\n\n"
-    
+    from app.utils.data_loader import component_registry
+
+    # Sort nodes topologically and match each to its compiled template by componentId or name
+    sorted_nodes = PipelineGraph(nodes, edges).sorted_nodes()
+    templates = [component_registry.template_for(component_registry.resolve(node)) for node in sorted_nodes]
+
     # Collect imports
-    imports = set()
-    for node in sorted_nodes:
-        # Find matching component by componentId or name
-        component_id = node.get('data', {}).get('componentId')
-        component = components.get(component_id)
-        
-        if not component:
-            # Fallback: try to match by name
-            component = next((c for c in components.values() if c['name'] == node.get('name')), None)
-        
-        if component and 'pythonTemplate' in component:
-            template_lines = component['pythonTemplate'].split('\n')
-            for line in template_lines:
-                line = line.strip()
-                if line.startswith('from ') or line.startswith('import '):
-                    imports.add(line)
-    
-    code += '\n'.join(sorted(imports)) + '\n\n'
-    
-    # Add main pipeline code
-    code += '# Main Pipeline\n'
-    code += 'def run_ml_pipeline():\n'
-    code += '    """Execute the complete ML pipeline"""\n'
-    code += '    print("Starting ML Pipeline execution...")\n    \n'
-    
-    for index, node in enumerate(sorted_nodes):
-        component_id = node.get('data', {}).get('componentId')
-        component = components.get(component_id)
-        
-        if not component:
-            # Fallback: try to match by name
-            component = next((c for c in components.values() if c['name'] == node.get('name')), None)
-        
-        if component and 'pythonTemplate' in component:
-            code += f'    # Step {index + 1}: {node["data"]["label"]}\n'
-            code += f'    print("Step {index + 1}: {node["data"]["label"]}")\n'
-            
-            node_code = component['pythonTemplate']
-            
-            # Replace parameters in template
-            if 'parameters' in node['data']:
-                for key, value in node['data']['parameters'].items():
-                    placeholder = '{' + key + '}'
-                    if isinstance(value, str):
-                        replacement = f"'{value}'"
-                    elif isinstance(value, bool):
-                        replacement = 'True' if value else 'False'
-                    else:
-                        replacement = str(value)
-                    node_code = node_code.replace(placeholder, replacement)
-            
-            # Indent the code
-            indented_code = '\n'.join(
-                f'    {line}' for line in node_code.split('\n') if line.strip()
-            )
-            code += indented_code + '\n    \n'
-    
-    code += '    print("Pipeline execution completed!")\n\n'
-    code += '# Execute the pipeline\n'
-    code += 'if __name__ == "__main__":\n'
-    code += '    run_ml_pipeline()\n'
-    
-    return code
+    import_lines = []
+    for node, template in zip(sorted_nodes, templates):
+        if template is not None:
+            import_lines.extend(template.imports(node_parameters(node)))
+
+    parts = [render_header(pipeline_name), render_imports(import_lines), PIPELINE_PREAMBLE]
+    for index, (node, template) in enumerate(zip(sorted_nodes, templates)):
+        parts.append(render_step(index, node, template))
+    parts.append(PIPELINE_FOOTER)
+
+    return ''.join(parts)
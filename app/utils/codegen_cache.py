@@ -0,0 +1,115 @@
+"""
+Codegen Cache - Content-addressed LRU cache for generated code and exports
+"""
+import threading
+from collections import OrderedDict
+
+from app.utils.hashing import canonical_json, content_hash
+
+
+def cache_key(kind, nodes, edges, pipeline_name, **options):
+    """
+    Build the cache key for a rendered artifact.
+
+    The key covers the artifact kind, the canonical pipeline graph, its
+    name, the component catalog version and any exporter options, so a
+    catalog edit or a different option never serves stale output.
+    """
+    from app.utils.data_loader import component_registry
+
+    component_registry.all()
+    return content_hash(kind, nodes, edges, pipeline_name, component_registry.version, options)
+
+
+def _sizeof(value):
+    """Characters a cached value takes, counting containers by their JSON form"""
+    if isinstance(value, str):
+        return len(value)
+    return len(canonical_json(value))
+
+
+class CodeCache:
+    """
+    Thread-safe LRU cache bounded by entry count and total characters.
+
+    Rendering happens outside the lock; two concurrent misses on the same
+    key may both render, and the second simply replaces the first.
+    """
+
+    def __init__(self, max_entries=512, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure(self, max_entries=None, max_bytes=None):
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = _sizeof(value)
+        with self._lock:
+            if size > self.max_bytes:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            self._evict()
+
+    def get_or_render(self, key, render):
+        value = self.get(key)
+        if value is None:
+            value = render()
+            self.put(key, value)
+        return value
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def discard_where(self, predicate):
+        """Drop every entry whose key satisfies predicate"""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                _, size = self._entries.pop(key)
+                self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+code_cache = CodeCache()
@@ -0,0 +1,227 @@
+"""
+CodeGen Session - Incremental code generation for the live preview
+"""
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from typing import Dict, List, Tuple
+
+from app.utils.code_generator import (
+    EMPTY_PIPELINE_CODE, PIPELINE_FOOTER, PIPELINE_PREAMBLE,
+    node_parameters, render_header, render_imports, render_step
+)
+from app.utils.pipeline_graph import PipelineGraph
+
+
+def _edge_key(edge):
+    return edge.get('id') or f"{edge.get('source')}->{edge.get('target')}"
+
+
+class CodeGenSession:
+    """
+    Keeps the last render of a pipeline and re-renders only what a delta touches.
+
+    The output is always identical to ``generate_python_code`` for the same
+    nodes/edges. Step blocks are cached per node and reused while the node
+    is unchanged and keeps its position in the topological order; the import
+    header is maintained from per-node reference counts.
+
+    A delta looks like::
+
+        {
+            'nodes': {'add': [node, ...], 'update': [node, ...], 'remove': [node_id, ...]},
+            'edges': {'add': [edge, ...], 'remove': [edge_id_or_edge, ...]},
+            'name': 'New pipeline name'
+        }
+    """
+
+    def __init__(self, nodes: List[Dict], edges: List[Dict], pipeline_name: str):
+        from app.utils.data_loader import component_registry
+
+        self.registry = component_registry
+        self.pipeline_name = pipeline_name
+        self.nodes = {}
+        self.edges = {}
+        self._templates = {}
+        self._imports = {}
+        self._import_counts = Counter()
+        self._blocks = {}
+        self._segments = []
+        self._catalog_version = None
+        self._lock = threading.Lock()
+        self.code = ''
+
+        for node in nodes:
+            self._set_node(node)
+        for edge in edges:
+            self.edges[_edge_key(edge)] = edge
+        self.apply({})
+
+    def _set_node(self, node):
+        node_id = node['id']
+        if node_id in self.nodes:
+            # Update in place so the node keeps its position (topological tie-break)
+            self._import_counts.subtract(self._imports.pop(node_id))
+            self._blocks.pop(node_id, None)
+        template = self.registry.template_for(self.registry.resolve(node))
+        imports = template.imports(node_parameters(node)) if template else []
+        self.nodes[node_id] = node
+        self._templates[node_id] = template
+        self._imports[node_id] = imports
+        self._import_counts.update(imports)
+        self._import_counts += Counter()  # drop zero counts
+
+    def _drop_node(self, node_id):
+        if node_id not in self.nodes:
+            return
+        del self.nodes[node_id]
+        del self._templates[node_id]
+        self._import_counts.subtract(self._imports.pop(node_id))
+        self._import_counts += Counter()  # drop zero counts
+        self._blocks.pop(node_id, None)
+
+    def _refresh_catalog(self):
+        self.registry.all()
+        if self.registry.version == self._catalog_version:
+            return
+        self._catalog_version = self.registry.version
+        for node in list(self.nodes.values()):
+            self._set_node(node)
+
+    def _apply_delta(self, delta):
+        node_delta = delta.get('nodes') or {}
+        edge_delta = delta.get('edges') or {}
+
+        removed = set(node_delta.get('remove') or [])
+        for node_id in removed:
+            self._drop_node(node_id)
+        if removed:
+            self.edges = {
+                key: edge for key, edge in self.edges.items()
+                if edge.get('source') not in removed and edge.get('target') not in removed
+            }
+
+        for node in (node_delta.get('add') or []) + (node_delta.get('update') or []):
+            self._set_node(node)
+
+        for edge in edge_delta.get('remove') or []:
+            self.edges.pop(_edge_key(edge) if isinstance(edge, dict) else edge, None)
+        for edge in edge_delta.get('add') or []:
+            self.edges[_edge_key(edge)] = edge
+
+        if delta.get('name') is not None:
+            self.pipeline_name = delta['name']
+
+    def _render_segments(self):
+        if not self.nodes:
+            return [EMPTY_PIPELINE_CODE]
+
+        graph = PipelineGraph(list(self.nodes.values()), list(self.edges.values()))
+        order = graph.order
+
+        # Nodes stuck on a cycle are never rendered, so neither are their imports
+        import_counts = self._import_counts
+        if graph.cyclic_nodes:
+            import_counts = import_counts - Counter(
+                line for node_id in graph.cyclic_nodes for line in self._imports[node_id]
+            )
+
+        segments = [
+            render_header(self.pipeline_name),
+            render_imports(import_counts.keys()),
+            PIPELINE_PREAMBLE
+        ]
+        for index, node_id in enumerate(order):
+            cached = self._blocks.get(node_id)
+            if cached is None or cached[0] != index:
+                cached = (index, render_step(index, self.nodes[node_id], self._templates[node_id]))
+                self._blocks[node_id] = cached
+            segments.append(cached[1])
+        segments.append(PIPELINE_FOOTER)
+        return segments
+
+    def apply(self, delta: Dict) -> Tuple[str, List[Tuple[int, int]]]:
+        """
+        Apply a node/edge delta and return ``(code, changed_line_ranges)``.
+
+        Ranges are 0-based, half-open ``(start, end)`` line spans in the new
+        code; a pure deletion shows up as an empty span at the cut point.
+        """
+        with self._lock:
+            self._refresh_catalog()
+            self._apply_delta(delta)
+
+            old = self._segments
+            new = self._render_segments()
+            self._segments = new
+            self.code = ''.join(new)
+            return self.code, _changed_line_ranges(old, new)
+
+
+def _changed_line_ranges(old, new):
+    """Line spans in ``new`` covering the segments that differ from ``old``"""
+    def same(a, b):
+        return a is b or a == b
+
+    prefix = 0
+    limit = min(len(old), len(new))
+    while prefix < limit and same(old[prefix], new[prefix]):
+        prefix += 1
+    if prefix == len(old) == len(new):
+        return []
+
+    suffix = 0
+    while (suffix < limit - prefix
+           and same(old[len(old) - 1 - suffix], new[len(new) - 1 - suffix])):
+        suffix += 1
+
+    line = sum(segment.count('\n') for segment in new[:prefix])
+    changed = new[prefix:len(new) - suffix]
+
+    if len(old) != len(new):
+        end = line + sum(segment.count('\n') for segment in changed)
+        return [(line, end)]
+
+    # Same shape: report each differing segment, merging neighbours
+    ranges = []
+    for offset, segment in enumerate(changed):
+        lines = segment.count('\n')
+        if not same(old[prefix + offset], segment):
+            if ranges and ranges[-1][1] == line:
+                ranges[-1] = (ranges[-1][0], line + lines)
+            else:
+                ranges.append((line, line + lines))
+        line += lines
+    return ranges
+
+
+class CodeGenSessionStore:
+    """Bounded, LRU-evicted registry of live preview sessions"""
+
+    def __init__(self, max_sessions=256):
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, nodes, edges, pipeline_name):
+        session = CodeGenSession(nodes, edges, pipeline_name)
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self._sessions[session_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session_id, session
+
+    def get(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def discard(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+codegen_sessions = CodeGenSessionStore()
@@ -1,16 +1,122 @@
+import hashlib
 import json
 import os
+import threading
+
+from app.utils.template_compiler import compile_component
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+
+class ComponentRegistry:
+    """
+    Process-wide cache of the component catalog.
+
+    The catalog is parsed once and indexed by id, name, category and type,
+    and every pythonTemplate is compiled (see template_compiler) at load.
+    Every access stats the file; it is only re-read when its mtime or size
+    changes, and only re-indexed when the content hash actually differs.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._stat = None
+        self.version = None
+        self.components = []
+        self.by_id = {}
+        self.by_name = {}
+        self.by_category = {}
+        self.by_type = {}
+        self.compiled = {}
+
+    def _file_signature(self):
+        st = os.stat(self.file_path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def _refresh(self):
+        signature = self._file_signature()
+        if signature == self._stat:
+            return
+        with self._lock:
+            if signature == self._stat:
+                return
+            with open(self.file_path, 'rb') as f:
+                raw = f.read()
+            version = hashlib.sha256(raw).hexdigest()
+            if version != self.version:
+                self._index(json.loads(raw.decode('utf-8')))
+                self.version = version
+            self._stat = signature
+
+    def _index(self, components):
+        by_id, by_name, by_category, by_type, compiled = {}, {}, {}, {}, {}
+        for comp in components:
+            if comp['id'] not in by_id:
+                compiled[comp['id']] = compile_component(comp)
+            by_id.setdefault(comp['id'], comp)
+            by_name.setdefault(comp.get('name'), comp)
+            by_category.setdefault(comp.get('category'), []).append(comp)
+            by_type.setdefault(comp.get('type'), []).append(comp)
+        self.components = components
+        self.by_id = by_id
+        self.by_name = by_name
+        self.by_category = by_category
+        self.by_type = by_type
+        self.compiled = compiled
+
+    def all(self):
+        self._refresh()
+        return self.components
+
+    def get(self, component_id):
+        self._refresh()
+        return self.by_id.get(component_id)
+
+    def get_by_name(self, name):
+        self._refresh()
+        return self.by_name.get(name)
+
+    def for_category(self, category):
+        self._refresh()
+        return self.by_category.get(category, [])
+
+    def for_type(self, component_type):
+        self._refresh()
+        return self.by_type.get(component_type, [])
+
+    def resolve(self, node):
+        """Find the component for a node by componentId, falling back to name"""
+        self._refresh()
+        component = self.by_id.get(node.get('data', {}).get('componentId'))
+        if component is None:
+            component = self.by_name.get(node.get('name'))
+        return component
+
+    def template_for(self, component):
+        """Compiled template for a component dict (None if it has no template)"""
+        if component is None:
+            return None
+        self._refresh()
+        return self.compiled.get(component['id'])
+
+    def invalidate(self):
+        """Force a re-read on the next access"""
+        with self._lock:
+            self._stat = None
+            self.version = None
+
+
+component_registry = ComponentRegistry(os.path.join(DATA_DIR, 'ml_components.json'))
+
 
 def get_components():
-    """Load ML components from JSON file"""
-    file_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'ml_components.json')
-    with open(file_path, 'r', encoding='utf-8') as f:
-        components = json.load(f)
-        return {'components': components}
+    """Load ML components from the cached catalog"""
+    return {'components': component_registry.all()}
 
 def get_templates():
     """Load ML templates from JSON file"""
-    file_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'ml_templates.json')
+    file_path = os.path.join(DATA_DIR, 'ml_templates.json')
     with open(file_path, 'r', encoding='utf-8') as f:
         templates = json.load(f)
         return {'templates': templates}
@@ -0,0 +1,93 @@
+"""
+Downsample - Reduce metric series to a target point count for charting
+"""
+from typing import List, Sequence, Tuple
+
+LTTB = 'lttb'
+MIN_MAX = 'minmax'
+METHODS = (LTTB, MIN_MAX)
+DEFAULT_POINTS = 1000
+MAX_POINTS = 10000
+
+
+def lttb(xs: Sequence, ys: Sequence, threshold: int) -> Tuple[List, List]:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, from each of threshold - 2 equal
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the average of the next bucket.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(xs), list(ys)
+
+    out_x, out_y = [xs[0]], [ys[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # Average of the next bucket (the last point for the final bucket)
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        start = int(i * every) + 1
+        end = next_start
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        out_x.append(xs[best])
+        out_y.append(ys[best])
+        a = best
+
+    out_x.append(xs[-1])
+    out_y.append(ys[-1])
+    return out_x, out_y
+
+
+def min_max(xs: Sequence, ys: Sequence, threshold: int) -> Tuple[List, List]:
+    """
+    Keep the first and last points, and the minimum and maximum of each of
+    (threshold - 2) // 2 equal buckets in between.
+
+    Preserves spikes that LTTB can smooth over; points stay in x order and
+    the chart keeps the series' full x range.
+    """
+    n = len(xs)
+    if threshold >= n:
+        return list(xs), list(ys)
+
+    kept = [0]
+    buckets = (threshold - 2) // 2
+    size = (n - 2) / buckets if buckets else 0
+    for i in range(buckets):
+        start, end = int(i * size) + 1, int((i + 1) * size) + 1
+        if start >= end:
+            continue
+        low = high = start
+        for j in range(start + 1, end):
+            if ys[j] < ys[low]:
+                low = j
+            elif ys[j] > ys[high]:
+                high = j
+        kept.extend(sorted({low, high}))
+    kept.append(n - 1)
+    return [xs[j] for j in kept], [ys[j] for j in kept]
+
+
+def downsample(xs: Sequence, ys: Sequence, threshold: int, method: str = LTTB) -> Tuple[List, List]:
+    """Downsample a series with the named method (points with a None value are dropped)"""
+    if method not in METHODS:
+        raise ValueError(f'Unknown downsampling method: {method}')
+    if any(y is None for y in ys):
+        pairs = [(x, y) for x, y in zip(xs, ys) if y is not None]
+        xs, ys = [x for x, _ in pairs], [y for _, y in pairs]
+    if method == MIN_MAX:
+        return min_max(xs, ys, threshold)
+    return lttb(xs, ys, threshold)
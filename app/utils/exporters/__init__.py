@@ -6,10 +6,53 @@ from .python_exporter import PythonExporter
 from .notebook_exporter import NotebookExporter
 from .docker_exporter import DockerExporter
 from .requirements_builder import RequirementsBuilder
+from .bundle import bundle_name, export_many, pipeline_bundle, stream_zip
 
 __all__ = [
     'PythonExporter',
     'NotebookExporter', 
     'DockerExporter',
-    'RequirementsBuilder'
+    'RequirementsBuilder',
+    'bundle_name',
+    'export_many',
+    'pipeline_bundle',
+    'stream_zip',
+    'FORMATS',
+    'export_pipeline'
 ]
+
+FORMATS = ('python', 'notebook', 'docker', 'requirements')
+
+
+def export_pipeline(fmt, nodes, edges, pipeline_name, description=None, options=None):
+    """Run the exporter for one format; shared by the export endpoints and background export jobs"""
+    options = options or {}
+    if fmt == 'python':
+        return PythonExporter.export_pipeline(
+            nodes=nodes,
+            edges=edges,
+            pipeline_name=pipeline_name,
+            description=description,
+            include_cli=True
+        )
+    if fmt == 'notebook':
+        return NotebookExporter.export_notebook(
+            nodes=nodes,
+            edges=edges,
+            pipeline_name=pipeline_name,
+            description=description
+        )
+    if fmt == 'docker':
+        return DockerExporter.export_docker(
+            nodes=nodes,
+            edges=edges,
+            pipeline_name=pipeline_name,
+            description=description,
+            python_version=options.get('python_version', '3.10')
+        )
+    if fmt == 'requirements':
+        return {
+            'requirements': RequirementsBuilder.from_nodes(nodes, pinned=True),
+            'filename': 'requirements.txt'
+        }
+    raise ValueError(f'Unknown export format {fmt!r}')
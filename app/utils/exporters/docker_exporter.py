@@ -1,8 +1,12 @@
 """
 Docker Exporter - Generates Docker containers for ML pipelines
 """
+import re
 from datetime import datetime
 from typing import Dict, List
+from app.utils.code_generator import comment_text
+from app.utils.codegen_cache import cache_key, code_cache
+from app.utils.exporters.bundle import archive_name
 from app.utils.exporters.python_exporter import PythonExporter
 from app.utils.exporters.requirements_builder import RequirementsBuilder
 
@@ -38,14 +42,36 @@ class DockerExporter:
         """
         self.python_version = python_version
         
+        key = cache_key(
+            'docker', nodes, edges, pipeline_name,
+            description=description, python_version=python_version
+        )
+        artifacts = code_cache.get_or_render(
+            key,
+            lambda: self._render_artifacts(nodes, edges, pipeline_name, description)
+        )
+        # Hand out a copy so callers can't mutate the cached entry
+        return dict(artifacts)
+    
+    def _render_artifacts(
+        self,
+        nodes: List[Dict],
+        edges: List[Dict],
+        pipeline_name: str,
+        description: str
+    ) -> Dict[str, str]:
+        """Render all Docker artifacts without consulting the cache."""
         # Generate Python script
         python_export = PythonExporter.export_pipeline(
             nodes, edges, pipeline_name, description, include_cli=True
         )
         
+        # The script is copied into the image under a name safe to use in the Dockerfile
+        script_filename = archive_name(python_export['filename'])
+        
         # Generate Dockerfile
         dockerfile = self._generate_dockerfile(
-            python_export['filename'],
+            script_filename,
             pipeline_name
         )
         
@@ -65,11 +91,12 @@ class DockerExporter:
             'README.md': readme,
             'script': python_export['script'],
             'requirements': python_export['requirements'],
-            'script_filename': python_export['filename']
+            'script_filename': script_filename
         }
     
     def _generate_dockerfile(self, script_filename: str, pipeline_name: str) -> str:
         """Generate Dockerfile content."""
+        pipeline_name = comment_text(pipeline_name)
         return f"""# Dockerfile for {pipeline_name}
 # Generated by DominoML on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
@@ -119,9 +146,15 @@ HEALTHCHECK --interval=30s --timeout=10s --start-period=5s --retries=3 \\
 CMD ["python", "{script_filename}"]
 """
     
+    @staticmethod
+    def _service_name(pipeline_name: str) -> str:
+        """Compose service, container and image name: lowercase letters, digits, '_', '.' and '-'"""
+        service_name = re.sub(r'[^a-z0-9_.-]+', '-', pipeline_name.lower()).strip('-.')
+        return service_name or 'pipeline'
+    
     def _generate_docker_compose(self, pipeline_name: str) -> str:
         """Generate docker-compose.yml content."""
-        service_name = pipeline_name.lower().replace(' ', '-')
+        service_name = self._service_name(pipeline_name)
         
         return f"""version: '3.8'
 
@@ -207,9 +240,9 @@ models/
     
     def _generate_docker_readme(self, pipeline_name: str) -> str:
         """Generate Docker deployment README."""
-        service_name = pipeline_name.lower().replace(' ', '-')
+        service_name = self._service_name(pipeline_name)
         
-        return f"""# {pipeline_name} - Docker Deployment
+        return f"""# {comment_text(pipeline_name)} - Docker Deployment
 
 Generated by DominoML on {datetime.now().strftime('%Y-%m-%d')}
 
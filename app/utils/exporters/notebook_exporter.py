@@ -4,7 +4,9 @@ Notebook Exporter - Generates Jupyter notebooks from ML pipelines
 import json
 from datetime import datetime
 from typing import Dict, List
-from app.utils.code_generator import topological_sort
+from app.utils.code_generator import comment_text
+from app.utils.codegen_cache import cache_key, code_cache
+from app.utils.pipeline_graph import PipelineGraph
 
 
 class NotebookExporter:
@@ -39,6 +41,20 @@ class NotebookExporter:
         Returns:
             Jupyter notebook JSON string
         """
+        key = cache_key('notebook', nodes, edges, pipeline_name, description=description)
+        return code_cache.get_or_render(
+            key,
+            lambda: self._render_notebook(nodes, edges, pipeline_name, description)
+        )
+    
+    def _render_notebook(
+        self,
+        nodes: List[Dict],
+        edges: List[Dict],
+        pipeline_name: str,
+        description: str
+    ) -> str:
+        """Render the notebook JSON without consulting the cache."""
         if not nodes:
             return self._generate_empty_notebook(pipeline_name)
         
@@ -56,6 +72,8 @@ class NotebookExporter:
             "## Setup\n\nImport required libraries and configure environment."
         ))
         
+        graph = PipelineGraph(nodes, edges)
+        
         # Collect imports
         imports_cell = self._generate_imports_cell(nodes)
         cells.append(imports_cell)
@@ -66,7 +84,7 @@ class NotebookExporter:
         ))
         
         # Sort nodes topologically
-        sorted_nodes = topological_sort(nodes, edges)
+        sorted_nodes = graph.sorted_nodes()
         
         # Create cell for each step
         for index, node in enumerate(sorted_nodes):
@@ -121,22 +139,15 @@ class NotebookExporter:
     
     def _generate_imports_cell(self, nodes: List[Dict]) -> Dict:
         """Generate cell with all imports."""
-        from app.utils.data_loader import get_components
-        
-        comp_data = get_components()
-        components_dict = {c['id']: c for c in comp_data.get('components', [])}
+        from app.utils.data_loader import component_registry
         
         imports = set()
         for node in nodes:
             component_id = node.get('data', {}).get('componentId')
-            component = components_dict.get(component_id)
+            template = component_registry.template_for(component_registry.get(component_id))
             
-            if component and 'pythonTemplate' in component:
-                template_lines = component['pythonTemplate'].split('\n')
-                for line in template_lines:
-                    line = line.strip()
-                    if line.startswith('from ') or line.startswith('import '):
-                        imports.add(line)
+            if template is not None:
+                imports.update(template.imports(node.get('data', {}).get('parameters') or {}))
         
         import_code = '\n'.join(sorted(imports))
         import_code += "\n\n# Configure display options\nimport warnings\nwarnings.filterwarnings('ignore')\n"
@@ -146,38 +157,16 @@ class NotebookExporter:
     
     def _generate_node_cell(self, node: Dict, index: int) -> Dict:
         """Generate code cell for a pipeline node."""
-        from app.utils.data_loader import get_components
-        
-        comp_data = get_components()
-        components_dict = {c['id']: c for c in comp_data.get('components', [])}
+        from app.utils.data_loader import component_registry
         
         component_id = node.get('data', {}).get('componentId')
-        component = components_dict.get(component_id)
-        
-        if not component or 'pythonTemplate' not in component:
-            return self._create_code_cell(f"# Step {index + 1}: {node['data']['label']}\npass")
-        
-        node_code = component['pythonTemplate']
-        
-        # Replace parameters
-        if 'parameters' in node['data']:
-            for key, value in node['data']['parameters'].items():
-                placeholder = '{' + key + '}'
-                if isinstance(value, str):
-                    replacement = f"'{value}'"
-                elif isinstance(value, bool):
-                    replacement = 'True' if value else 'False'
-                else:
-                    replacement = str(value)
-                node_code = node_code.replace(placeholder, replacement)
-        
-        # Remove import statements (already in imports cell)
-        code_lines = []
-        for line in node_code.split('\n'):
-            if not line.strip().startswith(('import ', 'from ')):
-                code_lines.append(line)
-        
-        clean_code = '\n'.join(code_lines).strip()
+        template = component_registry.template_for(component_registry.get(component_id))
+        
+        if template is None:
+            return self._create_code_cell(f"# Step {index + 1}: {comment_text(node['data']['label'])}\npass")
+        
+        # Substitute parameters; import statements are already in the imports cell
+        clean_code = template.render_body(node['data'].get('parameters') or {})
         
         return self._create_code_cell(clean_code)
     
@@ -3,7 +3,8 @@ Python Exporter - Generates standalone Python scripts from ML pipelines
 """
 from datetime import datetime
 from typing import Dict, List
-from app.utils.code_generator import generate_python_code
+from app.utils.code_generator import comment_text, generate_python_code
+from app.utils.codegen_cache import cache_key, code_cache
 from app.utils.exporters.requirements_builder import RequirementsBuilder
 
 
@@ -55,13 +56,31 @@ logger = logging.getLogger(__name__)
         Returns:
             Complete Python script as string
         """
+        key = cache_key(
+            'python_script', nodes, edges, pipeline_name,
+            description=description, include_cli=include_cli
+        )
+        return code_cache.get_or_render(
+            key,
+            lambda: self._render_script(nodes, edges, pipeline_name, description, include_cli)
+        )
+    
+    def _render_script(
+        self,
+        nodes: List[Dict],
+        edges: List[Dict],
+        pipeline_name: str,
+        description: str,
+        include_cli: bool
+    ) -> str:
+        """Render the script without consulting the cache."""
         if not nodes:
             return self._generate_empty_script(pipeline_name)
         
         # Generate header
         header = self.template_header.format(
-            pipeline_name=pipeline_name,
-            description=description or "ML Pipeline",
+            pipeline_name=comment_text(pipeline_name),
+            description=comment_text(description) or "ML Pipeline",
             created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         )
         
@@ -95,7 +114,7 @@ logger = logging.getLogger(__name__)
         """Generate a minimal script when no nodes are present."""
         return f"""#!/usr/bin/env python3
 \"\"\"
-{pipeline_name}
+{comment_text(pipeline_name)}
 Generated by DominoML
 \"\"\"
 
@@ -115,7 +134,7 @@ def parse_arguments():
     \"\"\"Parse command-line arguments.\"\"\"
     import argparse
     parser = argparse.ArgumentParser(
-        description='{pipeline_name}'
+        description={pipeline_name!r}
     )
     parser.add_argument(
         '--verbose', '-v',
@@ -150,7 +169,7 @@ def main():
 
 if __name__ == "__main__":
     sys.exit(main())
-""".format(pipeline_name=pipeline_name)
+""".format(pipeline_name=comment_text(pipeline_name))
         
         # Replace the existing if __name__ == "__main__" block
         lines = script.split('\n')
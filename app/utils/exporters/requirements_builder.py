@@ -58,19 +58,15 @@ class RequirementsBuilder:
         Args:
             nodes: List of pipeline node dictionaries
         """
-        from app.utils.data_loader import get_components
-        
-        # Load component definitions
-        comp_data = get_components()
-        components_dict = {c['id']: c for c in comp_data.get('components', [])}
+        from app.utils.data_loader import component_registry
         
         # Analyze each node
         for node in nodes:
             component_id = node.get('data', {}).get('componentId')
-            component = components_dict.get(component_id)
+            template = component_registry.template_for(component_registry.get(component_id))
             
-            if component and 'pythonTemplate' in component:
-                self.analyze_code(component['pythonTemplate'])
+            if template is not None:
+                self.analyze_code('\n'.join(template.raw_imports))
     
     def _add_package(self, module: str) -> None:
         """
@@ -0,0 +1,166 @@
+"""
+Graph Diff - Structural diff between two pipeline graphs
+"""
+from typing import Dict, List
+
+from app.utils.codegen_cache import CodeCache
+
+# Compare results per (version1, version2) pair; versions are immutable once written
+diff_cache = CodeCache(max_entries=256, max_bytes=16 * 1024 * 1024)
+
+
+def _content_key(node):
+    data = node.get('data', {})
+    return (data.get('componentId'), data.get('label'))
+
+
+def _summary(node):
+    data = node.get('data', {})
+    return {'id': node['id'], 'componentId': data.get('componentId'), 'label': data.get('label')}
+
+
+def match_nodes(nodes1: List[Dict], nodes2: List[Dict]) -> Dict[str, str]:
+    """
+    Map old node ids to new node ids.
+
+    Nodes are matched by id first; the leftovers are paired by
+    (componentId, label) in canvas order, which catches nodes that were
+    deleted and re-created.
+    """
+    old = {node['id']: node for node in nodes1}
+    new = {node['id']: node for node in nodes2}
+    mapping = {node_id: node_id for node_id in old if node_id in new}
+
+    unmatched_new = {}
+    for node_id, node in new.items():
+        if node_id not in mapping:
+            unmatched_new.setdefault(_content_key(node), []).append(node_id)
+
+    for node_id, node in old.items():
+        if node_id in mapping:
+            continue
+        candidates = unmatched_new.get(_content_key(node))
+        if candidates:
+            mapping[node_id] = candidates.pop(0)
+    return mapping
+
+
+def _param_changes(params1, params2):
+    changes = {}
+    for key in params1.keys() | params2.keys():
+        before, after = params1.get(key), params2.get(key)
+        if before != after:
+            changes[key] = [before, after]
+    return changes
+
+
+def _edge_ends(edge, mapping=None):
+    source, target = edge.get('source'), edge.get('target')
+    if mapping is not None:
+        source, target = mapping.get(source, source), mapping.get(target, target)
+    return (source, target)
+
+
+def diff_pipelines(nodes1: List[Dict], edges1: List[Dict], nodes2: List[Dict], edges2: List[Dict]) -> Dict:
+    """
+    Compact structural diff from graph 1 to graph 2.
+
+    Reports added/removed nodes, nodes matched by content rather than id,
+    moved nodes, label and parameter changes, and added/removed/rewired edges.
+    Edge endpoints from graph 1 are translated through the node mapping, so
+    re-created nodes don't show up as rewiring.
+    """
+    old = {node['id']: node for node in nodes1}
+    new = {node['id']: node for node in nodes2}
+    mapping = match_nodes(nodes1, nodes2)
+    matched_new = set(mapping.values())
+
+    nodes_diff = {
+        'added': [_summary(node) for node_id, node in new.items() if node_id not in matched_new],
+        'removed': [_summary(node) for node_id, node in old.items() if node_id not in mapping],
+        'rematched': [
+            {'old_id': old_id, 'new_id': new_id}
+            for old_id, new_id in mapping.items() if old_id != new_id
+        ],
+        'moved': [],
+        'changed': []
+    }
+
+    for old_id, new_id in mapping.items():
+        before, after = old[old_id], new[new_id]
+        position1, position2 = before.get('position'), after.get('position')
+        if position1 != position2:
+            nodes_diff['moved'].append({'id': new_id, 'from': position1, 'to': position2})
+
+        data1, data2 = before.get('data', {}), after.get('data', {})
+        change = {}
+        if data1.get('label') != data2.get('label'):
+            change['label'] = [data1.get('label'), data2.get('label')]
+        if data1.get('componentId') != data2.get('componentId'):
+            change['componentId'] = [data1.get('componentId'), data2.get('componentId')]
+        params = _param_changes(data1.get('parameters') or {}, data2.get('parameters') or {})
+        if params:
+            change['parameters'] = params
+        if change:
+            change['id'] = new_id
+            nodes_diff['changed'].append(change)
+
+    # Edges: same id with different ends is a rewire, otherwise compare by endpoints
+    old_edges = {edge['id']: edge for edge in edges1 if edge.get('id')}
+    rewired = []
+    rewired_ids = set()
+    for edge in edges2:
+        previous = old_edges.get(edge.get('id'))
+        if previous is None:
+            continue
+        ends1, ends2 = _edge_ends(previous, mapping), _edge_ends(edge)
+        if ends1 != ends2:
+            rewired.append({'id': edge['id'], 'from': list(ends1), 'to': list(ends2)})
+            rewired_ids.add(edge['id'])
+
+    old_ends = {_edge_ends(edge, mapping) for edge in edges1 if edge.get('id') not in rewired_ids}
+    new_ends = {_edge_ends(edge) for edge in edges2 if edge.get('id') not in rewired_ids}
+
+    edges_diff = {
+        'added': [list(ends) for ends in new_ends - old_ends],
+        'removed': [list(ends) for ends in old_ends - new_ends],
+        'rewired': rewired
+    }
+    edges_diff['added'].sort()
+    edges_diff['removed'].sort()
+
+    return {
+        'nodes': nodes_diff,
+        'edges': edges_diff,
+        'summary': {
+            'nodes_added': len(nodes_diff['added']),
+            'nodes_removed': len(nodes_diff['removed']),
+            'nodes_moved': len(nodes_diff['moved']),
+            'nodes_changed': len(nodes_diff['changed']),
+            'edges_added': len(edges_diff['added']),
+            'edges_removed': len(edges_diff['removed']),
+            'edges_rewired': len(rewired),
+            'identical': not any((
+                nodes_diff['added'], nodes_diff['removed'], nodes_diff['moved'],
+                nodes_diff['changed'], edges_diff['added'], edges_diff['removed'], rewired
+            ))
+        }
+    }
+
+
+def diff_versions(version1, version2) -> Dict:
+    """diff_pipelines for two PipelineVersions, cached per pair"""
+    key = ('version_diff', version1.id, version1.created_at, version2.id, version2.created_at)
+
+    def render():
+        nodes1, edges1, _ = version1.graph()
+        nodes2, edges2, _ = version2.graph()
+        return diff_pipelines(nodes1, edges1, nodes2, edges2)
+
+    return diff_cache.get_or_render(key, render)
+
+
+def discard_version(version):
+    """Evict cached diffs involving a version (call before deleting it)"""
+    key = (version.id, version.created_at)
+    diff_cache.discard_where(lambda cached: cached[1:3] == key or cached[3:5] == key)
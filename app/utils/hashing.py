@@ -0,0 +1,12 @@
+import hashlib
+import json
+
+
+def canonical_json(value):
+    """Serialize to JSON with sorted keys and no whitespace so equal data hashes equally"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def content_hash(*parts):
+    """SHA-256 hex digest of the canonical JSON form of the given values"""
+    return hashlib.sha256(canonical_json(parts).encode('utf-8')).hexdigest()
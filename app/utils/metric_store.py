@@ -0,0 +1,306 @@
+"""
+Metric Store - Bulk ingestion of model metrics
+"""
+import json
+import math
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+DEFAULT_METRIC_TYPE = 'training'
+INSERT_BATCH_SIZE = 20000
+
+# Columns produced by the parsers and consumed by insert_metrics
+FIELDS = ('version_id', 'metric_name', 'metric_value', 'metric_type', 'epoch', 'meta_data')
+
+
+def _check_name(name):
+    if not isinstance(name, str) or not name or len(name) > 100:
+        raise ValueError(f'Invalid metric name: {name!r}')
+    return name
+
+
+def _check_type(metric_type):
+    if metric_type is None:
+        return DEFAULT_METRIC_TYPE
+    if not isinstance(metric_type, str) or len(metric_type) > 50:
+        raise ValueError(f'Invalid metric type: {metric_type!r}')
+    return metric_type
+
+
+def _check_value(value):
+    if value is not None and (type(value) not in (int, float) or not math.isfinite(value)):
+        raise ValueError(f'Invalid metric value: {value!r}')
+    return value
+
+
+def coerce_value(value):
+    """Value of a single posted metric: like the bulk columns, but numeric strings are converted"""
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            raise ValueError(f'Invalid metric value: {value!r}')
+    return _check_value(value)
+
+
+def _check_epoch(epoch):
+    if epoch is not None and type(epoch) is not int:
+        raise ValueError(f'Invalid epoch: {epoch!r}')
+    return epoch
+
+
+def _dump_metadata(metadata):
+    return json.dumps(metadata) if metadata else None
+
+
+def _column(data, key, count, check, default=None):
+    """
+    A columnar field as a list of length count.
+
+    A scalar is checked once and broadcast; a list is checked per distinct
+    value for strings, per entry otherwise.
+    """
+    value = data.get(key, default)
+    if not isinstance(value, list):
+        return [check(value)] * count
+    if len(value) != count:
+        raise ValueError(f"'{key}' has {len(value)} entries, expected {count}")
+    if check in (_check_name, _check_type):
+        checked = {item: check(item) for item in set(value)}
+        return [checked[item] for item in value]
+    return [check(item) for item in value]
+
+
+def parse_columnar(version_id: int, data: Dict, max_points: int = None) -> Dict[str, List]:
+    """
+    Metric columns (keyed by FIELDS) from a columnar payload:
+
+        {"names": [...] | "loss", "values": [...], "epochs": [...],
+         "types": [...] | "training", "metadata": [...]}
+
+    'values' sets the row count; the other columns are lists of the same
+    length or a single value applied to every row.
+    """
+    values = data.get('values')
+    if not isinstance(values, list):
+        raise ValueError("'values' must be a list")
+    count = len(values)
+    if max_points is not None and count > max_points:
+        raise ValueError(f'Too many points ({count}), limit is {max_points}')
+
+    return {
+        'version_id': [version_id] * count,
+        'metric_name': _column(data, 'names', count, _check_name),
+        'metric_value': [_check_value(value) for value in values],
+        'metric_type': _column(data, 'types', count, _check_type),
+        'epoch': _column(data, 'epochs', count, _check_epoch),
+        'meta_data': _column(data, 'metadata', count, _dump_metadata)
+    }
+
+
+def parse_ndjson(version_id: int, text: str, max_points: int = None) -> Dict[str, List]:
+    """Metric columns from newline-delimited {"name", "value", "type", "epoch", "metadata"} objects"""
+    columns = {field: [] for field in FIELDS}
+    names, values, types = columns['metric_name'], columns['metric_value'], columns['metric_type']
+    epochs, metadata = columns['epoch'], columns['meta_data']
+
+    for line_number, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            point = json.loads(line)
+            if not isinstance(point, dict):
+                raise ValueError('not a JSON object')
+            name = _check_name(point.get('name'))
+            value = _check_value(point.get('value'))
+            metric_type = _check_type(point.get('type'))
+            epoch = _check_epoch(point.get('epoch'))
+        except ValueError as e:
+            raise ValueError(f'Line {line_number}: {e}')
+        names.append(name)
+        values.append(value)
+        types.append(metric_type)
+        epochs.append(epoch)
+        metadata.append(_dump_metadata(point.get('metadata')))
+        if max_points is not None and len(names) > max_points:
+            raise ValueError(f'Too many points, limit is {max_points}')
+
+    columns['version_id'] = [version_id] * len(names)
+    return columns
+
+
+def insert_metrics(columns: Dict[str, List], created_at: datetime = None) -> int:
+    """
+    Insert metric columns without building ORM objects; the caller commits.
+
+    The INSERT is compiled once for the session's dialect and rows are
+    zipped straight into the driver's executemany, skipping SQLAlchemy's
+    per-row parameter processing. Every row in the call shares one created_at.
+    """
+    from sqlalchemy import bindparam
+
+    from app import db
+    from app.models import ModelMetric
+
+    count = len(columns['metric_name'])
+    if not count:
+        return 0
+
+    table = ModelMetric.__table__
+    connection = db.session.connection()
+    dialect = connection.dialect
+    compiled = table.insert().values(
+        {name: bindparam(name) for name in FIELDS + ('created_at',)}
+    ).compile(dialect=dialect)
+
+    timestamp = created_at or datetime.utcnow()
+    process_timestamp = table.c.created_at.type.dialect_impl(dialect).bind_processor(dialect)
+    if process_timestamp is not None:
+        timestamp = process_timestamp(timestamp)
+    columns = dict(columns, created_at=[timestamp] * count)
+
+    for start in range(0, count, INSERT_BATCH_SIZE):
+        end = start + INSERT_BATCH_SIZE
+        if compiled.positiontup is not None:
+            batch = list(zip(*(columns[name][start:end] for name in compiled.positiontup)))
+        else:
+            names = list(columns)
+            batch = [dict(zip(names, row)) for row in zip(*(columns[name][start:end] for name in names))]
+        connection.exec_driver_sql(compiled.string, batch)
+    return count
+
+
+def load_series(version_id: int, metric_name: str = None, metric_type: str = None,
+                epoch_min: int = None, epoch_max: int = None) -> Dict[tuple, Tuple[List, List]]:
+    """
+    (epochs, values) per (metric_name, metric_type), in epoch order.
+
+    Only the four needed columns are selected and rows without an epoch are
+    skipped; the scan follows the (version_id, metric_name, epoch) index.
+    """
+    from app import db
+    from app.models import ModelMetric
+
+    query = db.session.query(
+        ModelMetric.metric_name, ModelMetric.metric_type, ModelMetric.epoch, ModelMetric.metric_value
+    ).filter(ModelMetric.version_id == version_id, ModelMetric.epoch.isnot(None))
+    if metric_name:
+        query = query.filter(ModelMetric.metric_name == metric_name)
+    if metric_type:
+        query = query.filter(ModelMetric.metric_type == metric_type)
+    if epoch_min is not None:
+        query = query.filter(ModelMetric.epoch >= epoch_min)
+    if epoch_max is not None:
+        query = query.filter(ModelMetric.epoch <= epoch_max)
+    query = query.order_by(ModelMetric.metric_name, ModelMetric.epoch, ModelMetric.id)
+
+    series = {}
+    for name, kind, epoch, value in query:
+        epochs, values = series.setdefault((name, kind), ([], []))
+        epochs.append(epoch)
+        values.append(value)
+    return series
+
+
+def _fold(aggregate, epoch, value):
+    """Fold one point into an aggregate (MetricAggregate or a compatible object)"""
+    if value is None:
+        return
+    aggregate.count = (aggregate.count or 0) + 1
+    aggregate.sum_value = (aggregate.sum_value or 0.0) + value
+    if aggregate.min_value is None or value < aggregate.min_value:
+        aggregate.min_value = value
+    if aggregate.max_value is None or value > aggregate.max_value:
+        aggregate.max_value = value
+    # Points without an epoch sort before epoch 0; later arrivals win ties
+    order = -1 if epoch is None else epoch
+    last_order = -1 if aggregate.last_epoch is None else aggregate.last_epoch
+    if aggregate.last_value is None or order >= last_order:
+        aggregate.last_value = value
+        aggregate.last_epoch = epoch
+
+
+def _upsert(dialect_name):
+    """INSERT construct with ON CONFLICT support for the session's dialect"""
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def update_aggregates(points) -> None:
+    """
+    Fold (version_id, metric_name, metric_type, epoch, value) points into
+    MetricAggregate rows; the caller commits.
+
+    Points are reduced in memory first, then merged into the stored rows
+    with one INSERT ... ON CONFLICT DO UPDATE, so concurrent posts to the
+    same metric add up instead of overwriting each other.
+    """
+    from sqlalchemy import case, func
+
+    from app import db
+    from app.models import MetricAggregate
+
+    pending = {}
+    for version_id, name, metric_type, epoch, value in points:
+        key = (version_id, name, metric_type)
+        aggregate = pending.get(key)
+        if aggregate is None:
+            aggregate = pending[key] = MetricAggregate(
+                version_id=version_id, metric_name=name, metric_type=metric_type, count=0, sum_value=0.0
+            )
+        _fold(aggregate, epoch, value)
+
+    if not pending:
+        return
+
+    now = datetime.utcnow()
+    rows = [{
+        'version_id': batch.version_id,
+        'metric_name': batch.metric_name,
+        'metric_type': batch.metric_type,
+        'count': batch.count,
+        'sum_value': batch.sum_value,
+        'min_value': batch.min_value,
+        'max_value': batch.max_value,
+        'last_value': batch.last_value,
+        'last_epoch': batch.last_epoch,
+        'updated_at': now
+    } for batch in pending.values()]
+
+    table = MetricAggregate.__table__
+    insert = _upsert(db.session.get_bind().dialect.name)(table)
+    new, old = insert.excluded, table.c
+    # Same rule as _fold: points without an epoch sort before epoch 0, later arrivals win ties
+    newer = (new.last_value.isnot(None)) & (
+        old.last_value.is_(None) | (func.coalesce(new.last_epoch, -1) >= func.coalesce(old.last_epoch, -1))
+    )
+    statement = insert.on_conflict_do_update(
+        index_elements=['version_id', 'metric_name', 'metric_type'],
+        set_={
+            'count': func.coalesce(old.count, 0) + new.count,
+            'sum_value': func.coalesce(old.sum_value, 0.0) + new.sum_value,
+            'min_value': case(
+                (new.min_value.is_(None), old.min_value),
+                (old.min_value.is_(None) | (new.min_value < old.min_value), new.min_value),
+                else_=old.min_value
+            ),
+            'max_value': case(
+                (new.max_value.is_(None), old.max_value),
+                (old.max_value.is_(None) | (new.max_value > old.max_value), new.max_value),
+                else_=old.max_value
+            ),
+            'last_value': case((newer, new.last_value), else_=old.last_value),
+            'last_epoch': case((newer, new.last_epoch), else_=old.last_epoch),
+            'updated_at': new.updated_at
+        }
+    )
+    db.session.execute(statement, rows)
+
+
+def column_points(columns: Dict[str, List]):
+    """update_aggregates points from parsed metric columns"""
+    return zip(columns['version_id'], columns['metric_name'], columns['metric_type'],
+               columns['epoch'], columns['metric_value'])
@@ -0,0 +1,83 @@
+"""
+Passwords - Password hashing off the request's event loop
+
+Key derivation is deliberately slow. Under eventlet every request and
+socket event shares one OS thread, so hashing inline stalls all of them;
+instead the hash runs in a real OS thread through eventlet's tpool while
+the calling green thread yields. Outside eventlet it runs on a small
+thread pool. Either way at most max_workers hashes run at once.
+
+The method (werkzeug's notation, e.g. 'scrypt:32768:8:1' or
+'pbkdf2:sha256:1000000') comes from PASSWORD_HASH_METHOD; hashes made
+with other parameters are upgraded when their owner next logs in.
+"""
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+def _in_green_thread():
+    """True when called from an eventlet green thread (the hub is running)"""
+    if 'eventlet' not in sys.modules:
+        return False
+    import greenlet
+    return greenlet.getcurrent().parent is not None
+
+
+class PasswordHasher:
+    def __init__(self, method='scrypt:32768:8:1', max_workers=4):
+        self.method = method
+        self.max_workers = max_workers
+        self._prefix = None
+        self._pool = None
+        self._green_slots = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        with self._lock:
+            self.method = app.config.get('PASSWORD_HASH_METHOD') or self.method
+            self.max_workers = app.config.get('PASSWORD_HASH_WORKERS') or self.max_workers
+            self._prefix = None
+            pool, self._pool, self._green_slots = self._pool, None, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def _run(self, fn, *args):
+        if _in_green_thread():
+            from eventlet import tpool
+            from eventlet.semaphore import Semaphore
+
+            with self._lock:
+                if self._green_slots is None:
+                    self._green_slots = Semaphore(self.max_workers)
+                slots = self._green_slots
+            with slots:
+                return tpool.execute(fn, *args)
+
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='password')
+            pool = self._pool
+        return pool.submit(fn, *args).result()
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        if not pwhash:
+            return False
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        """True if pwhash wasn't made with the configured method and parameters"""
+        if not pwhash:
+            return True
+        if self._prefix is None:
+            # Hashing once spells out the defaults a short method name implies ('scrypt')
+            self._prefix = self.hash('').split('$', 1)[0]
+        return pwhash.split('$', 1)[0] != self._prefix
+
+
+passwords = PasswordHasher()
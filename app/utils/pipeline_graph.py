@@ -0,0 +1,202 @@
+"""
+Pipeline Graph - Indexed, compiled view of a pipeline's nodes and edges
+"""
+import heapq
+from collections import deque
+from typing import Dict, List
+
+
+class PipelineGraph:
+    """
+    Directed graph built once from pipeline nodes/edges.
+
+    Nodes are indexed by id (the first node wins on duplicate ids) and
+    edges whose endpoints don't exist are kept aside in ``dangling_edges``
+    instead of raising. ``order`` is a stable Kahn topological order: of
+    the nodes ready at each step, the one earliest in the input list goes
+    first.
+    """
+
+    def __init__(self, nodes: List[Dict], edges: List[Dict]):
+        self.nodes = {}
+        for node in nodes:
+            self.nodes.setdefault(node['id'], node)
+
+        self.edges = []
+        self.dangling_edges = []
+        self.successors = {node_id: [] for node_id in self.nodes}
+        self.predecessors = {node_id: [] for node_id in self.nodes}
+
+        for edge in edges:
+            source, target = edge.get('source'), edge.get('target')
+            if source not in self.nodes or target not in self.nodes:
+                self.dangling_edges.append(edge)
+                continue
+            self.edges.append(edge)
+            self.successors[source].append(target)
+            self.predecessors[target].append(source)
+
+        self._order = None
+        self._cyclic = None
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, node_id):
+        return node_id in self.nodes
+
+    def _sort(self):
+        in_degree = {node_id: len(preds) for node_id, preds in self.predecessors.items()}
+        position = {node_id: i for i, node_id in enumerate(self.nodes)}
+        ready = [position[node_id] for node_id, degree in in_degree.items() if degree == 0]
+        heapq.heapify(ready)
+        ids = list(self.nodes)
+        order = []
+
+        # Kahn's algorithm with a heap keyed on input position
+        while ready:
+            node_id = ids[heapq.heappop(ready)]
+            order.append(node_id)
+            for neighbor in self.successors[node_id]:
+                in_degree[neighbor] -= 1
+                if in_degree[neighbor] == 0:
+                    heapq.heappush(ready, position[neighbor])
+
+        self._order = order
+        self._cyclic = [node_id for node_id, degree in in_degree.items() if degree > 0]
+
+    @property
+    def order(self) -> List[str]:
+        """Node ids in topological order (nodes on or behind a cycle are omitted)"""
+        if self._order is None:
+            self._sort()
+        return self._order
+
+    @property
+    def cyclic_nodes(self) -> List[str]:
+        """Ids of nodes Kahn's algorithm could not schedule because of a cycle"""
+        if self._cyclic is None:
+            self._sort()
+        return self._cyclic
+
+    @property
+    def has_cycle(self) -> bool:
+        return bool(self.cyclic_nodes)
+
+    def sorted_nodes(self) -> List[Dict]:
+        """Node dicts in topological order"""
+        return [self.nodes[node_id] for node_id in self.order]
+
+    def strongly_connected_components(self) -> List[List[str]]:
+        """Tarjan's algorithm, iterative so deep pipelines can't hit the recursion limit"""
+        index = {}
+        lowlink = {}
+        on_stack = set()
+        stack = []
+        components = []
+        counter = 0
+
+        for root in self.nodes:
+            if root in index:
+                continue
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self.successors[root]))]
+
+            while work:
+                node_id, neighbors = work[-1]
+                advanced = False
+                for neighbor in neighbors:
+                    if neighbor not in index:
+                        index[neighbor] = lowlink[neighbor] = counter
+                        counter += 1
+                        stack.append(neighbor)
+                        on_stack.add(neighbor)
+                        work.append((neighbor, iter(self.successors[neighbor])))
+                        advanced = True
+                        break
+                    if neighbor in on_stack:
+                        lowlink[node_id] = min(lowlink[node_id], index[neighbor])
+                if advanced:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node_id])
+
+                if lowlink[node_id] == index[node_id]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node_id:
+                            break
+                    components.append(component)
+
+        return components
+
+    def find_cycles(self) -> List[List[str]]:
+        """
+        One witness cycle per cyclic strongly connected component.
+
+        Each cycle is a list of node ids in edge order; the last node has an
+        edge back to the first. Runs in O(V + E) overall.
+        """
+        position = {node_id: i for i, node_id in enumerate(self.nodes)}
+        cycles = []
+
+        for component in self.strongly_connected_components():
+            members = set(component)
+            start = min(component, key=position.__getitem__)
+
+            if len(component) == 1:
+                if start in self.successors[start]:
+                    cycles.append([start])
+                continue
+
+            # BFS inside the component until something links back to start
+            parent = {start: None}
+            queue = deque([start])
+            closing = None
+            while queue and closing is None:
+                node_id = queue.popleft()
+                for neighbor in self.successors[node_id]:
+                    if neighbor == start:
+                        closing = node_id
+                        break
+                    if neighbor in members and neighbor not in parent:
+                        parent[neighbor] = node_id
+                        queue.append(neighbor)
+
+            path = []
+            while closing is not None:
+                path.append(closing)
+                closing = parent[closing]
+            cycles.append(path[::-1])
+
+        cycles.sort(key=lambda cycle: position[cycle[0]])
+        return cycles
+
+    def weakly_connected_components(self) -> List[List[str]]:
+        """Connected components when edge direction is ignored"""
+        seen = set()
+        components = []
+        for root in self.nodes:
+            if root in seen:
+                continue
+            seen.add(root)
+            component = []
+            queue = deque([root])
+            while queue:
+                node_id = queue.popleft()
+                component.append(node_id)
+                for neighbor in self.successors[node_id] + self.predecessors[node_id]:
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        queue.append(neighbor)
+            components.append(component)
+        return components
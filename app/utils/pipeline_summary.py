@@ -0,0 +1,45 @@
+"""
+Pipeline Summary - Derived fields stored alongside a pipeline's nodes/edges
+"""
+import json
+from typing import Dict, List
+
+from app.utils.hashing import content_hash
+
+
+def encode_component_ids(component_ids) -> str:
+    """Store ids comma-wrapped (',a,b,') so LIKE '%,a,%' matches whole ids only"""
+    ids = sorted(set(filter(None, component_ids)))
+    return ',' + ','.join(ids) + ',' if ids else ''
+
+
+def decode_component_ids(value) -> List[str]:
+    return [component_id for component_id in (value or '').split(',') if component_id]
+
+
+def component_filter(column, component_id):
+    """SQL condition: the stored component id list contains component_id"""
+    # Escape LIKE wildcards so an id such as 'a_b' or '%' only matches itself
+    escaped = component_id.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return column.like(f'%,{escaped},%', escape='\\')
+
+
+def summarize_pipeline(nodes: List[Dict], edges: List[Dict], nodes_json: str, edges_json: str) -> Dict:
+    """Counts, used component ids, graph content hash and serialized size"""
+    return {
+        'node_count': len(nodes),
+        'edge_count': len(edges),
+        'component_ids': encode_component_ids(
+            node.get('data', {}).get('componentId') for node in nodes
+        ),
+        'content_hash': content_hash(nodes, edges),
+        'byte_size': len(nodes_json.encode('utf-8')) + len(edges_json.encode('utf-8'))
+    }
+
+
+def store_graph(record, nodes: List[Dict], edges: List[Dict]) -> None:
+    """Write nodes/edges JSON onto a SavedModel and refresh its summary"""
+    record.nodes = json.dumps(nodes)
+    record.edges = json.dumps(edges)
+    for field, value in summarize_pipeline(nodes, edges, record.nodes, record.edges).items():
+        setattr(record, field, value)
@@ -0,0 +1,151 @@
+"""
+Template Compiler - Precompiles component pythonTemplates into segment lists
+"""
+import re
+from typing import Dict, List, Tuple
+
+PLACEHOLDER_RE = re.compile(r'\{(\w+)\}')
+IDENTIFIER_CHARS_RE = re.compile(r'[^0-9A-Za-z_]')
+
+# Slot kinds
+QUOTED = 'quoted'      # '{name}' -> the whole quoted literal is replaced by repr(str(value))
+IDENTIFIER = 'ident'   # load_{name} -> value spliced into an identifier
+LITERAL = 'literal'    # f({name}) -> value rendered as a Python literal
+
+
+class Slot:
+    """A parameter placeholder inside a compiled template"""
+    __slots__ = ('name', 'kind', 'source')
+
+    def __init__(self, name: str, kind: str, source: str):
+        self.name = name
+        self.kind = kind
+        self.source = source  # original template text, used when no value is supplied
+
+    def render(self, params: Dict) -> str:
+        if self.name not in params:
+            return self.source
+        return format_value(params[self.name], self.kind)
+
+
+def format_value(value, kind: str = LITERAL) -> str:
+    """Render a parameter value for the given slot kind"""
+    if kind == QUOTED:
+        return repr(value if isinstance(value, str) else str(value))
+    if kind == IDENTIFIER:
+        return IDENTIFIER_CHARS_RE.sub('', str(value))
+    if isinstance(value, (str, bool)) or value is None:
+        return repr(value)
+    return str(value)
+
+
+def _compile_line(line: str, names) -> List:
+    """Split one template line into literal strings and Slots"""
+    segments = []
+    literal = ''
+    pos = 0
+    for match in PLACEHOLDER_RE.finditer(line):
+        name = match.group(1)
+        if name not in names:
+            continue
+        start, end = match.span()
+        literal += line[pos:start]
+        before = line[start - 1] if start > 0 else ''
+        after = line[end] if end < len(line) else ''
+
+        if before in ('"', "'") and after == before:
+            literal = literal[:-1]
+            slot = Slot(name, QUOTED, before + match.group(0) + after)
+            end += 1
+        elif before.isalnum() or before == '_' or after.isalnum() or after == '_':
+            slot = Slot(name, IDENTIFIER, match.group(0))
+        else:
+            slot = Slot(name, LITERAL, match.group(0))
+
+        if literal:
+            segments.append(literal)
+        segments.append(slot)
+        literal = ''
+        pos = end
+    literal += line[pos:]
+    if literal:
+        segments.append(literal)
+    return segments
+
+
+def _join(lines: List[List], prefix: str = '') -> List:
+    """Join compiled lines with newlines, merging adjacent literals"""
+    segments = []
+
+    def add(part):
+        if isinstance(part, str) and segments and isinstance(segments[-1], str):
+            segments[-1] += part
+        else:
+            segments.append(part)
+
+    for i, line in enumerate(lines):
+        if i:
+            add('\n')
+        if prefix:
+            add(prefix)
+        for part in line:
+            add(part)
+    return segments
+
+
+def _render(segments: List, params: Dict) -> str:
+    return ''.join(part if isinstance(part, str) else part.render(params) for part in segments)
+
+
+def _is_import(line: str) -> bool:
+    return line.strip().startswith(('import ', 'from '))
+
+
+class CompiledTemplate:
+    """
+    A component's pythonTemplate compiled once into segment lists.
+
+    Rendering is a single join over literal strings and parameter slots;
+    values are substituted in one pass, so a value that itself contains
+    ``{placeholder}`` text is never expanded again.
+    """
+
+    def __init__(self, template: str, parameter_names):
+        names = set(parameter_names)
+        lines = template.split('\n')
+
+        self.raw_imports: Tuple[str, ...] = tuple(line.strip() for line in lines if _is_import(line))
+        self.static_imports: Tuple[str, ...] = tuple(
+            line for line in self.raw_imports if not any(
+                m.group(1) in names for m in PLACEHOLDER_RE.finditer(line)
+            )
+        )
+        self._import_lines = [
+            _compile_line(line, names) for line in self.raw_imports if line not in self.static_imports
+        ]
+        self._step = _join(
+            [_compile_line(line, names) for line in lines if line.strip()], prefix='    '
+        )
+        self._body = _join([_compile_line(line, names) for line in lines if not _is_import(line)])
+
+    def imports(self, params: Dict) -> List[str]:
+        """Import lines for a node, with any parameterised imports rendered"""
+        if not self._import_lines:
+            return list(self.static_imports)
+        return list(self.static_imports) + [_render(line, params) for line in self._import_lines]
+
+    def render_step(self, params: Dict) -> str:
+        """Full template, blank lines dropped, indented for run_ml_pipeline()"""
+        return _render(self._step, params)
+
+    def render_body(self, params: Dict) -> str:
+        """Template without its import lines (used for notebook cells)"""
+        return _render(self._body, params).strip()
+
+
+def compile_component(component: Dict):
+    """Compile a catalog component's template, or None if it has none"""
+    if 'pythonTemplate' not in component:
+        return None
+    names = [param['name'] for param in component.get('parameters', [])]
+    return CompiledTemplate(component['pythonTemplate'], names)
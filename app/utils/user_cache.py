@@ -0,0 +1,109 @@
+"""
+User Cache - Short-lived per-process cache of logged-in users
+
+Flask-Login loads the user on every request and every Socket.IO event.
+The cache answers those loads with an Identity, a detached snapshot of
+the few User columns requests read, for up to ttl seconds. Updating or
+deleting a User invalidates its entry in this process as the change is
+committed (see app.models); other processes pick it up when their entry
+expires.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from flask_login import UserMixin
+
+
+class Identity(UserMixin):
+    """Read-only snapshot of a User that is safe to share between requests"""
+
+    FIELDS = ('id', 'username', 'email', 'display_name', 'role')
+
+    def __init__(self, id, username, email, display_name=None, role=None):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.display_name = display_name
+        self.role = role
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(**{field: getattr(user, field) for field in cls.FIELDS})
+
+    @property
+    def models(self):
+        """The user's saved models, as a query (like User.models)"""
+        from app.models import SavedModel
+        return SavedModel.query.filter_by(user_id=self.id)
+
+    def __repr__(self):
+        return f'<User {self.username}>'
+
+
+class UserCache:
+    """Thread-safe LRU of Identity objects by user id, with a time to live"""
+
+    def __init__(self, ttl=60, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # user id -> (identity, expires at)
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped by every invalidation
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        """Apply the app's settings; a new app starts from an empty cache"""
+        self.ttl = app.config.get('USER_CACHE_TTL_SECONDS', self.ttl)
+        self.max_entries = app.config.get('USER_CACHE_MAX_ENTRIES') or self.max_entries
+        self.clear()
+        self.hits = self.misses = 0
+
+    def get(self, user_id):
+        """Identity for user_id, loading the User on a miss; None if there is no such user"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            generation = self._generation
+
+        identity = self._load(user_id)
+        if identity is not None and self.ttl > 0:
+            with self._lock:
+                # Don't store what may have been read before an invalidation
+                if generation != self._generation:
+                    return identity
+                self._entries[user_id] = (identity, now + self.ttl)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return identity
+
+    def _load(self, user_id):
+        from app import db
+        from app.models import User
+
+        user = db.session.get(User, user_id)
+        return Identity.from_user(user) if user is not None else None
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+user_cache = UserCache()
@@ -1,46 +1,37 @@
-import networkx as nx
+from app.utils.pipeline_graph import PipelineGraph
 
 def validate_pipeline_structure(nodes, edges):
     """
     Validate the structure of the pipeline.
-    Returns a list of errors and warnings.
+    Returns a list of errors and warnings, and the cycles that were found.
     """
     errors = []
     warnings = []
     
     if not nodes:
         errors.append("Pipeline is empty")
-        return errors, warnings
+        return errors, warnings, []
 
     # Build graph
-    G = nx.DiGraph()
-    node_map = {node['id']: node for node in nodes}
+    graph = PipelineGraph(nodes, edges)
     
-    for node in nodes:
-        G.add_node(node['id'])
-        
-    for edge in edges:
-        if edge['source'] in node_map and edge['target'] in node_map:
-            G.add_edge(edge['source'], edge['target'])
-    
-    # 1. Cycle Detection
-    try:
-        cycles = list(nx.simple_cycles(G))
-        if cycles:
-            errors.append("Pipeline contains cycles, which are not allowed.")
-    except Exception:
-        pass # simple_cycles might fail on some graph types or versions, but usually fine for DiGraph
+    # 1. Cycle Detection (linear time, one witness per strongly connected component)
+    cycles = graph.find_cycles()
+    for cycle in cycles:
+        errors.append(
+            "Pipeline contains a cycle, which is not allowed: " + " -> ".join(cycle + cycle[:1])
+        )
 
     # 2. Disconnected Components
     # Weakly connected components (ignoring direction)
-    if not nx.is_weakly_connected(G) and len(nodes) > 1:
+    if len(graph.nodes) > 1 and len(graph.weakly_connected_components()) > 1:
         warnings.append("Pipeline has disconnected components.")
 
     # 3. Type Compatibility (Simplified)
     # We need component definitions to check this properly. 
     # For now, we'll check basic logic based on node types if available in data.
     
-    return errors, warnings
+    return errors, warnings, cycles
 
 def validate_hyperparameters(node, component_def):
     """
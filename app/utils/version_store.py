@@ -0,0 +1,217 @@
+"""
+Version Store - Delta-encoded storage for pipeline versions
+
+Each version is stored either as a full snapshot ("keyframe") or as a
+delta against the previous version of the same pipeline. A keyframe is
+written every KEYFRAME_INTERVAL versions so reconstruction never replays
+more than KEYFRAME_INTERVAL - 1 deltas.
+
+Graph deltas are keyed by element id:
+
+    {'set': [element, ...], 'remove': [key, ...], 'order': [key, ...]}
+
+'order' is only stored when the final order differs from "base order
+with removals dropped and new elements appended". Generated code is
+stored as line-range replacements: [[start, end, [lines]], ...].
+"""
+import difflib
+import json
+import threading
+from collections import OrderedDict
+
+FULL = 'full'
+DELTA = 'delta'
+KEYFRAME_INTERVAL = 10
+
+
+def _key(element):
+    return element.get('id') or f"{element.get('source')}->{element.get('target')}"
+
+
+def _keyed(elements):
+    """Index elements by key, or None if keys are not unique"""
+    index = OrderedDict()
+    for element in elements:
+        key = _key(element)
+        if key in index:
+            return None
+        index[key] = element
+    return index
+
+
+def diff_elements(base, target):
+    """Delta turning element list base into target, or None if it can't be keyed"""
+    base_index, target_index = _keyed(base), _keyed(target)
+    if base_index is None or target_index is None:
+        return None
+
+    delta = {
+        'set': [element for key, element in target_index.items() if base_index.get(key) != element],
+        'remove': [key for key in base_index if key not in target_index]
+    }
+    removed = set(delta['remove'])
+    natural = [key for key in base_index if key not in removed]
+    natural += [key for key in target_index if key not in base_index]
+    if natural != list(target_index):
+        delta['order'] = list(target_index)
+    return delta
+
+
+def apply_elements(base, delta):
+    index = OrderedDict((_key(element), element) for element in base)
+    for key in delta.get('remove', []):
+        index.pop(key, None)
+    for element in delta.get('set', []):
+        index[_key(element)] = element
+    if 'order' in delta:
+        return [index[key] for key in delta['order']]
+    return list(index.values())
+
+
+def diff_code(base, target):
+    if base == target:
+        return None
+    if base is None or target is None:
+        return {'full': target}
+    base_lines, target_lines = base.split('\n'), target.split('\n')
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+    return {'ops': [
+        [i1, i2, target_lines[j1:j2]]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal'
+    ]}
+
+
+def apply_code(base, delta):
+    if delta is None:
+        return base
+    if 'full' in delta:
+        return delta['full']
+    lines = base.split('\n')
+    for start, end, replacement in reversed(delta['ops']):
+        lines[start:end] = replacement
+    return '\n'.join(lines)
+
+
+class VersionCache:
+    """LRU of reconstructed (nodes, edges, code) tuples; treat values as read-only"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(version):
+        # created_at guards against SQLite reusing the id of a deleted row
+        return (version.id, version.created_at)
+
+    def get(self, version):
+        with self._lock:
+            key = self.key(version)
+            state = self._entries.get(key)
+            if state is not None:
+                self._entries.move_to_end(key)
+            return state
+
+    def put(self, version, state):
+        with self._lock:
+            self._entries[self.key(version)] = state
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, version):
+        with self._lock:
+            self._entries.pop(self.key(version), None)
+
+
+version_cache = VersionCache()
+
+
+def materialize(version):
+    """Return (nodes, edges, generated_code) for a version, replaying deltas as needed"""
+    from app.models import PipelineVersion
+
+    chain = []
+    current = version
+    state = version_cache.get(current)
+    while state is None and current.storage_format == DELTA:
+        chain.append(current)
+        current = PipelineVersion.query.get(current.base_version_id)
+        state = version_cache.get(current)
+
+    if state is None:
+        state = (
+            json.loads(current.nodes) if current.nodes else [],
+            json.loads(current.edges) if current.edges else [],
+            current.generated_code
+        )
+        version_cache.put(current, state)
+
+    for delta_version in reversed(chain):
+        delta = json.loads(delta_version.delta)
+        state = (
+            apply_elements(state[0], delta['nodes']),
+            apply_elements(state[1], delta['edges']),
+            apply_code(state[2], delta.get('code'))
+        )
+        version_cache.put(delta_version, state)
+
+    return state
+
+
+def store(version, nodes, edges, generated_code, previous=None, keyframe_interval=KEYFRAME_INTERVAL):
+    """
+    Write a version's graph and code, as a delta against previous when possible.
+
+    previous is the pipeline's latest existing version (or None).
+    """
+    from app.utils.pipeline_summary import summarize_pipeline
+
+    nodes_json, edges_json = json.dumps(nodes), json.dumps(edges)
+    for field, value in summarize_pipeline(nodes, edges, nodes_json, edges_json).items():
+        setattr(version, field, value)
+
+    delta = None
+    depth = (previous.delta_depth or 0) + 1 if previous is not None else 0
+    if previous is not None and depth < keyframe_interval:
+        base_nodes, base_edges, base_code = materialize(previous)
+        node_delta = diff_elements(base_nodes, nodes)
+        edge_delta = diff_elements(base_edges, edges)
+        if node_delta is not None and edge_delta is not None:
+            delta = {'nodes': node_delta, 'edges': edge_delta}
+            code_delta = diff_code(base_code, generated_code)
+            if code_delta is not None:
+                delta['code'] = code_delta
+
+    if delta is None:
+        version.storage_format = FULL
+        version.base_version_id = None
+        version.delta_depth = 0
+        version.delta = None
+        version.nodes = nodes_json
+        version.edges = edges_json
+        version.generated_code = generated_code
+    else:
+        version.storage_format = DELTA
+        version.base_version_id = previous.id
+        version.delta_depth = depth
+        version.delta = json.dumps(delta)
+        version.nodes = ''
+        version.edges = ''
+        version.generated_code = None
+
+
+def detach_dependents(version):
+    """Rewrite versions stored as deltas against version as keyframes, before it is deleted"""
+    from app.models import PipelineVersion
+
+    for dependent in PipelineVersion.query.filter_by(base_version_id=version.id).all():
+        nodes, edges, code = materialize(dependent)
+        dependent.storage_format = FULL
+        dependent.base_version_id = None
+        dependent.delta_depth = 0
+        dependent.delta = None
+        dependent.nodes = json.dumps(nodes)
+        dependent.edges = json.dumps(edges)
+        dependent.generated_code = code
+    version_cache.discard(version)
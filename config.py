@@ -10,3 +10,55 @@ class Config:
         'sqlite:///' + os.path.join(basedir, 'dominoml.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     WTF_CSRF_ENABLED = True
+
+    # Generated code / export cache (see app.utils.codegen_cache)
+    CODEGEN_CACHE_MAX_ENTRIES = int(os.environ.get('CODEGEN_CACHE_MAX_ENTRIES') or 512)
+    CODEGEN_CACHE_MAX_BYTES = int(os.environ.get('CODEGEN_CACHE_MAX_BYTES') or 32 * 1024 * 1024)
+
+    # Pipeline versions are stored as deltas with a full snapshot every N versions
+    VERSION_KEYFRAME_INTERVAL = int(os.environ.get('VERSION_KEYFRAME_INTERVAL') or 10)
+
+    # Upper bound on points accepted by one bulk metrics request
+    METRICS_BULK_MAX_POINTS = int(os.environ.get('METRICS_BULK_MAX_POINTS') or 1000000)
+
+    # Resource-limited pipeline execution (see app.execution)
+    EXECUTION_MAX_WORKERS = int(os.environ.get('EXECUTION_MAX_WORKERS') or 2)
+    EXECUTION_MAX_TASKS_PER_CHILD = int(os.environ.get('EXECUTION_MAX_TASKS_PER_CHILD') or 20)
+    EXECUTION_MAX_QUEUED = int(os.environ.get('EXECUTION_MAX_QUEUED') or 100)
+    EXECUTION_TIMEOUT = int(os.environ.get('EXECUTION_TIMEOUT') or 120)
+    EXECUTION_CPU_SECONDS = int(os.environ.get('EXECUTION_CPU_SECONDS') or 120)
+    EXECUTION_MEMORY_MB = int(os.environ.get('EXECUTION_MEMORY_MB') or 2048)
+    EXECUTION_MAX_FILE_MB = int(os.environ.get('EXECUTION_MAX_FILE_MB') or 64)
+    EXECUTION_MAX_OUTPUT = int(os.environ.get('EXECUTION_MAX_OUTPUT') or 64 * 1024)
+    # Loader components may only read files under this directory (see app.execution.data_paths)
+    EXECUTION_DATA_DIR = os.environ.get('EXECUTION_DATA_DIR') or os.path.join(basedir, 'data')
+
+    # Batch export of classwork submissions: render threads and pipelines in flight
+    SUBMISSION_EXPORT_WORKERS = int(os.environ.get('SUBMISSION_EXPORT_WORKERS') or 4)
+    SUBMISSION_EXPORT_WINDOW = int(os.environ.get('SUBMISSION_EXPORT_WINDOW') or 16)
+
+    # Password hashing (werkzeug method notation) and how many hashes may run at once.
+    # Existing hashes are upgraded to a new method on their owner's next login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt:32768:8:1'
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 4)
+
+    # Logged-in users are cached per process for this long (0 disables the cache)
+    USER_CACHE_TTL_SECONDS = int(os.environ.get('USER_CACHE_TTL_SECONDS') or 60)
+    USER_CACHE_MAX_ENTRIES = int(os.environ.get('USER_CACHE_MAX_ENTRIES') or 10000)
+
+    # Collaborative editing: broadcast interval for batched canvas operations
+    # and how often open pipelines are written back to the database
+    COLLAB_TICK_MS = int(os.environ.get('COLLAB_TICK_MS') or 50)
+    COLLAB_CHECKPOINT_SECONDS = int(os.environ.get('COLLAB_CHECKPOINT_SECONDS') or 10)
+    # Cursor broadcast interval (50ms = 20 Hz) and when an idle cursor is hidden
+    PRESENCE_FLUSH_MS = int(os.environ.get('PRESENCE_FLUSH_MS') or 50)
+    PRESENCE_STALE_SECONDS = int(os.environ.get('PRESENCE_STALE_SECONDS') or 10)
+    # Message bus shared by the server processes, e.g. sqlite:////var/run/dominoml/bus.db
+    # (default: in-process, one server process), and how long a process owns an open pipeline
+    # without renewing its lease
+    COLLAB_BUS_URL = os.environ.get('COLLAB_BUS_URL')
+    COLLAB_LEASE_SECONDS = int(os.environ.get('COLLAB_LEASE_SECONDS') or 10)
+
+    # On-disk cache of node outputs for node-level runs (default: <tmp>/dominoml-artifacts)
+    EXECUTION_ARTIFACT_DIR = os.environ.get('EXECUTION_ARTIFACT_DIR')
+    EXECUTION_ARTIFACT_MAX_MB = int(os.environ.get('EXECUTION_ARTIFACT_MAX_MB') or 1024)
@@ -0,0 +1,25 @@
+-- Migration: Persistent job queue
+-- Created: 2026-10-17
+-- Description: Pipeline runs and background exports are stored in `jobs`, which the
+--              server processes also use as their queue (rows are claimed oldest first
+--              while status is 'queued').
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id VARCHAR(32) PRIMARY KEY,             -- uuid4 hex
+    user_id INTEGER NOT NULL,
+    pipeline_id INTEGER,                    -- saved_model id, if any
+    kind VARCHAR(20) NOT NULL,              -- 'run' or 'export'
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    payload TEXT NOT NULL,                  -- JSON task for the executor
+    progress TEXT,                          -- JSON {node_id: status}
+    result TEXT,                            -- JSON
+    error TEXT,
+    worker VARCHAR(120),                    -- host:pid of the server process running it
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES user(id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_jobs_user_id ON jobs(user_id);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, created_at);
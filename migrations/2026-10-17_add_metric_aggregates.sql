@@ -0,0 +1,45 @@
+-- Migration: Precomputed metric aggregates for leaderboards
+-- Created: 2026-10-17
+-- Description: One row per (version, metric name, metric type) with count, sum, min,
+--              max and the value at the highest epoch. Maintained incrementally by the
+--              metrics endpoints; existing metrics are backfilled below.
+
+CREATE TABLE IF NOT EXISTS metric_aggregates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    version_id INTEGER NOT NULL,
+    metric_name VARCHAR(100) NOT NULL,
+    metric_type VARCHAR(50),
+    count INTEGER DEFAULT 0,                -- non-null values
+    sum_value FLOAT DEFAULT 0.0,
+    min_value FLOAT,
+    max_value FLOAT,
+    last_value FLOAT,                       -- value at the highest epoch
+    last_epoch INTEGER,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (version_id) REFERENCES pipeline_versions(id) ON DELETE CASCADE,
+    CONSTRAINT uq_metric_aggregate UNIQUE (version_id, metric_name, metric_type)
+);
+
+CREATE INDEX IF NOT EXISTS idx_metric_aggregates_name ON metric_aggregates(metric_name, metric_type);
+
+-- Backfill from existing metrics ("last" = highest epoch, NULL epochs first, then latest id)
+INSERT INTO metric_aggregates (version_id, metric_name, metric_type, count, sum_value, min_value, max_value, last_value, last_epoch)
+SELECT
+    m.version_id,
+    m.metric_name,
+    m.metric_type,
+    COUNT(m.metric_value),
+    COALESCE(SUM(m.metric_value), 0.0),
+    MIN(m.metric_value),
+    MAX(m.metric_value),
+    (SELECT l.metric_value FROM model_metrics l
+      WHERE l.version_id = m.version_id AND l.metric_name = m.metric_name
+        AND l.metric_type IS m.metric_type AND l.metric_value IS NOT NULL
+      ORDER BY COALESCE(l.epoch, -1) DESC, l.id DESC LIMIT 1),
+    (SELECT l.epoch FROM model_metrics l
+      WHERE l.version_id = m.version_id AND l.metric_name = m.metric_name
+        AND l.metric_type IS m.metric_type AND l.metric_value IS NOT NULL
+      ORDER BY COALESCE(l.epoch, -1) DESC, l.id DESC LIMIT 1)
+FROM model_metrics m
+GROUP BY m.version_id, m.metric_name, m.metric_type
+HAVING COUNT(m.metric_value) > 0;
@@ -0,0 +1,6 @@
+-- Migration: Composite index for metric time-series queries
+-- Created: 2026-10-17
+-- Description: GET /api/versions/<id>/metrics/series filters by version and metric
+--              name and reads in epoch order; this index serves it without a scan.
+
+CREATE INDEX IF NOT EXISTS idx_model_metrics_version_name_epoch ON model_metrics(version_id, metric_name, epoch);
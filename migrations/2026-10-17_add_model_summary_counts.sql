@@ -0,0 +1,15 @@
+-- Migration: Add stored graph counts to saved models
+-- Created: 2026-10-17
+-- Description: Lets GET /api/models list and paginate without parsing nodes/edges JSON
+
+ALTER TABLE saved_model ADD COLUMN node_count INTEGER;
+ALTER TABLE saved_model ADD COLUMN edge_count INTEGER;
+
+-- Backfill from the stored JSON (SQLite JSON1)
+UPDATE saved_model
+SET node_count = json_array_length(nodes),
+    edge_count = json_array_length(edges)
+WHERE node_count IS NULL;
+
+-- Keyset pagination: WHERE user_id = ? AND (updated_at, id) < (?, ?) ORDER BY updated_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_saved_model_user_updated ON saved_model(user_id, updated_at, id);
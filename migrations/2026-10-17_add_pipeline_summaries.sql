@@ -0,0 +1,17 @@
+-- Migration: Add denormalized pipeline summary columns
+-- Created: 2026-10-17
+-- Description: Derived graph fields on saved models and versions, computed at save time.
+--              Run backfill_pipeline_summaries.py afterwards to populate existing rows.
+
+ALTER TABLE saved_model ADD COLUMN component_ids VARCHAR(1000);   -- ',csv-loader,pca,'
+ALTER TABLE saved_model ADD COLUMN content_hash VARCHAR(64);      -- SHA-256 of canonical nodes/edges
+ALTER TABLE saved_model ADD COLUMN byte_size INTEGER;             -- Size of nodes + edges JSON
+
+ALTER TABLE pipeline_versions ADD COLUMN node_count INTEGER;
+ALTER TABLE pipeline_versions ADD COLUMN edge_count INTEGER;
+ALTER TABLE pipeline_versions ADD COLUMN component_ids VARCHAR(1000);
+ALTER TABLE pipeline_versions ADD COLUMN content_hash VARCHAR(64);
+ALTER TABLE pipeline_versions ADD COLUMN byte_size INTEGER;
+
+CREATE INDEX IF NOT EXISTS ix_saved_model_content_hash ON saved_model(content_hash);
+CREATE INDEX IF NOT EXISTS ix_pipeline_versions_content_hash ON pipeline_versions(content_hash);
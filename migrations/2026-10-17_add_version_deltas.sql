@@ -0,0 +1,12 @@
+-- Migration: Delta-encoded pipeline version storage
+-- Created: 2026-10-17
+-- Description: Versions can be stored as a JSON delta against the previous version,
+--              with a full keyframe every VERSION_KEYFRAME_INTERVAL versions.
+--              Existing rows stay full snapshots (storage_format NULL/'full').
+
+ALTER TABLE pipeline_versions ADD COLUMN storage_format VARCHAR(10) DEFAULT 'full';
+ALTER TABLE pipeline_versions ADD COLUMN base_version_id INTEGER REFERENCES pipeline_versions(id);
+ALTER TABLE pipeline_versions ADD COLUMN delta_depth INTEGER DEFAULT 0;
+ALTER TABLE pipeline_versions ADD COLUMN delta TEXT;                 -- JSON delta for 'delta' rows
+
+CREATE INDEX IF NOT EXISTS ix_pipeline_versions_base_version_id ON pipeline_versions(base_version_id);
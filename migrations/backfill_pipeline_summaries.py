@@ -0,0 +1,55 @@
+"""
+Backfill pipeline summary columns (node/edge counts, component ids,
+content hash, byte size) for rows saved before they existed.
+
+Rows are processed in id order, BATCH_SIZE at a time, committing after
+each batch so the database is never locked for long and the script can
+be re-run safely (only rows with a NULL content_hash are touched).
+
+Usage:
+    python migrations/backfill_pipeline_summaries.py [batch_size]
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import SavedModel, PipelineVersion
+from app.utils.pipeline_summary import summarize_pipeline
+
+BATCH_SIZE = 500
+
+
+def backfill(model_class, batch_size):
+    last_id = 0
+    updated = 0
+    while True:
+        rows = (model_class.query
+                .filter(model_class.id > last_id, model_class.content_hash.is_(None))
+                .order_by(model_class.id)
+                .limit(batch_size)
+                .all())
+        if not rows:
+            return updated
+
+        for row in rows:
+            nodes_json = row.nodes or '[]'
+            edges_json = row.edges or '[]'
+            summary = summarize_pipeline(json.loads(nodes_json), json.loads(edges_json), nodes_json, edges_json)
+            for field, value in summary.items():
+                setattr(row, field, value)
+
+        last_id = rows[-1].id
+        updated += len(rows)
+        db.session.commit()
+        print(f"{model_class.__tablename__}: {updated} rows backfilled")
+
+
+if __name__ == '__main__':
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else BATCH_SIZE
+    app = create_app()
+    with app.app_context():
+        backfill(SavedModel, batch_size)
+        backfill(PipelineVersion, batch_size)
@@ -1,5 +1,7 @@
 """Tests covering the basic authentication flow."""
 
+from werkzeug.security import generate_password_hash
+
 from app.models import User
 
 
@@ -55,3 +57,47 @@ def test_login_after_logout(client):
     builder_response = client.get("/builder")
     assert builder_response.status_code == 200
 
+
+
+def test_logged_in_user_is_cached_until_updated(app):
+    """The user loader should reuse a cached identity, and a profile change should replace it."""
+
+    from app import db
+    from app.models import load_user
+    from app.utils.user_cache import user_cache
+
+    with app.app_context():
+        user = User(username="cached", email="cached@example.com", display_name="Before")
+        user.set_password("securepass")
+        db.session.add(user)
+        db.session.commit()
+        user_id = str(user.id)
+
+        identity = load_user(user_id)
+        assert identity.display_name == "Before" and identity.is_authenticated
+        assert load_user(user_id) is identity
+
+        user.display_name = "After"
+        db.session.commit()
+        assert load_user(user_id).display_name == "After"
+        assert user_cache.stats()["misses"] == 2
+
+
+def test_login_upgrades_outdated_password_hash(client, app):
+    """Logging in should rehash a password stored with other hashing parameters."""
+
+    from app import db
+
+    with app.app_context():
+        user = User(username="legacy", email="legacy@example.com")
+        user.password_hash = generate_password_hash("oldpass", "pbkdf2:sha256:1000")
+        db.session.add(user)
+        db.session.commit()
+
+    response = client.post("/auth/login", data={"email": "legacy@example.com", "password": "oldpass"})
+    assert response.status_code in (302, 303)
+
+    with app.app_context():
+        user = User.query.filter_by(email="legacy@example.com").first()
+        assert user.password_hash.startswith(app.config["PASSWORD_HASH_METHOD"] + "$")
+        assert user.check_password("oldpass")
@@ -0,0 +1,99 @@
+"""Tests for pipeline code generation."""
+
+from app.utils.code_generator import generate_python_code
+from app.utils.codegen_session import CodeGenSession
+
+
+def _node(node_id, component_id, **parameters):
+    return {"id": node_id, "data": {"componentId": component_id, "label": node_id.title(), "parameters": parameters}}
+
+
+def _edge(source, target):
+    return {"id": f"{source}-{target}", "source": source, "target": target}
+
+
+def test_session_deltas_match_a_full_render():
+    """After every delta the session's code should equal generate_python_code for the same graph."""
+
+    nodes = [_node("data", "sample-data", dataset="iris"), _node("split", "train-test-split")]
+    edges = [_edge("data", "split")]
+    session = CodeGenSession(nodes, edges, "Lab")
+    assert session.code == generate_python_code(nodes, edges, "Lab")
+
+    steps = [
+        ({"nodes": {"add": [_node("scale", "standard-scaler")]}, "edges": {"add": [_edge("split", "scale")]}},
+         lambda: (nodes.append(_node("scale", "standard-scaler")), edges.append(_edge("split", "scale")))),
+        ({"nodes": {"update": [_node("data", "sample-data", dataset="wine")]}},
+         lambda: nodes.__setitem__(0, _node("data", "sample-data", dataset="wine"))),
+        ({"edges": {"remove": ["split-scale"]}, "name": "Renamed"},
+         lambda: edges.remove(_edge("split", "scale"))),
+        ({"nodes": {"remove": ["split"]}},
+         lambda: (nodes.pop(1), edges.remove(_edge("data", "split")))),
+        ({"nodes": {"remove": ["data", "scale"]}},
+         lambda: nodes.clear()),
+    ]
+    name = "Lab"
+    for delta, mirror in steps:
+        mirror()
+        name = delta.get("name", name)
+        code, ranges = session.apply(delta)
+        assert code == generate_python_code(nodes, edges, name)
+        assert ranges
+
+    assert session.apply({}) == (session.code, [])
+
+
+def test_only_touched_lines_are_reported():
+    """Changing one node's parameters should report just that step's lines."""
+
+    nodes = [_node("data", "sample-data", dataset="iris"), _node("scale", "standard-scaler")]
+    session = CodeGenSession(nodes, [_edge("data", "scale")], "Lab")
+    before = session.code.splitlines()
+
+    code, ranges = session.apply({"nodes": {"update": [_node("scale", "standard-scaler", with_mean=False)]}})
+    after = code.splitlines()
+    changed = [i for i in range(len(after)) if i >= len(before) or before[i] != after[i]]
+    assert len(ranges) == 1
+    start, end = ranges[0]
+    assert changed and start <= min(changed) and max(changed) < end
+    assert "Step 1" not in "\n".join(after[start:end])
+
+
+def test_template_slots_render_by_kind():
+    """Quoted, identifier and literal slots should each render their value safely, in one pass."""
+
+    from app.utils.template_compiler import CompiledTemplate
+
+    template = CompiledTemplate(
+        "from sklearn.datasets import load_{dataset}\n"
+        "\n"
+        "data = pd.read_csv('{path}', sep={sep}, header={header})\n"
+        "note = {other}",
+        ["dataset", "path", "sep", "header"]
+    )
+    params = {"dataset": "wine; import os", "path": "it's {dataset}.csv", "sep": ";", "header": None}
+
+    assert template.imports(params) == ["from sklearn.datasets import load_wineimportos"]
+    assert template.render_step(params) == (
+        "    from sklearn.datasets import load_wineimportos\n"
+        "    data = pd.read_csv(\"it's {dataset}.csv\", sep=';', header=None)\n"
+        "    note = {other}"
+    )
+    assert template.render_body({"sep": 2, "header": True}) == (
+        "data = pd.read_csv('{path}', sep=2, header=True)\n"
+        "note = {other}"
+    )
+
+
+def test_code_cache_counts_every_value_against_its_budget():
+    """Lists and nested values should take up cache space, so the byte bound holds for them too."""
+
+    from app.utils.codegen_cache import CodeCache
+
+    cache = CodeCache(max_entries=10, max_bytes=1000)
+    cache.put("small", ["x" * 300])
+    cache.put("nested", {"files": ["y" * 400, "z" * 400]})
+    cache.put("huge", [["w" * 2000]])
+    assert cache.get("huge") is None
+    assert cache.get("small") is None
+    assert cache.get("nested") == {"files": ["y" * 400, "z" * 400]}
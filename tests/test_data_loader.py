@@ -0,0 +1,95 @@
+"""Tests for the cached component catalog."""
+
+import json
+import os
+
+from app.utils.data_loader import ComponentRegistry
+
+CATALOG = [
+    {"id": "loader", "name": "Loader", "category": "Data", "type": "data", "outputs": ["data"],
+     "parameters": [{"name": "rows", "defaultValue": 10}],
+     "pythonTemplate": "import pandas as pd\ndata = pd.DataFrame(range({rows}))"},
+    {"id": "scaler", "name": "Scaler", "category": "Preprocessing", "type": "transform"},
+    {"id": "pca", "name": "PCA", "category": "Preprocessing", "type": "transform"},
+    {"id": "loader", "name": "Loader copy", "category": "Data", "type": "data"},
+]
+
+
+def _write(path, components, mtime_ns):
+    """Write a catalog and pin its mtime, so changes don't depend on the clock's resolution."""
+
+    path.write_text(json.dumps(components))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _registry(tmp_path, components=CATALOG):
+    path = tmp_path / "components.json"
+    _write(path, components, 1_000_000_000)
+    registry = ComponentRegistry(str(path))
+    indexed = []
+    index = registry._index
+    registry._index = lambda components: (indexed.append(len(components)), index(components))
+    return registry, path, indexed
+
+
+def test_catalog_is_indexed_by_id_name_category_and_type(tmp_path):
+    """Lookups should use the indexes, with the first component winning a duplicate id or name."""
+
+    registry, _, _ = _registry(tmp_path)
+
+    assert [component["name"] for component in registry.all()] == ["Loader", "Scaler", "PCA", "Loader copy"]
+    assert registry.get("loader")["name"] == "Loader"
+    assert registry.get("missing") is None
+    assert registry.get_by_name("PCA")["id"] == "pca"
+    assert [component["id"] for component in registry.for_category("Preprocessing")] == ["scaler", "pca"]
+    assert [component["name"] for component in registry.for_type("data")] == ["Loader", "Loader copy"]
+    assert registry.for_type("model") == []
+
+
+def test_resolve_and_template_for(tmp_path):
+    """Nodes should resolve by componentId, then by name, and templates come precompiled."""
+
+    registry, _, _ = _registry(tmp_path)
+
+    component = registry.resolve({"data": {"componentId": "loader"}})
+    assert component["name"] == "Loader"
+    assert registry.resolve({"name": "Scaler", "data": {"componentId": "gone"}})["id"] == "scaler"
+    assert registry.resolve({"data": {}}) is None
+
+    template = registry.template_for(component)
+    assert template.render_body({"rows": 5}) == "data = pd.DataFrame(range(5))"
+    assert template.imports({}) == ["import pandas as pd"]
+    assert registry.template_for(registry.get("scaler")) is None
+    assert registry.template_for(None) is None
+
+
+def test_file_is_reread_only_when_it_changes(tmp_path):
+    """An unchanged file should not be re-read; a changed one should be picked up on the next access."""
+
+    registry, path, indexed = _registry(tmp_path)
+    registry.all()
+    registry.get("loader")
+    assert indexed == [4]
+
+    _write(path, CATALOG[:2], 2_000_000_000)
+    assert [component["id"] for component in registry.all()] == ["loader", "scaler"]
+    assert registry.get("pca") is None
+    assert indexed == [4, 2]
+
+
+def test_touched_file_with_the_same_content_is_not_reindexed(tmp_path):
+    """A new mtime with an identical hash should only update the stored signature."""
+
+    registry, path, indexed = _registry(tmp_path)
+    registry.all()
+    version = registry.version
+
+    _write(path, CATALOG, 3_000_000_000)
+    registry.all()
+    assert indexed == [4]
+    assert registry.version == version
+    assert registry._stat == (3_000_000_000, path.stat().st_size)
+
+    registry.invalidate()
+    registry.all()
+    assert indexed == [4, 4]
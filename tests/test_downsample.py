@@ -0,0 +1,53 @@
+"""Tests for metric series downsampling."""
+
+import math
+
+import pytest
+
+from app.utils.downsample import LTTB, MIN_MAX, downsample, lttb, min_max
+
+
+def _series(n):
+    xs = list(range(n))
+    ys = [math.sin(x / 50) for x in xs]
+    ys[n // 3] = 10.0  # a spike
+    return xs, ys
+
+
+@pytest.mark.parametrize("method", [lttb, min_max])
+def test_endpoints_spikes_and_order_are_kept(method):
+    """Both methods should keep the first and last points and the spike, in x order, within the budget."""
+
+    xs, ys = _series(1000)
+    for threshold in (3, 4, 10, 101, 999):
+        out_x, out_y = method(xs, ys, threshold)
+        assert 2 <= len(out_x) <= threshold
+        assert (out_x[0], out_y[0]) == (xs[0], ys[0])
+        assert (out_x[-1], out_y[-1]) == (xs[-1], ys[-1])
+        assert out_x == sorted(set(out_x))
+        assert all(ys[x] == y for x, y in zip(out_x, out_y))
+        if threshold >= 4:
+            assert 10.0 in out_y
+
+
+def test_bucket_counts():
+    """LTTB returns exactly threshold points and min/max two per bucket plus the endpoints."""
+
+    xs, ys = _series(1000)
+    assert len(lttb(xs, ys, 100)[0]) == 100
+    assert len(min_max(xs, ys, 100)[0]) == 100
+    assert len(min_max(xs, ys, 101)[0]) <= 101
+
+    flat = [1.0] * 1000
+    # A flat bucket has one point that is both its minimum and maximum
+    assert len(min_max(xs, flat, 100)[0]) == 2 + 49
+
+
+def test_short_series_and_missing_values():
+    """Series within the budget come back whole, minus points without a value."""
+
+    assert downsample([1, 2, 3], [0.5, None, 0.7], 10) == ([1, 3], [0.5, 0.7])
+    assert downsample([1, 2, 3], [0.5, 0.6, 0.7], 3, MIN_MAX) == ([1, 2, 3], [0.5, 0.6, 0.7])
+    assert downsample([], [], 3, LTTB) == ([], [])
+    with pytest.raises(ValueError):
+        downsample([1], [1], 3, "median")
@@ -0,0 +1,296 @@
+"""Tests for the pipeline executor."""
+
+from app.execution import worker
+
+
+LIMITS = {
+    "timeout": 2,
+    "cpu_seconds": 1,
+    "memory_bytes": 512 * 1024 * 1024,
+    "file_bytes": 1024,
+    "max_output": 100,
+}
+
+
+def test_script_output_is_captured():
+    """Printed output should come back in the result."""
+
+    result = worker.run_script('print("hello")', LIMITS)
+    assert result["status"] == "succeeded"
+    assert result["stdout"] == "hello\n"
+
+
+def test_cpu_limit_stops_busy_loop():
+    """A script that spins forever should be stopped by the CPU limit."""
+
+    result = worker.run_script("while True:\n    pass", LIMITS)
+    assert result["status"] == "timeout"
+
+
+def test_errors_are_reported():
+    """Exceptions from the script should be returned as a failed result."""
+
+    result = worker.run_script("1 / 0", LIMITS)
+    assert result["status"] == "failed"
+    assert "ZeroDivisionError" in result["error"]
+
+
+def test_jobs_require_login(client):
+    """The job endpoints should not be available to anonymous users."""
+
+    response = client.post("/api/execution/run", json={"nodes": [], "edges": []})
+    assert response.status_code in (302, 401)
+
+
+def _steps():
+    """Two synthetic steps: a loader and a node that doubles its output."""
+
+    return [
+        {"id": "a", "label": "A", "key": "aa01", "code": "data = 21",
+         "inputs": {}, "outputs": ["data"]},
+        {"id": "b", "label": "B", "key": "bb01", "code": "result = data * 2",
+         "inputs": {"data": {"node": "a", "key": "aa01", "port": "data"}},
+         "outputs": ["result"]},
+    ]
+
+
+def test_node_outputs_are_reused(tmp_path):
+    """A second node-level run should take every node from the artifact cache."""
+
+    first = worker.run_nodes(_steps(), LIMITS, str(tmp_path), 1024 * 1024)
+    assert [node["status"] for node in first["nodes"]] == ["executed", "executed"]
+
+    second = worker.run_nodes(_steps(), LIMITS, str(tmp_path), 1024 * 1024)
+    assert [node["status"] for node in second["nodes"]] == ["cached", "cached"]
+
+
+def test_only_dirty_nodes_run(tmp_path):
+    """Changing a downstream node should not re-run the nodes above it."""
+
+    worker.run_nodes(_steps(), LIMITS, str(tmp_path), 1024 * 1024)
+
+    steps = _steps()
+    steps[1]["key"] = "bb02"
+    steps[1]["code"] = "result = data * 3"
+    result = worker.run_nodes(steps, LIMITS, str(tmp_path), 1024 * 1024)
+    assert [node["status"] for node in result["nodes"]] == ["cached", "executed"]
+
+
+def test_independent_branches_share_a_level():
+    """Sibling branches off one node should be scheduled side by side."""
+
+    from app.execution.scheduler import schedule_levels
+
+    steps = _steps() + [
+        {"id": "c", "label": "C", "key": "cc01", "code": "other = data + 1",
+         "inputs": {"data": {"node": "a", "key": "aa01", "port": "data"}},
+         "outputs": ["other"]},
+    ]
+    levels = schedule_levels(steps, {"a", "b", "c"})
+    assert [[step["id"] for step in level] for level in levels] == [["a"], ["b", "c"]]
+
+    levels = schedule_levels(steps, {"b", "c"})
+    assert [[step["id"] for step in level] for level in levels] == [["b", "c"]]
+
+
+def test_artifact_store_evicts_least_recently_used(tmp_path):
+    """The store should stay under its size limit by dropping the oldest entries."""
+
+    import os
+    from app.execution.artifacts import ArtifactStore
+
+    store = ArtifactStore(str(tmp_path), max_bytes=300)
+    store.put("k1", {"x": "a" * 100})
+    os.utime(store._path("k1"), (1, 1))
+    store.put("k2", {"x": "b" * 100})
+    store.put("k3", {"x": "c" * 100})
+
+    assert store.get("k1") is None
+    assert store.get("k3") == {"x": "c" * 100}
+
+
+def test_jobs_are_only_visible_to_their_owner(app, client):
+    """A stored job should be readable by its owner and hidden from other users."""
+
+    from app import db
+    from app.models import BackgroundJob, User
+
+    with app.app_context():
+        owner = User(username="owner", email="owner@example.com")
+        other = User(username="other", email="other@example.com")
+        owner.set_password("pw")
+        other.set_password("pw")
+        db.session.add_all([owner, other])
+        db.session.commit()
+        db.session.add(BackgroundJob(id="job1", user_id=owner.id, kind="run", payload="{}",
+                                     status="succeeded", result='{"status": "succeeded", "stdout": "ok"}'))
+        db.session.commit()
+
+    client.post("/auth/login", data={"email": "other@example.com", "password": "pw"})
+    assert client.get("/api/jobs/job1").status_code == 404
+
+    client.get("/auth/logout")
+    client.post("/auth/login", data={"email": "owner@example.com", "password": "pw"})
+    response = client.get("/api/jobs/job1")
+    assert response.status_code == 200
+    assert response.get_json()["stdout"] == "ok"
+
+
+def _login(app, client):
+    """Log in as a new user."""
+
+    from app import db
+    from app.models import User
+
+    with app.app_context():
+        user = User(username="owner", email="owner@example.com")
+        user.set_password("pw")
+        db.session.add(user)
+        db.session.commit()
+
+    client.post("/auth/login", data={"email": "owner@example.com", "password": "pw"})
+
+
+def _loader(file_path):
+    """A one-node pipeline reading file_path with the CSV loader."""
+
+    node = {"id": "load", "type": "custom",
+            "data": {"componentId": "csv-loader", "label": "Load",
+                     "parameters": {"file_path": file_path}}}
+    return {"nodes": [node], "edges": []}
+
+
+def test_loader_paths_outside_the_data_dir_are_rejected(app, client):
+    """URLs, absolute paths and '..' should be refused before anything is queued."""
+
+    _login(app, client)
+    for path in ["/etc/passwd", "../config.py", "data/../../secret.csv",
+                 "http://169.254.169.254/latest", "s3://bucket/x.csv", "~/x.csv"]:
+        response = client.post("/api/execution/run", json=_loader(path))
+        assert response.status_code == 400, path
+        assert response.get_json()["errors"][0].startswith("Load: File Path")
+
+
+def test_loader_paths_are_resolved_under_the_data_dir(app, tmp_path):
+    """Relative paths should be rewritten to absolute paths inside the data directory."""
+
+    import os
+    from app.execution.data_paths import confine_data_paths
+
+    (tmp_path / "sets").mkdir()
+    os.symlink("/etc", tmp_path / "escape")
+    pipeline = _loader("sets/iris.csv")
+
+    with app.app_context():
+        nodes, errors = confine_data_paths(pipeline["nodes"], str(tmp_path))
+        assert errors == []
+        assert nodes[0]["data"]["parameters"]["file_path"] == str(tmp_path / "sets" / "iris.csv")
+        assert pipeline["nodes"][0]["data"]["parameters"]["file_path"] == "sets/iris.csv"
+
+        _, errors = confine_data_paths(_loader("escape/passwd")["nodes"], str(tmp_path))
+        assert errors == ["Load: File Path must stay inside the data directory"]
+
+
+def _script_bindings(nodes, edges):
+    """For every node input, the node whose assignment the generated script reads."""
+
+    from app.utils.data_loader import component_registry
+    from app.utils.pipeline_graph import PipelineGraph
+
+    last_assigned, bindings = {}, {}
+    for node in PipelineGraph(nodes, edges).sorted_nodes():
+        component = component_registry.resolve(node)
+        for port in component.get("inputs", []):
+            bindings[(node["id"], port)] = last_assigned.get(port)
+        for port in component.get("outputs", []):
+            last_assigned[port] = node["id"]
+    return bindings
+
+
+def test_templates_plan_like_the_script(app):
+    """Every shipped template should plan without errors and bind each input as the script does."""
+
+    from app.execution.planner import plan_nodes
+    from app.utils.data_loader import get_templates
+
+    with app.app_context():
+        for template in get_templates()["templates"]:
+            nodes, edges = template["pipeline"]["nodes"], template["pipeline"]["edges"]
+            steps, errors = plan_nodes(nodes, edges)
+            assert errors == [], template["id"]
+
+            planned = {(step["id"], port): source["node"]
+                       for step in steps for port, source in step["inputs"].items()}
+            assert planned == _script_bindings(nodes, edges), template["id"]
+
+
+def test_scaled_data_feeds_the_split(app):
+    """The split in the regression template should read the scaler's output, not the raw dataset."""
+
+    from app.execution.planner import plan_nodes
+    from app.utils.data_loader import get_templates
+
+    with app.app_context():
+        template = next(t for t in get_templates()["templates"] if t["id"] == "regression-pipeline")
+        steps, _ = plan_nodes(template["pipeline"]["nodes"], template["pipeline"]["edges"])
+        split = next(step for step in steps if step["id"] == "split-1")
+        assert split["inputs"]["data"]["node"] == "scaler-1"
+
+
+def _component_node(node_id, component_id, label):
+    """A canvas node for a catalog component with its default parameters."""
+
+    from app.utils.data_loader import component_registry
+
+    component = component_registry.resolve({"data": {"componentId": component_id}})
+    parameters = {param["name"]: param["defaultValue"] for param in component.get("parameters", [])
+                  if "defaultValue" in param}
+    return {"id": node_id, "type": "custom",
+            "data": {"componentId": component_id, "label": label, "parameters": parameters}}
+
+
+def test_sibling_models_run_in_parallel(app, tmp_path):
+    """Two classifiers trained off the iris template's split should run level by level on the pool."""
+
+    import copy
+    import threading
+    from app.execution.executor import PipelineExecutor
+    from app.execution.planner import plan_nodes
+    from app.utils.data_loader import get_templates
+
+    class RecordingExecutor(PipelineExecutor):
+        def finish(self, job_id, result):
+            super().finish(job_id, result)
+            self.result = result
+            finished.set()
+
+    with app.app_context():
+        template = next(t for t in get_templates()["templates"] if t["id"] == "iris-classification")
+        pipeline = copy.deepcopy(template["pipeline"])
+        pipeline["nodes"] += [_component_node("model-2", "logistic-regression", "Logistic"),
+                              _component_node("eval-2", "classification-metrics", "Evaluate Logistic")]
+        pipeline["edges"] += [{"id": "e-m2", "source": "split-1", "target": "model-2"},
+                              {"id": "e-e2", "source": "model-2", "target": "eval-2"},
+                              {"id": "e-e2s", "source": "split-1", "target": "eval-2"}]
+        steps, errors = plan_nodes(pipeline["nodes"], pipeline["edges"])
+    assert errors == []
+
+    finished = threading.Event()
+    executor = RecordingExecutor(
+        max_workers=2,
+        limits={"timeout": 60, "cpu_seconds": 60, "memory_bytes": 2048 * 1024 * 1024,
+                "file_bytes": 64 * 1024 * 1024, "max_output": 64 * 1024},
+        artifact_root=str(tmp_path)
+    )
+    try:
+        executor.start("job1", {"task": "nodes", "steps": steps})
+        assert finished.wait(120)
+    finally:
+        executor.shutdown()
+
+    result = executor.result
+    assert result["status"] == "succeeded", result.get("error")
+    assert result["levels"] == [["data-1"], ["split-1"], ["model-1", "model-2"], ["eval-1", "eval-2"]]
+    assert {node["status"] for node in result["nodes"]} == {"executed"}
+    assert "Logistic Regression model trained successfully" in result["stdout"]
+    assert result["stdout"].count("Accuracy:") == 2
@@ -0,0 +1,76 @@
+"""Tests for the export helpers."""
+
+import io
+import zipfile
+
+from app.utils.exporters import stream_zip
+
+
+def test_streamed_zip_is_a_valid_archive():
+    """Chunks from stream_zip should join into a readable ZIP with every entry."""
+
+    entries = [("a.txt", "x" * 200000), ("nested/b.bin", b"\x00\x01"), ("c.txt", "héllo")]
+    chunks = list(stream_zip(iter(entries)))
+    assert len(chunks) > 1
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.testzip() is None
+    assert archive.namelist() == ["a.txt", "nested/b.bin", "c.txt"]
+    assert archive.read("c.txt").decode("utf-8") == "héllo"
+
+
+def test_export_many_keeps_input_order():
+    """Batch rendering should emit one folder per item, in order, even for identical pipelines."""
+
+    from app.utils.exporters import export_many
+
+    items = [(f"student{i}/", [], [], "Lab", "") for i in (3, 1, 2)]
+    entries = list(export_many(iter(items), "notebook", max_workers=2, window=2))
+    assert [name for name, _ in entries] == ["student3/lab.ipynb", "student1/lab.ipynb", "student2/lab.ipynb"]
+    assert entries[0][1] == entries[1][1]
+
+
+def test_export_many_entry_names_stay_in_their_folder():
+    """Submission names should be reduced to safe file names inside each student's folder."""
+
+    from app.utils.exporters import export_many
+
+    items = [("student1/", [], [], "../../Lab\n1", ""), ("student2/", [], [], "..", "")]
+    names = [name for name, _ in export_many(iter(items), "python")]
+    assert names == ["student1/lab_1.py", "student1/requirements.txt",
+                     "student2/pipeline.py", "student2/requirements.txt"]
+
+
+def test_names_and_labels_cannot_inject_code():
+    """Line breaks and quotes in a pipeline name or node label should stay inside comments and strings."""
+
+    import ast
+
+    from app.utils.code_generator import generate_python_code
+    from app.utils.exporters import export_pipeline
+
+    name = 'Lab"""\nimport os\n#'
+    nodes = [{"id": "n1", "data": {"componentId": "sample-data", "label": 'x")\nimport os\nprint("',
+                                   "parameters": {"dataset": "iris"}}}]
+
+    code = generate_python_code(nodes, [], name)
+    imported = {alias.name for node in ast.walk(ast.parse(code)) if isinstance(node, ast.Import) for alias in node.names}
+    assert "os" not in imported
+    assert "print(\"Step 1: x') import os print('\")" in code
+
+    script = export_pipeline("python", nodes, [], name, 'About"""\nimport os')["script"]
+    assert not any(line.strip().startswith("import os") for line in script.splitlines())
+
+
+def test_bundle_entry_names_are_safe():
+    """A pipeline name with path separators or line breaks should not escape the bundle folder or the Dockerfile."""
+
+    from app.utils.exporters import pipeline_bundle
+
+    nodes = [{"id": "n1", "data": {"componentId": "sample-data", "label": "Data", "parameters": {"dataset": "iris"}}}]
+    entries = dict(pipeline_bundle(nodes, [], "../../Lab\nRUN rm", prefix="lab/"))
+    assert "lab/lab_run_rm.py" in entries
+    assert "lab/lab_run_rm.ipynb" in entries
+    assert all(name.startswith("lab/") and ".." not in name for name in entries)
+    assert "\nRUN rm" not in entries["lab/Dockerfile"]
+    assert "COPY lab_run_rm.py ." in entries["lab/Dockerfile"]
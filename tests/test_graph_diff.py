@@ -0,0 +1,132 @@
+"""Tests for structural diffs between pipeline graphs and the version compare endpoint."""
+
+from app import db
+from app.models import PipelineVersion, SavedModel, User
+from app.utils import graph_diff
+from app.utils.graph_diff import diff_pipelines, match_nodes
+
+
+def _node(node_id, component_id, label, x=0, **parameters):
+    """A canvas node at (x, 0)."""
+
+    return {"id": node_id, "position": {"x": x, "y": 0},
+            "data": {"componentId": component_id, "label": label, "parameters": parameters}}
+
+
+def _edge(edge_id, source, target):
+    return {"id": edge_id, "source": source, "target": target}
+
+
+def test_recreated_nodes_are_matched_by_component_and_label():
+    """Leftover nodes should pair up by (componentId, label) in canvas order; others stay unmatched."""
+
+    old = [_node("a", "sample-data", "Data"), _node("b", "standard-scaler", "Scale"),
+           _node("c", "standard-scaler", "Scale"), _node("d", "pca", "Reduce")]
+    new = [_node("a", "sample-data", "Data"), _node("x", "standard-scaler", "Scale"),
+           _node("y", "standard-scaler", "Scale"), _node("z", "pca", "Other label")]
+
+    assert match_nodes(old, new) == {"a": "a", "b": "x", "c": "y"}
+
+
+def test_id_match_wins_over_content_match():
+    """A node keeping its id should not be re-paired with a look-alike."""
+
+    old = [_node("a", "standard-scaler", "Scale")]
+    new = [_node("b", "standard-scaler", "Scale"), _node("a", "standard-scaler", "Renamed")]
+
+    assert match_nodes(old, new) == {"a": "a"}
+
+
+def test_diff_reports_moves_changes_and_rewiring():
+    """Moves, label/parameter edits and rewired edges should each be reported once."""
+
+    nodes1 = [_node("data", "sample-data", "Data", dataset="iris"), _node("scale", "standard-scaler", "Scale"),
+              _node("split", "train-test-split", "Split", test_size=0.2), _node("model", "naive-bayes", "NB")]
+    edges1 = [_edge("e1", "data", "scale"), _edge("e2", "scale", "split"), _edge("e3", "split", "model")]
+    nodes2 = [_node("data", "sample-data", "Data", x=40, dataset="wine"), _node("scale", "standard-scaler", "Scale"),
+              _node("split", "train-test-split", "Split data", test_size=0.3), _node("model", "naive-bayes", "NB")]
+    edges2 = [_edge("e1", "data", "scale"), _edge("e2", "data", "split"), _edge("e4", "scale", "model"),
+              _edge("e3", "split", "model")]
+
+    diff = diff_pipelines(nodes1, edges1, nodes2, edges2)
+    assert diff["nodes"]["moved"] == [{"id": "data", "from": {"x": 0, "y": 0}, "to": {"x": 40, "y": 0}}]
+    changed = {change["id"]: change for change in diff["nodes"]["changed"]}
+    assert changed["data"] == {"id": "data", "parameters": {"dataset": ["iris", "wine"]}}
+    assert changed["split"] == {"id": "split", "label": ["Split", "Split data"],
+                                "parameters": {"test_size": [0.2, 0.3]}}
+    assert diff["edges"]["rewired"] == [{"id": "e2", "from": ["scale", "split"], "to": ["data", "split"]}]
+    assert diff["edges"]["added"] == [["scale", "model"]]
+    assert diff["edges"]["removed"] == []
+    assert diff["summary"]["identical"] is False
+
+
+def test_recreated_nodes_do_not_look_rewired():
+    """Edges into a deleted and re-created node should be translated through the node mapping."""
+
+    nodes1 = [_node("data", "sample-data", "Data"), _node("old", "standard-scaler", "Scale")]
+    nodes2 = [_node("data", "sample-data", "Data"), _node("new", "standard-scaler", "Scale")]
+    edges1 = [_edge("e1", "data", "old")]
+    edges2 = [_edge("e9", "data", "new")]
+
+    diff = diff_pipelines(nodes1, edges1, nodes2, edges2)
+    assert diff["nodes"]["rematched"] == [{"old_id": "old", "new_id": "new"}]
+    assert (diff["nodes"]["added"], diff["nodes"]["removed"]) == ([], [])
+    assert diff["edges"] == {"added": [], "removed": [], "rewired": []}
+    assert diff["summary"]["identical"] is True
+
+
+def _login_with_versions(app, client, graphs):
+    """Log in as a new user owning one pipeline with a version per (nodes, edges); returns their ids."""
+
+    with app.app_context():
+        user = User(username="owner", email="owner@example.com")
+        user.set_password("pw")
+        db.session.add(user)
+        db.session.flush()
+        model = SavedModel(name="Lab", user_id=user.id, nodes="[]", edges="[]")
+        db.session.add(model)
+        db.session.commit()
+        model_id = model.id
+
+    client.post("/auth/login", data={"email": "owner@example.com", "password": "pw"})
+    ids = []
+    for nodes, edges in graphs:
+        response = client.post(f"/api/models/{model_id}/versions", json={"nodes": nodes, "edges": edges})
+        assert response.status_code == 201
+        ids.append(response.get_json()["version"]["id"])
+    return ids
+
+
+def test_compare_endpoint_caches_diffs_until_a_version_is_deleted(app, client):
+    """Comparisons should be served from the cache, and deleting a version should evict its pairs."""
+
+    nodes = [_node("data", "sample-data", "Data"), _node("scale", "standard-scaler", "Scale")]
+    first, second, third = _login_with_versions(app, client, [
+        (nodes, []),
+        (nodes, [_edge("e1", "data", "scale")]),
+        (nodes[:1], []),
+    ])
+    graph_diff.diff_cache.clear()
+
+    def compare(version1, version2):
+        response = client.post("/api/versions/compare", json={"version1_id": version1, "version2_id": version2})
+        assert response.status_code == 200
+        return response.get_json()
+
+    result = compare(first, second)
+    assert (result["version1"]["id"], result["version2"]["id"]) == (first, second)
+    assert result["diff"]["edges"]["added"] == [["data", "scale"]]
+    assert compare(second, third)["diff"]["summary"]["nodes_removed"] == 1
+    assert compare(first, third)["diff"]["summary"]["nodes_removed"] == 1
+
+    def cached_pairs():
+        return sorted((key[1], key[3]) for key in graph_diff.diff_cache._entries)
+
+    assert cached_pairs() == sorted([(first, second), (second, third), (first, third)])
+    assert compare(first, second) == result
+
+    assert client.delete(f"/api/versions/{second}").status_code == 200
+    assert cached_pairs() == [(first, third)]
+
+    with app.app_context():
+        assert db.session.get(PipelineVersion, second) is None
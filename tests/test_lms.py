@@ -0,0 +1,140 @@
+"""Tests for the LMS views."""
+
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app import db
+from app.models import Classroom, Classwork, Enrollment, SavedModel, Submission, User
+
+
+@contextmanager
+def count_queries(app):
+    """Collect the SQL statements run inside the block."""
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def _make_user(name):
+    user = User(username=name, email=f"{name}@example.com")
+    user.set_password("pw")
+    db.session.add(user)
+    db.session.flush()
+    return user
+
+
+def _add_students(work, count, start):
+    """Enroll students who each submit a copy of the lab."""
+
+    for i in range(start, start + count):
+        student = _make_user(f"student{i}")
+        db.session.add(Enrollment(user_id=student.id, classroom_id=work.classroom_id))
+        model = SavedModel(name="Lab", user_id=student.id, nodes="[]", edges="[]")
+        db.session.add(model)
+        db.session.flush()
+        db.session.add(Submission(classwork_id=work.id, student_id=student.id,
+                                  submission_model_id=model.id, status="turned_in"))
+    db.session.commit()
+
+
+def test_teacher_views_do_not_query_per_student(app, client):
+    """Classroom and classwork pages should cost the same number of queries for 2 or 8 students."""
+
+    with app.app_context():
+        teacher = _make_user("teacher")
+        classroom = Classroom(name="ML 101", owner_id=teacher.id, join_code="ABC123")
+        db.session.add(classroom)
+        db.session.flush()
+        work = Classwork(classroom_id=classroom.id, title="Lab 1", type="lab")
+        db.session.add(work)
+        db.session.commit()
+        _add_students(work, 2, 0)
+        class_id, work_id = classroom.id, work.id
+
+    client.post("/auth/login", data={"email": "teacher@example.com", "password": "pw"})
+    pages = [f"/lms/classroom/{class_id}", f"/lms/classwork/{work_id}", "/dashboard"]
+
+    def query_counts():
+        counts = []
+        for page in pages:
+            with count_queries(app) as statements:
+                assert client.get(page).status_code == 200
+            counts.append(len(statements))
+        return counts
+
+    # Measure each roster size on a second pass, once per-session caches are warm
+    query_counts()
+    before = query_counts()
+    with app.app_context():
+        _add_students(db.session.get(Classwork, work_id), 6, 2)
+    query_counts()
+    assert query_counts() == before
+
+
+def test_teacher_can_open_submitted_model(app, client):
+    """A submitted model should be readable by the classroom's teacher but not by other users."""
+
+    with app.app_context():
+        teacher = _make_user("teacher")
+        _make_user("outsider")
+        classroom = Classroom(name="ML 101", owner_id=teacher.id, join_code="ABC123")
+        db.session.add(classroom)
+        db.session.flush()
+        work = Classwork(classroom_id=classroom.id, title="Lab 1", type="lab")
+        db.session.add(work)
+        db.session.commit()
+        _add_students(work, 1, 0)
+        model_id = SavedModel.query.filter_by(name="Lab").first().id
+
+    client.post("/auth/login", data={"email": "teacher@example.com", "password": "pw"})
+    assert client.get(f"/api/models/{model_id}").status_code == 200
+
+    client.get("/auth/logout")
+    client.post("/auth/login", data={"email": "outsider@example.com", "password": "pw"})
+    assert client.get(f"/api/models/{model_id}").status_code == 403
+
+
+def test_export_gives_each_student_a_folder(app, client):
+    """Students whose usernames sanitize to the same name should still get separate folders."""
+
+    import io
+    import zipfile
+
+    with app.app_context():
+        teacher = _make_user("teacher")
+        classroom = Classroom(name="ML 101", owner_id=teacher.id, join_code="ABC123")
+        db.session.add(classroom)
+        db.session.flush()
+        work = Classwork(classroom_id=classroom.id, title="Lab 1", type="lab")
+        db.session.add(work)
+        db.session.flush()
+        student_ids = []
+        for name in ("ana b", "ana/b", "../.."):
+            student = _make_user(name)
+            student_ids.append(student.id)
+            model = SavedModel(name="Lab", user_id=student.id, nodes="[]", edges="[]")
+            db.session.add(model)
+            db.session.flush()
+            db.session.add(Submission(classwork_id=work.id, student_id=student.id,
+                                      submission_model_id=model.id, status="turned_in"))
+        db.session.commit()
+        work_id = work.id
+
+    client.post("/auth/login", data={"email": "teacher@example.com", "password": "pw"})
+    response = client.get(f"/lms/classwork/{work_id}/submissions/export")
+    assert response.status_code == 200
+
+    folders = {name.split("/")[0] for name in zipfile.ZipFile(io.BytesIO(response.data)).namelist()}
+    first, second, third = student_ids
+    assert folders == {f"ana_b_{first}", f"ana_b_{second}", f"student_{third}"}
@@ -17,3 +17,29 @@ def test_builder_page_renders(client):
     # The builder page includes several references to ML components.
     assert b"Pipeline" in response.data or b"Builder" in response.data
 
+
+
+def test_dashboard_lists_models_without_their_graphs(app, client):
+    """The dashboard should show saved pipelines without loading their nodes/edges JSON."""
+
+    from app import db
+    from app.models import SavedModel, User
+    from tests.test_lms import count_queries
+
+    with app.app_context():
+        user = User(username="owner", email="owner@example.com")
+        user.set_password("pw")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(SavedModel(name="Iris lab", description="First try", user_id=user.id,
+                                  nodes='[{"id": "n1"}]', edges="[]"))
+        db.session.commit()
+
+    client.post("/auth/login", data={"email": "owner@example.com", "password": "pw"})
+    with count_queries(app) as statements:
+        response = client.get("/dashboard")
+    assert response.status_code == 200
+    assert b"Iris lab" in response.data and b"First try" in response.data
+    model_queries = [statement for statement in statements if "FROM saved_model" in statement]
+    assert model_queries
+    assert not any("saved_model.nodes" in statement or "saved_model.edges" in statement for statement in model_queries)
@@ -0,0 +1,185 @@
+"""Tests for version metrics."""
+
+import pytest
+
+from app import db
+from app.models import SavedModel, User
+
+
+def _login_with_model(app, client):
+    """Log in as a new user who owns one empty pipeline; returns its id."""
+
+    with app.app_context():
+        user = User(username="owner", email="owner@example.com")
+        user.set_password("pw")
+        db.session.add(user)
+        db.session.flush()
+        model = SavedModel(name="Lab", user_id=user.id, nodes="[]", edges="[]")
+        db.session.add(model)
+        db.session.commit()
+        model_id = model.id
+
+    client.post("/auth/login", data={"email": "owner@example.com", "password": "pw"})
+    return model_id
+
+
+def _add_version(client, model_id):
+    response = client.post(f"/api/models/{model_id}/versions", json={"nodes": [], "edges": []})
+    assert response.status_code == 201
+    return response.get_json()["version"]["id"]
+
+
+def test_posted_metric_values_are_numbers(app, client):
+    """Numeric strings should be stored as numbers and other strings rejected without storing anything."""
+
+    version_id = _add_version(client, _login_with_model(app, client))
+
+    response = client.post(f"/api/versions/{version_id}/metrics",
+                           json={"metrics": [{"name": "accuracy", "value": "0.9", "epoch": 1}]})
+    assert response.status_code == 201
+    assert response.get_json()["metrics"][0]["metric_value"] == 0.9
+
+    response = client.post(f"/api/versions/{version_id}/metrics",
+                           json={"metrics": [{"name": "accuracy", "value": 0.95, "epoch": 2},
+                                             {"name": "accuracy", "value": "high", "epoch": 3}]})
+    assert response.status_code == 400
+    assert len(client.get(f"/api/versions/{version_id}/metrics").get_json()) == 1
+
+
+def test_columnar_payload_broadcasts_scalars():
+    """Scalar columns should apply to every row and list columns must match 'values' in length."""
+
+    from app.utils.metric_store import parse_columnar
+
+    columns = parse_columnar(3, {"names": "loss", "values": [0.5, 0.25, None], "epochs": [1, 2, 3],
+                                 "metadata": {"run": "a"}})
+    assert columns["version_id"] == [3, 3, 3]
+    assert columns["metric_name"] == ["loss"] * 3
+    assert columns["metric_value"] == [0.5, 0.25, None]
+    assert columns["metric_type"] == ["training"] * 3
+    assert columns["epoch"] == [1, 2, 3]
+    assert columns["meta_data"] == ['{"run": "a"}'] * 3
+
+    for bad in ({"values": "0.5"}, {"values": [1, 2], "epochs": [1]}, {"values": ["0.5"], "names": "loss"},
+                {"values": [1], "names": ""}, {"values": [1], "names": "loss", "epochs": [1.5]}):
+        with pytest.raises(ValueError):
+            parse_columnar(3, bad)
+    with pytest.raises(ValueError):
+        parse_columnar(3, {"values": [1, 2, 3], "names": "loss"}, max_points=2)
+
+
+def test_ndjson_lines_are_parsed_and_errors_name_the_line():
+    """Blank lines are skipped, defaults apply, and a bad line is reported by number."""
+
+    from app.utils.metric_store import parse_ndjson
+
+    text = '{"name": "acc", "value": 0.9, "epoch": 1}\n\n{"name": "acc", "value": 1, "type": "validation"}\n'
+    columns = parse_ndjson(4, text)
+    assert columns["version_id"] == [4, 4]
+    assert columns["metric_value"] == [0.9, 1]
+    assert columns["metric_type"] == ["training", "validation"]
+    assert columns["epoch"] == [1, None]
+    assert columns["meta_data"] == [None, None]
+
+    with pytest.raises(ValueError, match="Line 4"):
+        parse_ndjson(4, text + '{"name": "acc", "value": "high"}')
+    with pytest.raises(ValueError, match="Line 1"):
+        parse_ndjson(4, "[1, 2]")
+    with pytest.raises(ValueError):
+        parse_ndjson(4, text, max_points=1)
+
+
+def test_bulk_endpoint_inserts_and_aggregates(app, client):
+    """Posted columns should be stored and visible through the single-version metrics API."""
+
+    version_id = _add_version(client, _login_with_model(app, client))
+    response = client.post(f"/api/versions/{version_id}/metrics/bulk",
+                           json={"names": "loss", "values": [0.9, 0.5, 0.7], "epochs": [1, 2, 3]})
+    assert response.status_code == 201
+    assert sorted(m["metric_value"] for m in client.get(f"/api/versions/{version_id}/metrics").get_json()) == [0.5, 0.7, 0.9]
+
+    response = client.post(f"/api/versions/{version_id}/metrics/bulk", data="not json",
+                           content_type="application/x-ndjson")
+    assert response.status_code == 400
+
+
+def test_overlapping_posts_merge_into_one_aggregate(app, client):
+    """Points for the same metric from separate posts should add up in a single aggregate row."""
+
+    from app.models import MetricAggregate
+
+    version_id = _add_version(client, _login_with_model(app, client))
+    client.post(f"/api/versions/{version_id}/metrics/bulk",
+                json={"names": "loss", "values": [0.9, 0.4, 0.6], "epochs": [1, 3, 5]})
+    client.post(f"/api/versions/{version_id}/metrics/bulk",
+                json={"names": "loss", "values": [0.8, 0.2, None], "epochs": [2, 4, 6]})
+    client.post(f"/api/versions/{version_id}/metrics",
+                json={"metrics": [{"name": "loss", "value": 1.5}, {"name": "loss", "value": 0.5, "epoch": 5}]})
+
+    with app.app_context():
+        rows = MetricAggregate.query.filter_by(version_id=version_id, metric_name="loss").all()
+        assert len(rows) == 1
+        aggregate = rows[0]
+        assert aggregate.count == 7
+        assert aggregate.sum_value == pytest.approx(4.9)
+        assert (aggregate.min_value, aggregate.max_value) == (0.2, 1.5)
+        # The latest arrival wins the tie at the highest epoch with a value
+        assert (aggregate.last_value, aggregate.last_epoch) == (0.5, 5)
+
+
+def test_non_finite_values_are_rejected(app, client):
+    """NaN and infinity should not reach the stored metrics or their aggregates."""
+
+    version_id = _add_version(client, _login_with_model(app, client))
+    for value in ("nan", "inf", "-Infinity"):
+        response = client.post(f"/api/versions/{version_id}/metrics",
+                               json={"metrics": [{"name": "loss", "value": value}]})
+        assert response.status_code == 400
+    response = client.post(f"/api/versions/{version_id}/metrics/bulk",
+                           data='{"names": "loss", "values": [0.1, NaN]}', content_type="application/json")
+    assert response.status_code == 400
+    response = client.post(f"/api/versions/{version_id}/metrics/bulk",
+                           data='{"name": "loss", "value": Infinity}\n', content_type="application/x-ndjson")
+    assert response.status_code == 400
+    assert client.get(f"/api/versions/{version_id}/metrics").get_json() == []
+
+
+def test_leaderboard_ranks_versions_by_aggregate(app, client):
+    """Versions should be ranked by the chosen aggregate, with ties going to the earlier version."""
+
+    model_id = _login_with_model(app, client)
+    accuracy = {}
+    for curve in ([0.6, 0.8, 0.7], [0.5, 0.9], [0.8, 0.75], [0.1]):
+        version_id = _add_version(client, model_id)
+        accuracy[version_id] = curve
+        client.post(f"/api/versions/{version_id}/metrics/bulk",
+                    json={"names": "accuracy", "values": curve, "epochs": list(range(len(curve)))})
+    client.post(f"/api/versions/{version_id}/metrics", json={"metrics": [{"name": "loss", "value": 0.2}]})
+    first, second, third, fourth = accuracy
+
+    def ranking(**args):
+        response = client.get(f"/api/models/{model_id}/leaderboard",
+                              query_string={"metric": "accuracy", "type": "training", **args})
+        assert response.status_code == 200
+        entries = response.get_json()["entries"]
+        assert [entry["rank"] for entry in entries] == list(range(1, len(entries) + 1))
+        return [(entry["version_id"], entry["score"]) for entry in entries]
+
+    assert ranking() == [(second, 0.9), (third, 0.75), (first, 0.7), (fourth, 0.1)]
+    assert ranking(agg="max", limit=3) == [(second, 0.9), (first, 0.8), (third, 0.8)]
+    assert ranking(limit=-1) == [(second, 0.9)]
+    assert ranking(agg="min", order="asc") == [(fourth, 0.1), (second, 0.5), (first, 0.6), (third, 0.75)]
+    means = ranking(agg="mean")
+    assert (means[0][0], means[-1][0]) == (third, fourth)
+    assert means[0][1] == pytest.approx(0.775)
+    assert ranking(type="validation") == []
+
+    # Without a type, each version is ranked once, by its training metrics
+    client.post(f"/api/versions/{first}/metrics", json={"metrics": [{"name": "accuracy", "value": 0.99, "type": "validation"}]})
+    assert ranking(type="validation") == [(first, 0.99)]
+    response = client.get(f"/api/models/{model_id}/leaderboard", query_string={"metric": "accuracy"})
+    assert response.get_json()["type"] == "training"
+    assert [(entry["version_id"], entry["score"]) for entry in response.get_json()["entries"]] == ranking()
+
+    assert client.get(f"/api/models/{model_id}/leaderboard").status_code == 400
+    assert client.get(f"/api/models/{model_id}/leaderboard?metric=accuracy&agg=median").status_code == 400
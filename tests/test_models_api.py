@@ -0,0 +1,95 @@
+"""Tests for listing saved models: projections and keyset pagination."""
+
+from datetime import datetime
+
+from app import db
+from app.models import SavedModel, User
+
+
+def _login_with_models(app, client, updated):
+    """Log in as a new user owning one model per updated_at value; returns their ids in order."""
+
+    with app.app_context():
+        user = User(username="owner", email="owner@example.com")
+        user.set_password("pw")
+        db.session.add(user)
+        db.session.flush()
+        models = [
+            SavedModel(name=f"Model {index}", user_id=user.id, created_at=timestamp, updated_at=timestamp,
+                       nodes='[{"id": "a", "data": {"componentId": "csv-loader"}}]', edges="[]",
+                       node_count=1, edge_count=0)
+            for index, timestamp in enumerate(updated)
+        ]
+        db.session.add_all(models)
+        db.session.commit()
+        ids = [model.id for model in models]
+
+    client.post("/auth/login", data={"email": "owner@example.com", "password": "pw"})
+    return ids
+
+
+def _pages(client, limit, **args):
+    """Follow next_after from the first page to the last; returns the pages."""
+
+    pages, after = [], None
+    while True:
+        query = dict(args, limit=limit, **({"after": after} if after else {}))
+        response = client.get("/api/models", query_string=query)
+        assert response.status_code == 200
+        page = response.get_json()
+        pages.append(page)
+        after = page["next_after"]
+        if after is None:
+            return pages
+
+
+def test_pages_cover_models_with_tied_timestamps_once(app, client):
+    """Models sharing an updated_at should be split across pages by id, without gaps or repeats."""
+
+    tied = datetime(2025, 1, 2, 3, 4, 5)
+    ids = _login_with_models(app, client, [datetime(2025, 1, 1)] + [tied] * 4 + [datetime(2025, 1, 3)])
+
+    pages = _pages(client, limit=2, summary=1)
+    listed = [model["id"] for page in pages for model in page["models"]]
+    assert listed == [ids[5], ids[4], ids[3], ids[2], ids[1], ids[0]]
+    assert [len(page["models"]) for page in pages] == [2, 2, 2]
+    assert pages[0]["next_after"] == f"{tied.isoformat()},{ids[4]}"
+
+
+def test_last_page_has_no_cursor(app, client):
+    """A page that reaches the end should return next_after null, even when it is full."""
+
+    _login_with_models(app, client, [datetime(2025, 1, day) for day in (1, 2)])
+
+    page = client.get("/api/models", query_string={"limit": 2}).get_json()
+    assert len(page["models"]) == 2
+    assert page["next_after"] is None
+
+
+def test_invalid_cursor_is_rejected(app, client):
+    """A cursor that isn't '<updated_at>,<id>' should be a 400, not a server error."""
+
+    _login_with_models(app, client, [datetime(2025, 1, 1)])
+
+    for cursor in ("garbage", "2025-01-01T00:00:00,abc", "yesterday,3"):
+        response = client.get("/api/models", query_string={"after": cursor})
+        assert response.status_code == 400
+        assert response.get_json() == {"error": "Invalid cursor"}
+
+
+def test_fields_and_summary_projections(app, client):
+    """fields should return only the listed (known) columns plus id; summary leaves the graph out."""
+
+    _login_with_models(app, client, [datetime(2025, 1, 1)])
+
+    models = client.get("/api/models", query_string={"fields": "name,password_hash,updated_at"}).get_json()
+    assert list(models[0]) == ["id", "name", "updated_at"]
+    assert models[0]["updated_at"] == "2025-01-01T00:00:00"
+
+    models = client.get("/api/models", query_string={"summary": 1}).get_json()
+    assert set(models[0]) == {"id", "name", "description", "created_at", "updated_at", "tags",
+                              "node_count", "edge_count", "component_ids"}
+    assert (models[0]["node_count"], models[0]["tags"]) == (1, [])
+
+    models = client.get("/api/models").get_json()
+    assert models[0]["nodes"][0]["id"] == "a"
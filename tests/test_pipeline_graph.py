@@ -0,0 +1,82 @@
+"""Tests for the compiled pipeline graph."""
+
+from app.utils.pipeline_graph import PipelineGraph
+
+
+def _nodes(*ids):
+    return [{"id": node_id, "data": {}} for node_id in ids]
+
+
+def _edges(*pairs):
+    return [{"id": f"{source}-{target}", "source": source, "target": target} for source, target in pairs]
+
+
+def test_order_is_topological_and_stable():
+    """Every edge should point forward in the order, and the order should be the same on every build."""
+
+    edges = _edges(("load", "scale"), ("load", "split"), ("split", "train"), ("scale", "train"))
+    graph = PipelineGraph(_nodes("train", "split", "scale", "load", "notes"), edges)
+
+    # Of the nodes ready at each step, the earliest in the input goes first
+    assert graph.order == ["load", "split", "scale", "train", "notes"]
+    position = {node_id: i for i, node_id in enumerate(graph.order)}
+    assert all(position[edge["source"]] < position[edge["target"]] for edge in edges)
+    assert [node["id"] for node in graph.sorted_nodes()] == graph.order
+    assert not graph.has_cycle
+    assert PipelineGraph(_nodes("train", "split", "scale", "load", "notes"), edges).order == graph.order
+
+
+def test_dangling_edges_and_duplicate_ids_are_set_aside():
+    """Edges to missing nodes shouldn't raise, and the first node with an id should win."""
+
+    nodes = _nodes("a", "b") + [{"id": "a", "data": {"label": "duplicate"}}]
+    graph = PipelineGraph(nodes, _edges(("a", "b"), ("a", "gone"), ("gone", "b")))
+
+    assert len(graph) == 2
+    assert graph.nodes["a"]["data"] == {}
+    assert [edge["id"] for edge in graph.edges] == ["a-b"]
+    assert [edge["id"] for edge in graph.dangling_edges] == ["a-gone", "gone-b"]
+    assert graph.order == ["a", "b"]
+
+
+def test_find_cycles_returns_one_witness_per_component():
+    """Each cyclic component should yield one closed path; acyclic parts and self-loops are handled."""
+
+    edges = _edges(("a", "b"), ("b", "c"), ("c", "a"), ("c", "d"), ("d", "e"), ("e", "d"), ("f", "f"), ("g", "a"))
+    graph = PipelineGraph(_nodes("a", "b", "c", "d", "e", "f", "g"), edges)
+
+    components = sorted(sorted(component) for component in graph.strongly_connected_components())
+    assert components == [["a", "b", "c"], ["d", "e"], ["f"], ["g"]]
+
+    cycles = graph.find_cycles()
+    assert cycles == [["a", "b", "c"], ["d", "e"], ["f"]]
+    pairs = {(edge["source"], edge["target"]) for edge in edges}
+    for cycle in cycles:
+        assert all((cycle[i], cycle[(i + 1) % len(cycle)]) in pairs for i in range(len(cycle)))
+
+    assert graph.has_cycle
+    assert graph.order == ["g"]
+
+
+def test_deep_chain_does_not_hit_the_recursion_limit():
+    """Cycle detection should be iterative, so very long pipelines still work."""
+
+    ids = [f"n{i}" for i in range(5000)]
+    graph = PipelineGraph(_nodes(*ids), _edges(*zip(ids, ids[1:]), (ids[-1], ids[0])))
+    assert graph.find_cycles() == [ids]
+
+
+def test_validate_reports_each_cycle_once(client):
+    """The validate endpoint should return the witness cycles alongside one error per cycle."""
+
+    nodes = _nodes("a", "b", "c")
+    response = client.post("/api/validate", json={"nodes": nodes, "edges": _edges(("a", "b"), ("b", "a"), ("c", "c"))})
+    body = response.get_json()
+    assert body["cycles"] == [["a", "b"], ["c"]]
+    assert [error for error in body["errors"] if "cycle" in error] == [
+        "Pipeline contains a cycle, which is not allowed: a -> b -> a",
+        "Pipeline contains a cycle, which is not allowed: c -> c",
+    ]
+
+    body = client.post("/api/validate", json={"nodes": [], "edges": []}).get_json()
+    assert (body["errors"], body["cycles"]) == (["Pipeline is empty"], [])
@@ -0,0 +1,30 @@
+"""Tests for the stored pipeline summary fields."""
+
+from app import db
+from app.models import SavedModel, User
+from app.utils.pipeline_summary import component_filter, store_graph
+
+
+def test_component_filter_matches_whole_ids_literally(app):
+    """LIKE wildcards in a component id should match only themselves."""
+
+    with app.app_context():
+        user = User(username="owner", email="owner@example.com")
+        user.set_password("pw")
+        db.session.add(user)
+        db.session.flush()
+        for name, component_ids in (("underscore", ["a_b"]), ("letter", ["axb"]), ("both", ["a_b", "c%d"])):
+            model = SavedModel(name=name, user_id=user.id)
+            store_graph(model, [{"id": i, "data": {"componentId": i}} for i in component_ids], [])
+            db.session.add(model)
+        db.session.commit()
+
+        def matching(component_id):
+            query = SavedModel.query.filter(component_filter(SavedModel.component_ids, component_id))
+            return sorted(model.name for model in query)
+
+        assert matching("a_b") == ["both", "underscore"]
+        assert matching("axb") == ["letter"]
+        assert matching("c%d") == ["both"]
+        assert matching("%") == []
+        assert matching("a\\b") == []
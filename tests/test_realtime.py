@@ -0,0 +1,299 @@
+"""Tests for the collaborative canvas document, presence and message bus."""
+
+import multiprocessing
+import time
+
+import pytest
+
+from app.realtime import OpError, PipelineDocument
+
+
+def test_bursts_coalesce_into_one_operation_per_node():
+    """Repeated moves and parameter edits should go out once, with the latest value, and versions keep counting."""
+
+    doc = PipelineDocument([{"id": "a", "position": {"x": 0, "y": 0}, "data": {}}], [])
+    doc.apply({"op": "add_node", "node": {"id": "b", "position": {"x": 10, "y": 0}}}, user_id=1)
+    for x in range(30):
+        doc.apply({"op": "move_node", "id": "a", "position": {"x": x + 0.04, "y": 5}})
+        doc.apply({"op": "set_param", "id": "b", "name": "k", "value": x})
+    doc.apply({"op": "connect", "edge": {"id": "e", "source": "a", "target": "b"}})
+
+    from_version, ops = doc.take_pending()
+    assert (from_version, doc.version) == (0, 62)
+    assert [op["op"] for op in ops] == ["add_node", "move_node", "set_param", "connect"]
+    assert ops[1]["position"] == {"x": 29.0, "y": 5.0}
+    assert ops[2]["value"] == 29
+    assert ops[0]["node"]["position"] == {"x": 10.0, "y": 0.0}
+    assert doc.take_pending() == (62, [])
+
+    doc.apply({"op": "delete_node", "id": "a"})
+    assert doc.snapshot()["edges"] == []
+    with pytest.raises(OpError):
+        doc.apply({"op": "connect", "edge": {"id": "e2", "source": "a", "target": "b"}})
+    assert doc.version == 63
+
+
+def test_presence_flushes_latest_cursors_and_drops_stale_ones(monkeypatch):
+    """Many moves should produce one packed cursors message holding each user's latest position."""
+
+    from app import socketio
+    from app.realtime import Presence
+    from app.realtime.presence import unpack_cursors
+
+    sent = []
+    monkeypatch.setattr(socketio, "emit", lambda name, data, **kwargs: sent.append((name, data)))
+    monkeypatch.setattr(Presence, "_start", lambda self: None)
+
+    presence = Presence(stale_seconds=10)
+    presence.join(7, "sid-a", 1, "ada")
+    presence.join(7, "sid-b", 2, "bob")
+    for x in range(100):
+        presence.move(7, "sid-a", x, 1)
+        presence.move(7, "sid-b", 1, x)
+    presence.flush()
+
+    assert [name for name, _ in sent] == ["presence", "cursors"]
+    assert [user["username"] for user in sent[0][1]["users"]] == ["ada", "bob"]
+    assert unpack_cursors(sent[1][1]["cursors"]) == [(1, 99.0, 1.0), (2, 1.0, 99.0)]
+
+    sent.clear()
+    presence.flush()
+    assert sent == []
+
+    presence.move(7, "sid-a", 5, 5)
+    presence.flush(now=presence._rooms[7].cursors[1][2] + 5)
+    sent.clear()
+    presence.flush(now=presence._rooms[7].cursors[1][2] + 11)
+    assert unpack_cursors(sent[0][1]["cursors"]) == []
+
+
+def _claim_and_publish(path, started):
+    from app.realtime import SQLiteBus
+
+    bus = SQLiteBus(path)
+    assert bus.claim("pipeline:1", "worker-b", ttl=30) == "worker-b"
+    started.wait(10)
+    bus.publish("collab:worker-a", "from b")
+
+
+def test_sqlite_bus_is_shared_between_processes(tmp_path):
+    """A lease held by another process should be respected, and its messages delivered."""
+
+    from app.realtime import SQLiteBus
+
+    path = str(tmp_path / "bus.db")
+    context = multiprocessing.get_context("spawn")
+    started = context.Event()
+    child = context.Process(target=_claim_and_publish, args=(path, started))
+    child.start()
+
+    bus = SQLiteBus(path)
+    messages = bus.listen("collab:worker-a", time.sleep)
+    started.set()
+    child.join(30)
+    assert child.exitcode == 0
+    assert bus.claim("pipeline:1", "worker-a", ttl=30) == "worker-b"
+    assert next(messages) == "from b"
+
+    bus.release("pipeline:1", "worker-b")
+    assert bus.owner("pipeline:1") is None
+    assert bus.claim("pipeline:1", "worker-a", ttl=30) == "worker-a"
+
+
+def test_bus_manager_carries_binary_payloads():
+    """An emit with a bytes payload should reach the other process's manager unchanged."""
+
+    import socketio
+
+    from app.realtime import BusManager, LocalBus
+
+    bus = LocalBus(poll_interval=0.01)
+    sender, receiver = BusManager(bus), BusManager(bus)
+    sent, received = [], []
+    sender._handle_emit = sent.append
+    receiver._handle_emit = received.append
+    for manager in (sender, receiver):
+        socketio.Server(client_manager=manager, async_mode="threading")
+        manager.initialize()
+
+    deadline = time.monotonic() + 5
+    while len(bus._subscribers.get("socketio", ())) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    payload = {"pipeline_id": 7, "cursors": b"\x01\x00\x00\x00\x00\x00\x80?\x00\x00\x00@"}
+    sender.emit("cursors", payload, room="pipeline_7", namespace="/builder")
+    # Older python-socketio releases publish binary data as it is
+    sender._publish(dict(sent[0], data=[payload], binary=False))
+    while len(received) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert received[0] == sent[0]
+    assert received[1]["data"] == [payload]
+
+
+def test_lost_lease_checkpoints_unsaved_changes(app, monkeypatch):
+    """A room taken over by another process should still have its unsaved edits saved."""
+
+    from app.realtime import CollaborationEngine, LocalBus
+    from app.realtime.engine import _Room, lease_key
+
+    engine = CollaborationEngine()
+    engine.init_app(app, LocalBus())
+    saved = []
+    monkeypatch.setattr(engine, "_checkpoint", lambda pipeline_id, snapshot: saved.append((pipeline_id, snapshot)))
+
+    room = _Room(7, PipelineDocument([], []))
+    room.document.apply({"op": "add_node", "node": {"id": "a", "position": {"x": 0, "y": 0}}})
+    room.document.take_pending()
+    room.members["sid-a"] = (1, True)
+    room.dirty = True
+    room.renewed_at -= 60
+    engine._rooms[7] = room
+    assert engine.bus.claim(lease_key(7), "other-worker", 30) == "other-worker"
+
+    engine.tick()
+    assert 7 not in engine._rooms
+    assert [(pipeline_id, [node["id"] for node in snapshot["nodes"]]) for pipeline_id, snapshot in saved] == [(7, ["a"])]
+
+
+def test_failed_checkpoint_keeps_the_room_open(app, monkeypatch):
+    """A closing room whose checkpoint fails should keep its changes and lease, without holding up other rooms."""
+
+    from app.realtime import CollaborationEngine, LocalBus
+    from app.realtime.engine import _Room, lease_key
+
+    engine = CollaborationEngine()
+    engine.init_app(app, LocalBus())
+    saved, failing = [], {7}
+
+    def checkpoint(pipeline_id, snapshot):
+        if pipeline_id in failing:
+            raise RuntimeError("database is locked")
+        saved.append(pipeline_id)
+
+    monkeypatch.setattr(engine, "_checkpoint", checkpoint)
+    for pipeline_id in (7, 8):
+        room = _Room(pipeline_id, PipelineDocument([], []))
+        room.document.apply({"op": "add_node", "node": {"id": "a", "position": {"x": 0, "y": 0}}})
+        room.document.take_pending()
+        room.dirty = True
+        engine._rooms[pipeline_id] = room
+        engine.bus.claim(lease_key(pipeline_id), engine.worker, 30)
+
+    engine.tick()
+    assert saved == [8]
+    assert list(engine._rooms) == [7]
+    assert engine._rooms[7].dirty
+    assert engine.bus.owner(lease_key(7)) == engine.worker
+    assert engine.bus.owner(lease_key(8)) is None
+
+    failing.clear()
+    engine.tick()
+    assert 7 in engine._rooms  # waits for the retry interval
+
+    engine._rooms[7].retry_at = 0
+    engine.tick()
+    assert saved == [8, 7]
+    assert engine._rooms == {}
+    assert engine.bus.owner(lease_key(7)) is None
+
+
+def test_changes_made_during_a_checkpoint_stay_dirty(app, monkeypatch):
+    """An edit applied while a checkpoint is being written should be saved by the next one."""
+
+    from app.realtime import CollaborationEngine, LocalBus
+    from app.realtime.engine import _Room
+
+    engine = CollaborationEngine()
+    engine.init_app(app, LocalBus())
+    room = _Room(7, PipelineDocument([], []))
+    room.members["sid-a"] = (1, True)
+    room.dirty = True
+    engine._rooms[7] = room
+
+    def checkpoint(pipeline_id, snapshot):
+        room.document.apply({"op": "add_node", "node": {"id": "late", "position": {"x": 0, "y": 0}}})
+
+    monkeypatch.setattr(engine, "_checkpoint", checkpoint)
+    engine.flush()
+    assert room.dirty
+
+    monkeypatch.setattr(engine, "_checkpoint", lambda pipeline_id, snapshot: None)
+    engine.flush()
+    assert not room.dirty
+
+
+def test_two_processes_route_through_the_owner(app, tmp_path, monkeypatch):
+    """Joins, edits and presence from a second process should be handled by the pipeline's owner."""
+
+    import json
+
+    from app import db, socketio
+    from app.models import SavedModel, User
+    from app.realtime import CollaborationEngine, Presence, SQLiteBus
+    from app.realtime.presence import process_key
+
+    with app.app_context():
+        user = User(username="ada", email="ada@example.com")
+        user.set_password("pw")
+        db.session.add(user)
+        db.session.flush()
+        model = SavedModel(name="Lab", user_id=user.id, nodes="[]", edges="[]")
+        db.session.add(model)
+        db.session.commit()
+        pipeline_id = model.id
+
+    sent = []
+    monkeypatch.setattr(socketio, "emit", lambda name, data, **kwargs: sent.append((name, kwargs.get("to"), data)))
+    monkeypatch.setattr(CollaborationEngine, "_start", lambda self: None)
+    monkeypatch.setattr(Presence, "_start", lambda self: None)
+
+    path = str(tmp_path / "bus.db")
+    processes = {}
+    for worker in ("web-a", "web-b"):
+        engine = CollaborationEngine()
+        engine.init_app(app, SQLiteBus(path))
+        engine._worker = worker
+        presence = Presence()
+        presence.init_app(app, engine)
+        processes[worker] = (engine, presence)
+    (owner, owner_presence), (other, other_presence) = processes["web-a"], processes["web-b"]
+
+    class Idle(Exception):
+        pass
+
+    def deliver():
+        """Run every command published to the owner, as its listener would."""
+        def idle(seconds):
+            raise Idle
+        try:
+            for message in owner.bus._poll("collab:web-a", 0, idle):
+                owner._handle(json.loads(message))
+        except Idle:
+            pass
+
+    owner.join(pipeline_id, "sid-a", 1, True)
+    owner_presence.join(pipeline_id, "sid-a", 1, "ada")
+    other.join(pipeline_id, "sid-b", 2, True)
+    other_presence.join(pipeline_id, "sid-b", 2, "bob")
+    other.submit(pipeline_id, "sid-b", 2, [{"op": "add_node", "node": {"id": "n1", "position": {"x": 0, "y": 0}}}], seq=1)
+    other_presence.move(pipeline_id, "sid-b", 3, 4)
+    assert not other.owns(pipeline_id) and other_presence._rooms == {}
+    deliver()
+
+    replies = [(name, to) for name, to, _ in sent]
+    assert replies == [("canvas_state", "sid-a"), ("canvas_state", "sid-b"), ("canvas_ack", "sid-b")]
+    assert sent[2][2]["version"] == 1 and sent[2][2]["rejected"] == []
+    assert [node["id"] for node in owner._rooms[pipeline_id].document.snapshot()["nodes"]] == ["n1"]
+
+    sent.clear()
+    owner_presence.flush()
+    assert [user["username"] for user in sent[0][2]["users"]] == ["ada", "bob"]
+    assert sent[1][2]["cursors"] == b"\x02\x00\x00\x00\x00\x00@@\x00\x00\x80@"
+
+    # web-b dies: once its process lease runs out the owner drops its clients
+    sent.clear()
+    owner.bus.release(process_key("web-b"), "web-b")
+    owner_presence.flush(now=time.monotonic() + owner_presence.stale_seconds)
+    assert [user["username"] for user in sent[0][2]["users"]] == ["ada"]
+
+    owner.flush()
+    assert not owner._rooms[pipeline_id].dirty
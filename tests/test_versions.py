@@ -0,0 +1,71 @@
+"""Tests for delta-encoded pipeline versions."""
+
+from app import db
+from app.models import PipelineVersion, SavedModel, User
+from app.utils import version_store
+
+
+def _login_with_model(app, client):
+    """Log in as a new user who owns one empty pipeline; returns its id."""
+
+    with app.app_context():
+        user = User(username="owner", email="owner@example.com")
+        user.set_password("pw")
+        db.session.add(user)
+        db.session.flush()
+        model = SavedModel(name="Lab", user_id=user.id, nodes="[]", edges="[]")
+        db.session.add(model)
+        db.session.commit()
+        model_id = model.id
+
+    client.post("/auth/login", data={"email": "owner@example.com", "password": "pw"})
+    return model_id
+
+
+def _graph(step):
+    """A pipeline that grows, gets edited, reordered and pruned as step increases."""
+
+    nodes = [{"id": "data", "data": {"componentId": "sample-data", "label": "Data",
+                                     "parameters": {"dataset": "wine" if step % 2 else "iris"}}}]
+    nodes += [{"id": f"scale{i}", "data": {"componentId": "standard-scaler", "label": f"Scale {i}", "parameters": {}}}
+              for i in range(step % 4)]
+    if step == 5:
+        nodes.reverse()
+    edges = [{"id": f"e{node['id']}", "source": "data", "target": node["id"]} for node in nodes if node["id"] != "data"]
+    return nodes, edges
+
+
+def test_versions_round_trip_through_deltas_and_deletes(app, client, monkeypatch):
+    """Every version should read back exactly as saved, including after the keyframe it builds on is deleted."""
+
+    app.config["VERSION_KEYFRAME_INTERVAL"] = 3
+    model_id = _login_with_model(app, client)
+
+    ids = []
+    for step in range(6):
+        nodes, edges = _graph(step)
+        response = client.post(f"/api/models/{model_id}/versions",
+                               json={"nodes": nodes, "edges": edges, "generate_code": True})
+        assert response.status_code == 201
+        ids.append(response.get_json()["version"]["id"])
+
+    with app.app_context():
+        formats = [db.session.get(PipelineVersion, version_id).storage_format for version_id in ids]
+        expected_code = [version_store.materialize(db.session.get(PipelineVersion, version_id))[2] for version_id in ids]
+    assert formats == ["full", "delta", "delta", "full", "delta", "delta"]
+    assert all(expected_code)
+
+    def check(remaining):
+        # Start from an empty cache so every read replays the stored deltas
+        monkeypatch.setattr(version_store, "version_cache", version_store.VersionCache())
+        for step, version_id in remaining:
+            version = client.get(f"/api/versions/{version_id}").get_json()
+            assert (version["nodes"], version["edges"]) == _graph(step)
+            with app.app_context():
+                assert db.session.get(PipelineVersion, version_id).graph()[2] == expected_code[step]
+
+    check(list(enumerate(ids)))
+
+    assert client.delete(f"/api/versions/{ids[0]}").status_code == 200
+    assert client.delete(f"/api/versions/{ids[4]}").status_code == 200
+    check([(1, ids[1]), (2, ids[2]), (3, ids[3]), (5, ids[5])])